@@ -3,14 +3,30 @@ Configuration management for Claude PMS
 Loads and validates pms.local.md YAML frontmatter
 """
 
+import functools
 import os
 import re
+import sys
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+try:
+    import yaml
+    try:
+        from yaml import CSafeLoader as _YamlLoader
+    except ImportError:
+        from yaml import SafeLoader as _YamlLoader
+except ImportError:
+    # PyYAML is optional - fall back to the regex key scanner below
+    yaml = None
+
+
+# slots=True needs Python 3.10+; older interpreters get a plain dataclass
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_DATACLASS_OPTIONS)
 class PMSConfig:
     """PMS configuration with typed fields"""
 
@@ -43,6 +59,37 @@ class PMSConfig:
     timeout_synthesize: int = 45
 
 
+# Frontmatter key → PMSConfig field. Keys are unique across sections, so
+# lookups ignore which section (triggers, thresholds, ...) a key lives in.
+_BOOL_KEYS = {
+    "precompact": "trigger_precompact",
+    "session_end": "trigger_session_end",
+    "stop": "trigger_stop",
+    "continuous_mode": "continuous_mode",
+    "auto_synthesize": "auto_synthesize",
+    "prefer_context": "prefer_context",
+    "fallback_jsonl": "fallback_jsonl",
+    "redact_sensitive": "redact_sensitive",
+}
+
+# Frontmatter key → (PMSConfig field, min, max) for clamped integers
+_INT_KEYS = {
+    "min_sessions": ("min_sessions", 1, 1000),
+    "emerging_pattern": ("emerging_pattern", 1, 100),
+    "strong_pattern": ("strong_pattern", 1, 100),
+    "critical_pattern": ("critical_pattern", 1, 100),
+    "encode": ("timeout_encode", 5, 300),
+    "extract": ("timeout_extract", 5, 600),
+    "synthesize": ("timeout_synthesize", 5, 300),
+}
+
+
+# Parsed configs keyed by config path, stored with the (st_mtime_ns, st_size)
+# stamp they were parsed from, or None when the file was absent.
+# Cached instances are shared - treat as read-only.
+_CONFIG_CACHE: Dict[str, Tuple[Optional[Tuple[int, int]], PMSConfig]] = {}
+
+
 def get_default_config() -> PMSConfig:
     """Return default configuration"""
     return PMSConfig()
@@ -61,50 +108,54 @@ def load_config(project_path: str) -> PMSConfig:
     """
     config_file = Path(project_path) / ".claude" / "pms.local.md"
 
-    if not config_file.exists():
-        return get_default_config()
+    cache_key = str(config_file)
+    cached = _CONFIG_CACHE.get(cache_key)
 
+    # A single stat decides everything: missing file, unchanged file, or re-read
     try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+        st = config_file.stat()
+    except OSError:
+        if cached is not None and cached[0] is None:
+            return cached[1]
+        config = get_default_config()
+        _CONFIG_CACHE[cache_key] = (None, config)
+        return config
 
-        # Extract YAML frontmatter (between --- markers)
-        yaml_match = re.search(r'^---\s*\n(.*?)\n---', content, re.DOTALL | re.MULTILINE)
-        if not yaml_match:
-            return get_default_config()
+    stamp = (st.st_mtime_ns, st.st_size)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
 
-        yaml_content = yaml_match.group(1)
+    config = _read_config(config_file)
+    _CONFIG_CACHE[cache_key] = (stamp, config)
+    return config
 
-        # Parse YAML (simple key-value extraction)
-        config = get_default_config()
 
-        # Triggers
-        config.trigger_precompact = _parse_bool(yaml_content, "precompact", True)
-        config.trigger_session_end = _parse_bool(yaml_content, "session_end", True)
-        config.trigger_stop = _parse_bool(yaml_content, "stop", False)
+def clear_config_cache() -> None:
+    """Drop all cached configs (forces the next load_config to re-read)"""
+    _CONFIG_CACHE.clear()
 
-        # Processing
-        config.continuous_mode = _parse_bool(yaml_content, "continuous_mode", True)
-        config.auto_synthesize = _parse_bool(yaml_content, "auto_synthesize", False)
 
-        # Thresholds
-        config.min_sessions = _parse_int(yaml_content, "min_sessions", 10, 1, 1000)
-        config.emerging_pattern = _parse_int(yaml_content, "emerging_pattern", 2, 1, 100)
-        config.strong_pattern = _parse_int(yaml_content, "strong_pattern", 3, 1, 100)
-        config.critical_pattern = _parse_int(yaml_content, "critical_pattern", 5, 1, 100)
+def _read_config(config_file: Path) -> PMSConfig:
+    """Read and parse pms.local.md, falling back to defaults on any error"""
+    try:
+        content = config_file.read_text(encoding='utf-8')
 
-        # Encoding
-        config.prefer_context = _parse_bool(yaml_content, "prefer_context", True)
-        config.fallback_jsonl = _parse_bool(yaml_content, "fallback_jsonl", True)
+        # Extract YAML frontmatter (between --- markers)
+        yaml_content = _extract_frontmatter(content)
+        if yaml_content is None:
+            return get_default_config()
 
-        # Privacy
-        config.redact_sensitive = _parse_bool(yaml_content, "redact_sensitive", True)
-        # TODO: Parse custom_redaction_patterns list
+        if yaml is not None:
+            return _config_from_yaml(yaml_content)
 
-        # Timeouts
-        config.timeout_encode = _parse_int(yaml_content, "encode", 30, 5, 300)
-        config.timeout_extract = _parse_int(yaml_content, "extract", 60, 5, 600)
-        config.timeout_synthesize = _parse_int(yaml_content, "synthesize", 45, 5, 300)
+        # Parse YAML (simple key-value extraction)
+        config = get_default_config()
+
+        for key, name in _BOOL_KEYS.items():
+            setattr(config, name, _parse_bool(yaml_content, key, getattr(config, name)))
+
+        for key, (name, min_val, max_val) in _INT_KEYS.items():
+            setattr(config, name, _parse_int(yaml_content, key, getattr(config, name), min_val, max_val))
 
         return config
 
@@ -142,11 +193,112 @@ def validate_config(config: PMSConfig) -> bool:
         return False
 
 
-# Helper functions for parsing YAML
+def _extract_frontmatter(content: str) -> Optional[str]:
+    """
+    Return the text between the opening and closing "---" marker lines.
+    Marker lines may only carry trailing whitespace, so a "----" rule inside
+    the frontmatter does not end it.
+    """
+    first_newline = content.find('\n')
+    if not content.startswith('---') or first_newline == -1 or content[3:first_newline].strip():
+        return None
+
+    start = first_newline + 1
+    search_from = first_newline
+    while True:
+        end = content.find('\n---', search_from)
+        if end == -1:
+            return None
+
+        line_end = content.find('\n', end + 1)
+        if line_end == -1:
+            line_end = len(content)
+
+        if not content[end + 4:line_end].strip():
+            return content[start:end] if end >= start else ""
+
+        search_from = end + 1
+
+
+def _config_from_yaml(yaml_content: str) -> PMSConfig:
+    """
+    Build config from frontmatter in a single PyYAML pass.
+    Uses the libyaml C loader when available.
+    """
+    data = yaml.load(yaml_content, Loader=_YamlLoader) or {}
+    if not isinstance(data, dict):
+        return get_default_config()
+
+    # Flatten one level of sections, keeping the first occurrence of each key
+    values: Dict[str, Any] = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                values.setdefault(str(sub_key), sub_value)
+        else:
+            values.setdefault(str(key), value)
+
+    config = get_default_config()
+
+    for key, name in _BOOL_KEYS.items():
+        if key in values:
+            setattr(config, name, _coerce_bool(values[key], getattr(config, name)))
+
+    for key, (name, min_val, max_val) in _INT_KEYS.items():
+        if key in values:
+            setattr(config, name, _coerce_int(values[key], getattr(config, name), min_val, max_val))
+
+    patterns = values.get("custom_redaction_patterns")
+    if isinstance(patterns, list):
+        config.custom_redaction_patterns = [str(p) for p in patterns if p is not None]
+
+    return config
+
+
+def _coerce_bool(value: Any, default: bool) -> bool:
+    """Coerce a parsed YAML scalar to bool"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        if value in (0, 1):
+            return bool(value)
+        return default
+    if isinstance(value, str):
+        value = value.lower()
+        if value in ('true', 'yes', 'on', '1'):
+            return True
+        if value in ('false', 'no', 'off', '0'):
+            return False
+    return default
+
+
+def _coerce_int(value: Any, default: int, min_val: int, max_val: int) -> int:
+    """Coerce a parsed YAML scalar to int with clamping"""
+    if isinstance(value, bool):
+        return default
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if isinstance(value, int):
+        return max(min_val, min(value, max_val))
+    return default
+
+
+# Helper functions for parsing YAML without PyYAML
+@functools.lru_cache(maxsize=None)
+def _bool_re(key: str) -> re.Pattern:
+    """Compiled matcher for a boolean key"""
+    return re.compile(rf'^\s*{re.escape(key)}:\s*(\w+)', re.MULTILINE)
+
+
+@functools.lru_cache(maxsize=None)
+def _int_re(key: str) -> re.Pattern:
+    """Compiled matcher for an integer key"""
+    return re.compile(rf'^\s*{re.escape(key)}:\s*(\d+)', re.MULTILINE)
+
+
 def _parse_bool(yaml_content: str, key: str, default: bool) -> bool:
     """Parse boolean value from YAML content"""
-    pattern = rf'^\s*{key}:\s*(\w+)'
-    match = re.search(pattern, yaml_content, re.MULTILINE)
+    match = _bool_re(key).search(yaml_content)
     if match:
         value = match.group(1).lower()
         if value in ('true', 'yes', 'on', '1'):
@@ -158,8 +310,7 @@ def _parse_bool(yaml_content: str, key: str, default: bool) -> bool:
 
 def _parse_int(yaml_content: str, key: str, default: int, min_val: int, max_val: int) -> int:
     """Parse integer value from YAML content with clamping"""
-    pattern = rf'^\s*{key}:\s*(\d+)'
-    match = re.search(pattern, yaml_content, re.MULTILINE)
+    match = _int_re(key).search(yaml_content)
     if match:
         try:
             value = int(match.group(1))
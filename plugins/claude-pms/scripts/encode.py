@@ -7,18 +7,24 @@ Captures session experiences using context-first strategy with JSONL fallback
 import argparse
 import json
 import os
-import signal
+import re
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional
 
+try:
+    # orjson is optional - parses transcript lines (as bytes) several times faster
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from config import load_config
-from json_handler import merge_monthly, safe_save, update_index
-from redaction import detect_and_redact, get_all_patterns
+# config, json_handler and redaction are imported lazily inside
+# encode_session so hook startup and --help don't pay for them
 from utils import (
     ensure_directory,
     get_git_branch,
@@ -26,21 +32,24 @@ from utils import (
     get_project_path,
     get_session_id,
     get_timestamp,
-    parse_jsonl,
+    iter_jsonl_lines,
 )
 
 
+# Sentinel for "not looked up yet" - None is a valid git branch result
+_UNSET = object()
+
+
+# Fields blanked out when redaction itself fails
+_SENSITIVE_FALLBACK_FIELDS = ("work_summary", "challenges", "solutions")
+
+
 # Timeout handling
 class TimeoutError(Exception):
     """Raised when encoding exceeds timeout"""
     pass
 
 
-def timeout_handler(signum, frame):
-    """Signal handler for timeout"""
-    raise TimeoutError("Encoding exceeded timeout limit")
-
-
 def encode_session(project_path: str, trigger: str, session_id: str = None, timeout: int = 30) -> bool:
     """
     Encode current session as episodic memory record.
@@ -54,19 +63,25 @@ def encode_session(project_path: str, trigger: str, session_id: str = None, time
     Returns:
         True if successful, False otherwise
     """
-    # Set up timeout handler (Unix-like systems only)
-    if hasattr(signal, 'SIGALRM'):
-        signal.signal(signal.SIGALRM, timeout_handler)
-        signal.alarm(timeout)
+    # Checked inside the transcript loop and between steps; a save that has
+    # started runs to completion, so a record is never half-written
+    deadline = time.monotonic() + timeout
+
+    now_ts = None
 
     try:
         # Load configuration
+        from config import load_config
         config = load_config(project_path)
 
         # Generate session ID if not provided
         if not session_id:
             session_id = get_session_id()
 
+        # Look these up once per encode - get_git_branch reads .git/HEAD
+        now_ts = get_timestamp()
+        git_branch = get_git_branch(project_path)
+
         # Determine encoding mode based on config with fallback chain
         episodic_record = None
         encoding_errors = []
@@ -75,7 +90,8 @@ def encode_session(project_path: str, trigger: str, session_id: str = None, time
             try:
                 # Context-first encoding
                 episodic_record = encode_from_context(
-                    project_path, session_id, trigger
+                    project_path, session_id, trigger,
+                    timestamp=now_ts, git_branch=git_branch
                 )
             except Exception as e:
                 encoding_errors.append(f"Context encoding failed: {e}")
@@ -85,8 +101,11 @@ def encode_session(project_path: str, trigger: str, session_id: str = None, time
         if not episodic_record and config.fallback_jsonl:
             try:
                 episodic_record = encode_from_jsonl(
-                    project_path, session_id, trigger
+                    project_path, session_id, trigger,
+                    timestamp=now_ts, git_branch=git_branch, deadline=deadline
                 )
+            except TimeoutError:
+                raise
             except Exception as e:
                 encoding_errors.append(f"JSONL encoding failed: {e}")
                 print(f"Warning: JSONL encoding failed: {e}", file=sys.stderr)
@@ -97,6 +116,8 @@ def encode_session(project_path: str, trigger: str, session_id: str = None, time
                 print(f"  - {error}", file=sys.stderr)
             return False
 
+        _check_deadline(deadline)
+
         # Document encoding limitations if context was incomplete
         if episodic_record.get("encoding_mode") == "context" and not episodic_record.get("task_summary"):
             episodic_record["limitations"] = [
@@ -108,6 +129,8 @@ def encode_session(project_path: str, trigger: str, session_id: str = None, time
         # Apply privacy redaction with comprehensive error handling
         if config.redact_sensitive:
             try:
+                from redaction import detect_and_redact, get_all_patterns
+
                 redaction_patterns = get_all_patterns(
                     config.custom_redaction_patterns
                 )
@@ -119,18 +142,22 @@ def encode_session(project_path: str, trigger: str, session_id: str = None, time
             except Exception as e:
                 # Over-redact on failure: remove potentially sensitive fields
                 print(f"Warning: Redaction failed, applying conservative over-redaction: {e}", file=sys.stderr)
-                sensitive_fields = ["work_summary", "challenges", "solutions"]
                 redacted_count = 0
-                for field in sensitive_fields:
-                    if field in episodic_record and isinstance(episodic_record[field], str):
+                for field in _SENSITIVE_FALLBACK_FIELDS:
+                    value = episodic_record.get(field)
+                    if isinstance(value, str):
                         episodic_record[field] = "[REDACTED - redaction error]"
                         redacted_count += 1
-                    elif field in episodic_record and isinstance(episodic_record[field], list):
-                        episodic_record[field] = ["[REDACTED - redaction error]"] * len(episodic_record[field])
+                    elif isinstance(value, list):
+                        episodic_record[field] = ["[REDACTED - redaction error]"] * len(value)
                         redacted_count += 1
                 print(f"Applied conservative redaction to {redacted_count} fields")
 
+        _check_deadline(deadline)
+
         # Save episodic record
+        from json_handler import save_episodic
+
         pms_dir = Path(project_path) / ".claude" / "pms"
         episodic_dir = pms_dir / "episodic"
         ensure_directory(episodic_dir)
@@ -139,31 +166,19 @@ def encode_session(project_path: str, trigger: str, session_id: str = None, time
         monthly_filename = get_monthly_filename(episodic_record["timestamp"])
         monthly_filepath = episodic_dir / monthly_filename
 
-        # Merge into monthly file
-        success = merge_monthly(episodic_record, str(monthly_filepath))
+        # Merge into monthly file and update index in one atomic batch
+        index_filepath = episodic_dir / "index.json"
+        success = save_episodic(episodic_record, str(monthly_filepath), str(index_filepath))
         if not success:
             print("Error: Failed to save episodic record", file=sys.stderr)
             return False
 
-        # Update index
-        index_filepath = episodic_dir / "index.json"
-        update_index(
-            str(index_filepath),
-            episodic_record["session_id"],
-            monthly_filename
-        )
-
         print(f"✓ Episodic record saved: {monthly_filename}")
 
         # Trigger semantic extraction if continuous mode enabled
         if config.continuous_mode:
-            # TODO: Call extract.py asynchronously (non-blocking)
-            # For now, just log
-            print("Continuous mode: Semantic extraction will be triggered")
-
-        # Cancel timeout alarm
-        if hasattr(signal, 'SIGALRM'):
-            signal.alarm(0)
+            if trigger_extraction(project_path):
+                print("Continuous mode: Semantic extraction started in background")
 
         return True
 
@@ -175,7 +190,7 @@ def encode_session(project_path: str, trigger: str, session_id: str = None, time
         try:
             partial_record = {
                 "session_id": session_id or get_session_id(),
-                "timestamp": get_timestamp(),
+                "timestamp": now_ts or get_timestamp(),
                 "project_path": project_path,
                 "trigger": trigger,
                 "encoding_mode": "partial_timeout",
@@ -183,22 +198,24 @@ def encode_session(project_path: str, trigger: str, session_id: str = None, time
                 "limitations": [f"Encoding timeout at {timeout}s", "Partial record only"]
             }
 
+            from json_handler import save_episodic
+
             pms_dir = Path(project_path) / ".claude" / "pms"
             episodic_dir = pms_dir / "episodic"
             ensure_directory(episodic_dir)
 
             monthly_filename = get_monthly_filename(partial_record["timestamp"])
             monthly_filepath = episodic_dir / monthly_filename
+            index_filepath = episodic_dir / "index.json"
 
-            merge_monthly(partial_record, str(monthly_filepath))
-            print(f"Saved partial record due to timeout: {monthly_filename}", file=sys.stderr)
+            # Same path as a full record (sidecar append, compaction lock)
+            if save_episodic(partial_record, str(monthly_filepath), str(index_filepath)):
+                print(f"Saved partial record due to timeout: {monthly_filename}", file=sys.stderr)
+            else:
+                print("Failed to save partial record", file=sys.stderr)
         except Exception as save_error:
             print(f"Failed to save partial record: {save_error}", file=sys.stderr)
 
-        # Cancel timeout alarm
-        if hasattr(signal, 'SIGALRM'):
-            signal.alarm(0)
-
         return False
 
     except Exception as e:
@@ -206,14 +223,57 @@ def encode_session(project_path: str, trigger: str, session_id: str = None, time
         import traceback
         traceback.print_exc()
 
-        # Cancel timeout alarm
-        if hasattr(signal, 'SIGALRM'):
-            signal.alarm(0)
+        return False
+
+
+def _check_deadline(deadline: Optional[float]) -> None:
+    """Raise TimeoutError if the time.monotonic() deadline has passed"""
+    if deadline is not None and time.monotonic() > deadline:
+        raise TimeoutError("Encoding exceeded timeout limit")
+
+
+def trigger_extraction(project_path: str) -> bool:
+    """
+    Start extract.py as a detached background process.
+    Encoding returns immediately; extraction never blocks the hook.
+
+    Args:
+        project_path: Path to project root
+
+    Returns:
+        True if the process was started, False otherwise
+    """
+    import subprocess
+
+    script = Path(__file__).parent / "extract.py"
+    kwargs = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
 
+    try:
+        subprocess.Popen(
+            [sys.executable, str(script), "--project-path", project_path],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=True,
+            **kwargs
+        )
+        return True
+    except OSError as e:
+        print(f"Warning: Failed to start semantic extraction: {e}", file=sys.stderr)
         return False
 
 
-def encode_from_context(project_path: str, session_id: str, trigger: str) -> dict:
+def encode_from_context(
+    project_path: str,
+    session_id: str,
+    trigger: str,
+    timestamp: Optional[str] = None,
+    git_branch: Optional[str] = _UNSET
+) -> dict:
     """
     Encode session from conversation context.
     This is the preferred method - uses conversation history directly.
@@ -222,6 +282,8 @@ def encode_from_context(project_path: str, session_id: str, trigger: str) -> dic
         project_path: Path to project root
         session_id: Session UUID
         trigger: Trigger event
+        timestamp: Record timestamp (current time if None)
+        git_branch: Git branch (looked up if not given; None means no repo)
 
     Returns:
         Episodic record dictionary
@@ -231,9 +293,9 @@ def encode_from_context(project_path: str, session_id: str, trigger: str) -> dic
 
     episodic_record = {
         "session_id": session_id,
-        "timestamp": get_timestamp(),
+        "timestamp": timestamp or get_timestamp(),
         "project_path": project_path,
-        "git_branch": get_git_branch(),
+        "git_branch": get_git_branch(project_path) if git_branch is _UNSET else git_branch,
         "trigger": trigger,
         "encoding_mode": "context",
 
@@ -258,7 +320,14 @@ def encode_from_context(project_path: str, session_id: str, trigger: str) -> dic
     return episodic_record
 
 
-def encode_from_jsonl(project_path: str, session_id: str, trigger: str) -> Optional[Dict]:
+def encode_from_jsonl(
+    project_path: str,
+    session_id: str,
+    trigger: str,
+    timestamp: Optional[str] = None,
+    git_branch: Optional[str] = _UNSET,
+    deadline: Optional[float] = None
+) -> Optional[Dict]:
     """
     Encode session from JSONL transcript (fallback method).
     Used when conversation context is unavailable.
@@ -267,99 +336,103 @@ def encode_from_jsonl(project_path: str, session_id: str, trigger: str) -> Optio
         project_path: Path to project root
         session_id: Session UUID
         trigger: Trigger event
+        timestamp: Record timestamp (current time if None)
+        git_branch: Git branch (looked up if not given; None means no repo)
+        deadline: time.monotonic() value after which reading is aborted
 
     Returns:
         Episodic record dictionary or None if JSONL not found
+
+    Raises:
+        TimeoutError: If the deadline passes while reading the transcript
     """
     # Locate JSONL transcript
-    # Pattern: ~/.claude/projects/{project}/transcripts/{session-id}.jsonl
+    # Pattern: ~/.claude/projects/{project-slug}/{session-id}.jsonl
     home = Path.home()
     claude_dir = home / ".claude" / "projects"
 
-    # Try to find transcript (this is a best-effort search)
-    transcript_records = []
     transcript_path = None
     malformed_lines = 0
     valid_lines = 0
 
-    # Search for recent transcripts
     if not claude_dir.exists():
         print(f"Warning: JSONL directory not found: {claude_dir}", file=sys.stderr)
         print("Falling back to context-only encoding", file=sys.stderr)
         return None
 
-    transcript_found = False
-    for transcript_file in claude_dir.rglob("*.jsonl"):
+    transcript_file = find_transcript(claude_dir, project_path, session_id)
+    transcript_found = transcript_file is not None
+
+    # Metadata is aggregated while streaming - records are not kept
+    tool_counts = {}
+    files_seen = set()
+    files_modified = []  # first-seen order, capped at 20
+    error_messages = []  # capped at 5
+
+    if transcript_found:
         try:
-            transcript_found = True
             # Read with malformed JSONL handling
-            with open(transcript_file, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    try:
-                        record = json.loads(line)
-                        transcript_records.append(record)
-                        valid_lines += 1
-                    except json.JSONDecodeError as e:
-                        malformed_lines += 1
-                        # Log but continue processing
-                        if malformed_lines <= 5:  # Only log first 5 errors
-                            print(f"Warning: Malformed JSONL at {transcript_file}:{line_num}: {e}", file=sys.stderr)
-
-                    # Limit total records for performance
-                    if valid_lines >= 1000:
-                        break
-
-            if transcript_records:
-                transcript_path = str(transcript_file)
-                break
-
+            for count, (line_num, line) in enumerate(iter_jsonl_lines(transcript_file)):
+                # Check the deadline every 64 lines read to keep the loop cheap
+                if count % 64 == 0:
+                    _check_deadline(deadline)
+
+                try:
+                    record = _json_loads(line)
+                    valid_lines += 1
+                except ValueError as e:
+                    malformed_lines += 1
+                    # Log but continue processing
+                    if malformed_lines <= 5:  # Only log first 5 errors
+                        print(f"Warning: Malformed JSONL at {transcript_file}:{line_num}: {e}", file=sys.stderr)
+                    continue
+
+                # Plain type checks instead of a per-record try/except
+                if isinstance(record, dict):
+                    # Count tool uses
+                    tool_name = record.get("tool_name")
+                    if isinstance(tool_name, str):
+                        tool_counts[tool_name] = tool_counts.get(tool_name, 0) + 1
+
+                    # Extract file operations
+                    tool_input = record.get("tool_input")
+                    if isinstance(tool_input, dict):
+                        file_path = tool_input.get("file_path")
+                        if isinstance(file_path, str) and file_path and len(files_modified) < 20 \
+                                and file_path not in files_seen:
+                            files_seen.add(file_path)
+                            files_modified.append(file_path)
+
+                    # Extract error messages
+                    if "error" in record and len(error_messages) < 5:
+                        error_messages.append(str(record["error"]))
+
+                # Limit total records for performance
+                if valid_lines >= 1000:
+                    break
+
+            transcript_path = str(transcript_file)
+
+        except TimeoutError:
+            raise
         except Exception as e:
             print(f"Warning: Error reading transcript {transcript_file}: {e}", file=sys.stderr)
-            continue
 
     # Report malformed line handling
     if malformed_lines > 0:
         print(f"Skipped {malformed_lines} malformed JSONL lines, processed {valid_lines} valid lines", file=sys.stderr)
 
     # If no transcript found
-    if not transcript_found or not transcript_records:
+    if not transcript_found or not valid_lines:
         print("Warning: No JSONL transcript records found", file=sys.stderr)
         print("This may be expected if context-first encoding is preferred", file=sys.stderr)
         return None
 
-    # Extract metadata from transcript
-    tool_counts = {}
-    file_operations = []
-    error_messages = []
-
-    for record in transcript_records:
-        try:
-            # Count tool uses
-            if "tool_name" in record:
-                tool_name = record["tool_name"]
-                tool_counts[tool_name] = tool_counts.get(tool_name, 0) + 1
-
-            # Extract file operations
-            if "tool_input" in record and isinstance(record["tool_input"], dict):
-                if "file_path" in record["tool_input"]:
-                    file_operations.append(record["tool_input"]["file_path"])
-
-            # Extract error messages
-            if "error" in record:
-                error_messages.append(str(record["error"]))
-        except Exception as e:
-            # Skip records we can't process
-            continue
-
     episodic_record = {
         "session_id": session_id,
-        "timestamp": get_timestamp(),
+        "timestamp": timestamp or get_timestamp(),
         "project_path": project_path,
-        "git_branch": get_git_branch(),
+        "git_branch": get_git_branch(project_path) if git_branch is _UNSET else git_branch,
         "trigger": trigger,
         "encoding_mode": "jsonl_fallback",
 
@@ -367,7 +440,7 @@ def encode_from_jsonl(project_path: str, session_id: str, trigger: str) -> Optio
         "task_summary": f"Session with {valid_lines} transcript records",
         "work_summary": f"Used tools: {', '.join(tool_counts.keys()) if tool_counts else 'none detected'}",
         "design_decisions": [],
-        "challenges": error_messages[:5] if error_messages else [],
+        "challenges": error_messages,
         "solutions": [],
         "user_preferences": [],
         "code_patterns": [],
@@ -376,7 +449,7 @@ def encode_from_jsonl(project_path: str, session_id: str, trigger: str) -> Optio
         # Context metadata from transcript
         "context": {
             "technologies": [],
-            "files_modified": list(set(file_operations))[:20] if file_operations else [],
+            "files_modified": files_modified,
             "tools_used": list(tool_counts.keys()),
             "tool_counts": tool_counts
         },
@@ -400,6 +473,49 @@ def encode_from_jsonl(project_path: str, session_id: str, trigger: str) -> Optio
     return episodic_record
 
 
+def find_transcript(claude_dir: Path, project_path: str, session_id: str) -> Optional[Path]:
+    """
+    Locate the JSONL transcript for a session without walking the whole tree.
+
+    Checks the project's own transcript directory first, then falls back to
+    one directory listing of all projects, probing each for the exact
+    session filename.
+
+    Args:
+        claude_dir: Path to ~/.claude/projects
+        project_path: Path to project root
+        session_id: Session UUID
+
+    Returns:
+        Path to transcript file or None if not found
+    """
+    filename = f"{session_id}.jsonl"
+
+    # Claude Code names project directories after the absolute project path
+    # with every non-alphanumeric character replaced by "-"
+    project_slug = re.sub(r'[^A-Za-z0-9]', '-', os.path.abspath(project_path))
+    project_dir = claude_dir / project_slug
+
+    for candidate in (project_dir / filename, project_dir / "transcripts" / filename):
+        if candidate.is_file():
+            return candidate
+
+    # scandir entries know they are directories without another stat
+    try:
+        with os.scandir(claude_dir) as entries:
+            project_dirs = [entry.path for entry in entries if entry.is_dir()]
+    except OSError:
+        return None
+
+    for relative in (filename, os.path.join("transcripts", filename)):
+        for directory in project_dirs:
+            candidate = os.path.join(directory, relative)
+            if os.path.isfile(candidate):
+                return Path(candidate)
+
+    return None
+
+
 def main():
     """Main entry point for encode.py"""
     parser = argparse.ArgumentParser(
@@ -5,21 +5,76 @@ Analyzes episodic records to detect patterns, preferences, and anti-patterns
 """
 
 import argparse
+import hashlib
 import json
+import os
 import signal
 import sys
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config import load_config
-from json_handler import safe_load, safe_save
+from json_handler import (
+    iter_sessions, pending_sidecar_path, safe_load, safe_save, save_many, sidecar_path
+)
 from utils import ensure_directory, get_project_path, get_timestamp
 
 
+# Incremental extraction state (lives in the semantic directory)
+EXTRACT_STATE_FILE = "_extract_state.json"
+EXTRACT_STATE_VERSION = 3
+
+# Fingerprint of the episodic files and thresholds behind the current
+# semantic files (lives in the semantic directory)
+EXTRACT_CACHE_KEY_FILE = ".cache_key"
+
+# Pattern category → (episodic record field, pattern_id prefix)
+PATTERN_CATEGORIES = {
+    "preference": ("user_preferences", "pref"),
+    "code_pattern": ("code_patterns", "code"),
+    "anti_pattern": ("anti_patterns", "anti"),
+}
+
+# Session IDs kept as evidence per pattern (occurrences are counted separately)
+EVIDENCE_LIMIT = 10
+
+# Monthly files needed before parsing moves to worker processes
+PARALLEL_LOAD_MIN_FILES = 3
+
+# Per-month pattern summaries keyed by content hash (lives in the semantic
+# directory, used by rebuild_semantic)
+MONTH_INDEX_FILE = ".index.json"
+MONTH_INDEX_VERSION = 1
+
+
+# slots=True needs Python 3.10+; older interpreters get a plain dataclass
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_OPTIONS)
+class Pattern:
+    """
+    Detected pattern record.
+
+    Serialized directly by json_handler (no dict copy); use
+    dataclasses.asdict for a plain dict.
+    """
+    pattern_id: str
+    description: str
+    category: str
+    strength: str
+    occurrences: int
+    evidence: List[str]
+    detected_at: str
+
+
 # Timeout handling
 class ExtractionTimeoutError(Exception):
     """Raised when extraction exceeds timeout"""
@@ -31,40 +86,74 @@ def extraction_timeout_handler(signum, frame):
     raise ExtractionTimeoutError("Semantic extraction exceeded timeout limit")
 
 
-def extract_patterns(project_path: str, min_sessions: int = None, timeout: int = 60) -> bool:
+def extract_patterns(project_path: str, min_sessions: int = None, timeout: int = 60, full: bool = False) -> bool:
     """
     Extract semantic patterns from episodic records.
 
+    Evidence from previous runs is kept in semantic/_extract_state.json, so
+    only sessions not counted by an earlier run are scanned, and months whose
+    files did not change are not read. When no monthly file changed (name,
+    size, mtime) and the thresholds are the same as for the last successful
+    run, nothing is read at all.
+
     Args:
         project_path: Path to project root
         min_sessions: Minimum sessions before extraction (uses config if None)
         timeout: Maximum extraction time in seconds (default: 60)
+        full: Ignore saved extraction state and rescan every session
 
     Returns:
         True if successful, False otherwise
     """
+    # Cheap rejections first, so a no-op run never installs the alarm
+    pms_dir = Path(project_path) / ".claude" / "pms"
+    episodic_dir = pms_dir / "episodic"
+
+    if not episodic_dir.exists():
+        print("Error: No episodic records found - run /pms:encode first", file=sys.stderr)
+        return False
+
+    # Load configuration
+    config = load_config(project_path)
+    if min_sessions is None:
+        min_sessions = config.min_sessions
+
+    # Nothing changed since the last successful run - its output stands
+    semantic_dir = pms_dir / "semantic"
+    cache_key = extraction_cache_key(episodic_dir, config)
+    if not full and _read_cache_key(semantic_dir) == cache_key \
+            and (semantic_dir / "patterns.json").exists():
+        print("Semantic knowledge is up to date (no episodic changes since last extraction)")
+        return True
+
     # Set up timeout handler (Unix-like systems only)
     if hasattr(signal, 'SIGALRM'):
         signal.signal(signal.SIGALRM, extraction_timeout_handler)
         signal.alarm(timeout)
 
     try:
-        # Load configuration
-        config = load_config(project_path)
-        if min_sessions is None:
-            min_sessions = config.min_sessions
+        # One timestamp for every record written by this run
+        ts = get_timestamp()
 
-        # Load episodic records
-        pms_dir = Path(project_path) / ".claude" / "pms"
-        episodic_dir = pms_dir / "episodic"
+        state = new_extract_state() if full else load_extract_state(semantic_dir)
 
-        if not episodic_dir.exists():
-            print("Error: No episodic records found - run /pms:encode first", file=sys.stderr)
+        # Stream sessions from changed monthly files in a single counting
+        # pass, folding only sessions the saved state has not counted into it
+        # (corrupted files are skipped and collected)
+        corrupted_files = []
+        try:
+            session_count, counts, evidence = _scan_incremental(
+                _unconsumed_sessions(episodic_dir, corrupted_files, state),
+                state
+            )
+            ensure_directory(semantic_dir)
+            safe_save(str(semantic_dir / EXTRACT_STATE_FILE), state)
+        except Exception as e:
+            print(f"Error during pattern detection: {e}", file=sys.stderr)
+            if hasattr(signal, 'SIGALRM'):
+                signal.alarm(0)
             return False
 
-        # Load all sessions from monthly files with corruption handling
-        all_sessions, corrupted_files = load_all_sessions(episodic_dir)
-
         if corrupted_files:
             print(f"Warning: Skipped {len(corrupted_files)} corrupted file(s):", file=sys.stderr)
             for filepath in corrupted_files[:5]:  # Show first 5
@@ -73,9 +162,9 @@ def extract_patterns(project_path: str, min_sessions: int = None, timeout: int =
                 print(f"  ... and {len(corrupted_files) - 5} more", file=sys.stderr)
 
         # Check threshold
-        if len(all_sessions) < min_sessions:
+        if session_count < min_sessions:
             print(
-                f"Insufficient sessions ({len(all_sessions)}/{min_sessions}). "
+                f"Insufficient sessions ({session_count}/{min_sessions}). "
                 f"Continue working to accumulate more data.",
                 file=sys.stderr
             )
@@ -83,15 +172,17 @@ def extract_patterns(project_path: str, min_sessions: int = None, timeout: int =
                 signal.alarm(0)
             return False
 
-        print(f"Analyzing {len(all_sessions)} episodic records...")
+        print(f"Analyzing {session_count} episodic records...")
 
         # Frequency-based pattern detection
         try:
-            patterns = detect_frequency_patterns(
-                all_sessions,
+            patterns = _build_patterns(
+                counts,
+                evidence,
                 config.emerging_pattern,
                 config.strong_pattern,
-                config.critical_pattern
+                config.critical_pattern,
+                detected_at=ts
             )
         except Exception as e:
             print(f"Error during pattern detection: {e}", file=sys.stderr)
@@ -102,9 +193,9 @@ def extract_patterns(project_path: str, min_sessions: int = None, timeout: int =
         print(f"Detected {len(patterns)} patterns")
 
         # Categorize patterns
-        preferences = [p for p in patterns if p["category"] == "preference"]
-        code_patterns = [p for p in patterns if p["category"] == "code_pattern"]
-        anti_patterns = [p for p in patterns if p["category"] == "anti_pattern"]
+        preferences = [p for p in patterns if p.category == "preference"]
+        code_patterns = [p for p in patterns if p.category == "code_pattern"]
+        anti_patterns = [p for p in patterns if p.category == "anti_pattern"]
 
         print(f"  - {len(preferences)} preferences")
         print(f"  - {len(code_patterns)} code patterns")
@@ -116,10 +207,9 @@ def extract_patterns(project_path: str, min_sessions: int = None, timeout: int =
         # This ensures degraded but functional operation
 
         # Save semantic knowledge
-        semantic_dir = pms_dir / "semantic"
-        ensure_directory(semantic_dir)
-
-        save_result = save_semantic_knowledge(semantic_dir, patterns, preferences, code_patterns, anti_patterns)
+        save_result = save_semantic_knowledge(
+            semantic_dir, patterns, preferences, code_patterns, anti_patterns, ts=ts
+        )
         if not save_result:
             print("Error: Failed to save semantic knowledge", file=sys.stderr)
             if hasattr(signal, 'SIGALRM'):
@@ -128,6 +218,13 @@ def extract_patterns(project_path: str, min_sessions: int = None, timeout: int =
 
         print(f"✓ Semantic knowledge saved to {semantic_dir}")
 
+        # Taken before the scan, so files that changed during it are
+        # picked up next time (a failed write only costs a rescan)
+        try:
+            (semantic_dir / EXTRACT_CACHE_KEY_FILE).write_text(cache_key)
+        except OSError as e:
+            print(f"Warning: Could not save extraction cache key: {e}", file=sys.stderr)
+
         # Trigger procedural synthesis if auto enabled
         if config.auto_synthesize:
             print("Auto-synthesis enabled - triggering rule generation...")
@@ -135,7 +232,7 @@ def extract_patterns(project_path: str, min_sessions: int = None, timeout: int =
             print("(synthesis will be implemented in Task 6)")
         else:
             # Notify user to run manual synthesis
-            strong_pattern_count = sum(1 for p in patterns if p["strength"] == "strong" or p["strength"] == "critical")
+            strong_pattern_count = sum(1 for p in patterns if p.strength == "strong" or p.strength == "critical")
             if strong_pattern_count > 0:
                 print(f"\n{strong_pattern_count} strong patterns detected. Run /pms:synthesize to generate rules.")
 
@@ -179,190 +276,680 @@ def load_all_sessions(episodic_dir: Path) -> Tuple[List[Dict], List[str]]:
         - all_sessions: List of all valid session records
         - corrupted_files: List of filepaths that failed to load
     """
-    all_sessions = []
     corrupted_files = []
+    all_sessions = list(iter_all_sessions(episodic_dir, corrupted_files))
+    return all_sessions, corrupted_files
+
+
+def list_monthly_files(episodic_dir: Path) -> List[str]:
+    """
+    List monthly session files (sessions-*.json), oldest month first.
+
+    Args:
+        episodic_dir: Path to episodic directory
+
+    Returns:
+        Sorted file paths
+    """
+    with os.scandir(episodic_dir) as entries:
+        return sorted(
+            entry.path for entry in entries
+            if entry.name.startswith("sessions-")
+            and entry.name.endswith(".json")
+            and entry.is_file(follow_symlinks=False)
+        )
 
-    # Find all monthly files
-    for monthly_file in sorted(episodic_dir.glob("sessions-*.json")):
+
+def extraction_cache_key(episodic_dir: Path, config) -> str:
+    """
+    Fingerprint the inputs of an extraction without reading any session.
+
+    Args:
+        episodic_dir: Path to episodic directory
+        config: Loaded PMS config (pattern thresholds are part of the key)
+
+    Returns:
+        Hex digest over each monthly file's (and sidecars') name, size and
+        mtime plus the thresholds
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(
+        f"v{EXTRACT_STATE_VERSION}:{config.emerging_pattern}:"
+        f"{config.strong_pattern}:{config.critical_pattern}\n".encode()
+    )
+    for monthly_file in list_monthly_files(episodic_dir):
+        digest.update(month_signature(monthly_file).encode())
+    return digest.hexdigest()
+
+
+def month_signature(monthly_file: str) -> str:
+    """
+    Name, size and mtime of a monthly file and of its not yet compacted
+    sidecars (whose sessions are part of the month), one line per file.
+    """
+    lines = []
+    for path in (monthly_file, pending_sidecar_path(monthly_file), sidecar_path(monthly_file)):
         try:
-            data = safe_load(str(monthly_file), default=None)
+            st = os.stat(path)
+        except OSError:
+            continue
+        lines.append(f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}\n")
+    return "".join(lines)
 
-            # Check if file loaded successfully
-            if data is None:
-                corrupted_files.append(str(monthly_file))
-                print(f"Warning: Corrupted file: {monthly_file}", file=sys.stderr)
-                continue
 
-            # Validate structure
-            if "sessions" not in data:
-                corrupted_files.append(str(monthly_file))
-                print(f"Warning: Invalid structure (missing 'sessions' key): {monthly_file}", file=sys.stderr)
-                continue
+def _read_cache_key(semantic_dir: Path) -> Optional[str]:
+    """Return the saved extraction cache key (None if there is none)"""
+    try:
+        return (semantic_dir / EXTRACT_CACHE_KEY_FILE).read_text()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def iter_all_sessions(episodic_dir: Path, corrupted_files: List[str]) -> Iterator[Dict]:
+    """
+    Stream session records from all monthly files, oldest month first.
+
+    With more than PARALLEL_LOAD_MIN_FILES - 1 files, the files are parsed in
+    worker processes (each returns its whole month) and yielded in order.
+
+    Args:
+        episodic_dir: Path to episodic directory
+        corrupted_files: List that receives filepaths that failed to load
+
+    Yields:
+        Session records
+    """
+    monthly_files = list_monthly_files(episodic_dir)
+    for _, session in iter_monthly_sessions(monthly_files, corrupted_files):
+        yield session
 
-            # Validate sessions is a list
-            if not isinstance(data["sessions"], list):
-                corrupted_files.append(str(monthly_file))
-                print(f"Warning: Invalid structure ('sessions' not a list): {monthly_file}", file=sys.stderr)
-                continue
 
-            # Add valid sessions
-            all_sessions.extend(data["sessions"])
+def iter_monthly_sessions(
+    monthly_files: List[str],
+    corrupted_files: List[str]
+) -> Iterator[Tuple[str, Dict]]:
+    """
+    Stream (monthly_file, session) pairs from the given monthly files, in order.
+
+    With more than PARALLEL_LOAD_MIN_FILES - 1 files, the files are parsed in
+    worker processes (each returns its whole month) and yielded in order.
+
+    Args:
+        monthly_files: Paths to monthly sessions files
+        corrupted_files: List that receives filepaths that failed to load
 
+    Yields:
+        Tuples of (monthly_file, session record)
+    """
+    loaded = 0
+    if len(monthly_files) >= PARALLEL_LOAD_MIN_FILES:
+        try:
+            workers = min(len(monthly_files), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for monthly_file, (sessions, error) in zip(
+                    monthly_files, executor.map(_load_one_monthly, monthly_files)
+                ):
+                    loaded += 1
+                    if error is not None:
+                        corrupted_files.append(monthly_file)
+                        print(f"Warning: {error}: {monthly_file}", file=sys.stderr)
+                    for session in sessions:
+                        yield monthly_file, session
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            # No usable process pool here - parse the rest in-process
+            print(f"Warning: parallel load unavailable ({e}), continuing serially", file=sys.stderr)
+
+    for monthly_file in monthly_files[loaded:]:
+        try:
+            for session in iter_sessions(monthly_file):
+                yield monthly_file, session
         except Exception as e:
-            corrupted_files.append(str(monthly_file))
-            print(f"Warning: Error loading {monthly_file}: {e}", file=sys.stderr)
+            corrupted_files.append(monthly_file)
+            print(f"Warning: {e}: {monthly_file}", file=sys.stderr)
             continue
 
-    return all_sessions, corrupted_files
+
+def _load_one_monthly(monthly_file: str) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Parse one monthly file (runs in a worker process).
+
+    Args:
+        monthly_file: Path to monthly sessions file
+
+    Returns:
+        Tuple of (sessions, error) - error is None on success
+    """
+    sessions = []
+    try:
+        sessions.extend(iter_sessions(monthly_file))
+    except Exception as e:
+        return sessions, str(e)
+    return sessions, None
+
+
+def _scan_one_monthly(
+    monthly_file: str
+) -> Tuple[int, Dict[str, Dict[str, int]], Dict[str, Dict[str, List[str]]], Optional[str]]:
+    """
+    Summarize one monthly file into per-category counts (may run in a worker process).
+
+    Only the frequency tables travel back to the caller, not the sessions.
+    A file that breaks part way still contributes the sessions before the damage.
+
+    Args:
+        monthly_file: Path to monthly sessions file
+
+    Returns:
+        Tuple of (session_count, counts, evidence, error) - error is None on success
+    """
+    errors = []
+
+    def guarded():
+        try:
+            yield from iter_sessions(monthly_file)
+        except Exception as e:
+            errors.append(str(e))
+
+    session_count, counts, evidence = _scan_sessions(guarded(), EVIDENCE_LIMIT)
+    counts = {category: dict(counter) for category, counter in counts.items()}
+    return session_count, counts, evidence, errors[0] if errors else None
+
+
+def new_extract_state() -> Dict:
+    """Return empty incremental extraction state"""
+    return {
+        "version": EXTRACT_STATE_VERSION,
+        "months": {},
+        "session_count": 0,
+        "counts": {category: {} for category in PATTERN_CATEGORIES},
+        "evidence": {category: {} for category in PATTERN_CATEGORIES}
+    }
+
+
+def load_extract_state(semantic_dir: Path) -> Dict:
+    """
+    Load incremental extraction state, or empty state if missing/unusable.
+
+    Args:
+        semantic_dir: Path to semantic directory
+
+    Returns:
+        State dict (see new_extract_state)
+    """
+    state = safe_load(str(semantic_dir / EXTRACT_STATE_FILE), default=None)
+
+    if not isinstance(state, dict) or state.get("version") != EXTRACT_STATE_VERSION:
+        return new_extract_state()
+
+    if not isinstance(state.get("months"), dict):
+        return new_extract_state()
+
+    for key in ("counts", "evidence"):
+        if not isinstance(state.get(key), dict) or any(
+            not isinstance(state[key].get(c), dict) for c in PATTERN_CATEGORIES
+        ):
+            return new_extract_state()
+
+    return state
+
+
+def _unconsumed_sessions(
+    episodic_dir: Path,
+    corrupted_files: List[str],
+    state: Dict
+) -> Iterator[Dict]:
+    """
+    Stream the sessions the extraction state has not counted yet.
+
+    state["months"] maps each monthly file name to its month_signature when
+    last read and "consumed": how many records of each session (session_id
+    and timestamp) were counted. Months whose signature is unchanged are not
+    read. In the others, a record is new when its session has more records
+    than were consumed; the consumed counts only ever grow, so a session is
+    counted exactly once whenever it arrives (late saves and sessions that
+    come back from an interrupted compaction included).
+
+    Args:
+        episodic_dir: Path to episodic directory
+        corrupted_files: List that receives filepaths that failed to load
+        state: Extraction state, its "months" updated in place
+
+    Yields:
+        Session records not yet counted
+    """
+    months = state["months"]
+
+    # Signatures are taken before reading: a file that changes meanwhile is
+    # read again next run
+    changed = []
+    for monthly_file in list_monthly_files(episodic_dir):
+        name = os.path.basename(monthly_file)
+        sig = month_signature(monthly_file)
+        entry = months.get(name)
+        if not isinstance(entry, dict) or not isinstance(entry.get("consumed"), dict):
+            entry = months[name] = {"sig": None, "consumed": {}}
+        if entry["sig"] != sig:
+            changed.append((monthly_file, entry, sig))
+
+    if not changed:
+        return
+
+    entries = {monthly_file: (entry, sig) for monthly_file, entry, sig in changed}
+    seen = {monthly_file: Counter() for monthly_file in entries}
+    for monthly_file, session in iter_monthly_sessions(list(entries), corrupted_files):
+        consumed = entries[monthly_file][0]["consumed"]
+        key = _consumed_key(session)
+        count = seen[monthly_file][key] = seen[monthly_file][key] + 1
+        if count > consumed.get(key, 0):
+            consumed[key] = count
+            yield session
+
+    for entry, sig in entries.values():
+        entry["sig"] = sig
+
+
+def _consumed_key(session: Dict) -> str:
+    """Session identity (session_id and timestamp) as a JSON object key"""
+    return f"{session.get('session_id')}\t{session.get('timestamp')}"
+
+
+def _scan_incremental(
+    sessions: Iterable[Dict],
+    state: Dict
+) -> Tuple[int, Dict[str, Dict[str, int]], Dict[str, Dict[str, List[str]]]]:
+    """
+    Fold new sessions into the state and return combined evidence.
+
+    Args:
+        sessions: Iterable of sessions not yet counted (consumed once)
+        state: Extraction state, updated in place
+
+    Returns:
+        Tuple of (total_session_count, counts, evidence), both by category
+    """
+    new_count, new_counts, new_evidence = _scan_sessions(sessions, EVIDENCE_LIMIT)
+    state["session_count"] += new_count
+    for category in PATTERN_CATEGORIES:
+        _merge_evidence(
+            state["counts"][category], state["evidence"][category],
+            new_counts[category], new_evidence[category]
+        )
+
+    return state["session_count"], state["counts"], state["evidence"]
+
+
+def _merge_evidence(
+    target_counts: Dict[str, int],
+    target_evidence: Dict[str, List[str]],
+    counts: Dict[str, int],
+    evidence: Dict[str, List[str]]
+) -> None:
+    """Add counts and append evidence (up to EVIDENCE_LIMIT) onto targets, in place"""
+    for description, count in counts.items():
+        target_counts[description] = target_counts.get(description, 0) + count
+        kept = target_evidence.setdefault(description, [])
+        room = EVIDENCE_LIMIT - len(kept)
+        if room > 0:
+            kept.extend(evidence.get(description, [])[:room])
+
+
+def _scan_sessions(
+    sessions: Iterable[Dict],
+    evidence_limit: Optional[int] = None,
+    categories: Iterable[str] = PATTERN_CATEGORIES
+) -> Tuple[int, Dict[str, Counter], Dict[str, Dict[str, List[str]]]]:
+    """
+    Collect evidence for all three pattern categories in one pass.
+
+    Args:
+        sessions: Iterable of episodic records (may be a stream)
+        evidence_limit: Max session IDs kept per description (None: keep all)
+        categories: Categories to scan; the others come back empty
+
+    Returns:
+        Tuple of (session_count, counts, evidence), both keyed by category:
+        counts maps description → occurrences, evidence maps
+        description → list of session IDs
+    """
+    counts = {category: Counter() for category in PATTERN_CATEGORIES}
+    evidence = {category: defaultdict(list) for category in PATTERN_CATEGORIES}
+    fields = tuple(
+        (PATTERN_CATEGORIES[category][0], counts[category], evidence[category])
+        for category in categories
+    )
+
+    limit = evidence_limit if evidence_limit is not None else float("inf")
+
+    session_count = 0
+    for session in sessions:
+        session_count += 1
+        session_id = session.get("session_id", "unknown")
+        if isinstance(session_id, str):
+            # Interned: the same ID is shared by every category's evidence
+            session_id = sys.intern(session_id)
+
+        for field, field_counts, field_evidence in fields:
+            if field in session:
+                for item in session[field]:
+                    description = _desc(item)
+                    if description is None:
+                        continue
+
+                    # Descriptions repeat across sessions; intern to keep
+                    # one copy per key and make lookups pointer-compares
+                    description = sys.intern(description)
+
+                    # The counter is the occurrence total; it also decides
+                    # when the evidence list has enough examples
+                    field_counts[description] += 1
+                    if field_counts[description] <= limit:
+                        field_evidence[description].append(session_id)
+
+    return session_count, counts, {c: dict(e) for c, e in evidence.items()}
+
+
+def _desc(item) -> Optional[str]:
+    """Return a pattern item's description (plain string or {"description": ...})"""
+    # Exact type checks: JSON only produces plain str/dict, and `type(x) is`
+    # is cheaper than isinstance in this per-item loop
+    item_type = type(item)
+    if item_type is str:
+        return item
+    if item_type is dict:
+        description = item.get("description")
+        if type(description) is str:
+            return description
+    return None
 
 
 def detect_frequency_patterns(
-    sessions: List[Dict],
+    sessions: Iterable[Dict],
     emerging_threshold: int,
     strong_threshold: int,
-    critical_threshold: int
-) -> List[Dict]:
+    critical_threshold: int,
+    detected_at: Optional[str] = None
+) -> List[Pattern]:
     """
     Detect patterns based on frequency of occurrences.
 
     Args:
-        sessions: List of episodic records
+        sessions: Iterable of episodic records (consumed once)
         emerging_threshold: Min occurrences for emerging pattern (default: 2)
         strong_threshold: Min occurrences for strong pattern (default: 3)
         critical_threshold: Min occurrences for critical pattern (default: 5)
+        detected_at: Timestamp for every pattern (default: now)
 
     Returns:
         List of detected patterns with evidence
     """
-    patterns = []
+    return detect_frequency_patterns_stream(
+        sessions,
+        emerging_threshold,
+        strong_threshold,
+        critical_threshold,
+        detected_at
+    )[1]
 
-    # Extract user preferences
-    preferences = extract_user_preferences(sessions)
-    for pref_description, evidence in preferences.items():
-        occurrences = len(evidence)
-        if occurrences >= emerging_threshold:
-            strength = categorize_strength(occurrences, emerging_threshold, strong_threshold, critical_threshold)
-            patterns.append({
-                "pattern_id": f"pref_{hash(pref_description) % 1000000}",
-                "description": pref_description,
-                "category": "preference",
-                "strength": strength,
-                "occurrences": occurrences,
-                "evidence": evidence[:10],  # Limit evidence to 10 examples
-                "detected_at": get_timestamp()
-            })
-
-    # Extract code patterns
-    code_patterns_data = extract_code_patterns(sessions)
-    for pattern_description, evidence in code_patterns_data.items():
-        occurrences = len(evidence)
-        if occurrences >= emerging_threshold:
-            strength = categorize_strength(occurrences, emerging_threshold, strong_threshold, critical_threshold)
-            patterns.append({
-                "pattern_id": f"code_{hash(pattern_description) % 1000000}",
-                "description": pattern_description,
-                "category": "code_pattern",
-                "strength": strength,
-                "occurrences": occurrences,
-                "evidence": evidence[:10],
-                "detected_at": get_timestamp()
-            })
-
-    # Extract anti-patterns
-    anti_patterns_data = extract_anti_patterns(sessions)
-    for anti_description, evidence in anti_patterns_data.items():
-        occurrences = len(evidence)
-        if occurrences >= emerging_threshold:
-            strength = categorize_strength(occurrences, emerging_threshold, strong_threshold, critical_threshold)
-            patterns.append({
-                "pattern_id": f"anti_{hash(anti_description) % 1000000}",
-                "description": anti_description,
-                "category": "anti_pattern",
-                "strength": strength,
-                "occurrences": occurrences,
-                "evidence": evidence[:10],
-                "detected_at": get_timestamp()
-            })
 
-    return patterns
+def detect_frequency_patterns_stream(
+    sessions: Iterable[Dict],
+    emerging_threshold: int,
+    strong_threshold: int,
+    critical_threshold: int,
+    detected_at: Optional[str] = None
+) -> Tuple[int, List[Pattern]]:
+    """
+    Detect patterns from a session stream, also reporting how many were seen.
+
+    Counters are updated as each session is yielded, so memory stays
+    proportional to the number of distinct patterns, not sessions.
+
+    Args:
+        sessions: Iterable of episodic records (consumed once)
+        emerging_threshold: Min occurrences for emerging pattern
+        strong_threshold: Min occurrences for strong pattern
+        critical_threshold: Min occurrences for critical pattern
+        detected_at: Timestamp for every pattern (default: now)
+
+    Returns:
+        Tuple of (session_count, patterns)
+    """
+    session_count, counts, evidence = _scan_sessions(sessions, EVIDENCE_LIMIT)
+    patterns = _build_patterns(
+        counts,
+        evidence,
+        emerging_threshold,
+        strong_threshold,
+        critical_threshold,
+        detected_at
+    )
+    return session_count, patterns
 
 
-def extract_user_preferences(sessions: List[Dict]) -> Dict[str, List[str]]:
+def detect_patterns_by_month(
+    episodic_dir: Path,
+    corrupted_files: List[str],
+    month_index: Dict,
+    emerging_threshold: int,
+    strong_threshold: int,
+    critical_threshold: int,
+    detected_at: Optional[str] = None
+) -> Tuple[int, List[Pattern], Dict]:
     """
-    Extract user preferences from episodic records.
+    Detect patterns from per-month summaries, re-parsing only changed months.
+
+    Each monthly file is hashed (blake2b, together with its JSONL sidecars);
+    when the hash matches its entry in month_index the cached counts and
+    evidence are reused, otherwise the file is parsed again. Summaries are
+    merged oldest month first, so the result matches a full scan of every
+    session.
 
     Args:
-        sessions: List of episodic records
+        episodic_dir: Path to episodic directory
+        corrupted_files: List that receives filepaths that failed to load
+        month_index: Previous index from MONTH_INDEX_FILE ({} for none)
+        emerging_threshold: Min occurrences for emerging pattern
+        strong_threshold: Min occurrences for strong pattern
+        critical_threshold: Min occurrences for critical pattern
+        detected_at: Timestamp for every pattern (default: now)
 
     Returns:
-        Dict mapping preference description → list of session IDs (evidence)
+        Tuple of (session_count, patterns, new_month_index)
     """
-    preferences = defaultdict(list)
+    cached = {}
+    if month_index.get("version") == MONTH_INDEX_VERSION:
+        cached = month_index.get("months", {})
+
+    # Step 1: Hash every month, reusing summaries whose content is unchanged
+    months = []
+    stale = []
+    for monthly_file in list_monthly_files(episodic_dir):
+        try:
+            digest = hashlib.blake2b()
+            with open(monthly_file, 'rb') as f:
+                digest.update(f.read())
+            # Sessions still in the month's JSONL sidecars are part of it
+            for tag, path in (
+                (b"\0pending\0", pending_sidecar_path(monthly_file)),
+                (b"\0sidecar\0", sidecar_path(monthly_file)),
+            ):
+                try:
+                    with open(path, 'rb') as f:
+                        digest.update(tag)
+                        digest.update(f.read())
+                except FileNotFoundError:
+                    pass
+            sig = digest.hexdigest()
+        except OSError as e:
+            corrupted_files.append(monthly_file)
+            print(f"Warning: {e}: {monthly_file}", file=sys.stderr)
+            continue
 
-    for session in sessions:
-        session_id = session.get("session_id", "unknown")
+        name = os.path.basename(monthly_file)
+        entry = cached.get(name)
+        if entry is None or entry.get("sig") != sig:
+            entry = {"sig": sig}
+            stale.append((monthly_file, entry))
+        months.append((name, entry))
 
-        # Extract from user_preferences field
-        if "user_preferences" in session:
-            for pref in session["user_preferences"]:
-                if isinstance(pref, str):
-                    preferences[pref].append(session_id)
-                elif isinstance(pref, dict) and "description" in pref:
-                    preferences[pref["description"]].append(session_id)
+    # Step 2: Summarize changed months (in worker processes when there are several)
+    summaries = None
+    if len(stale) >= PARALLEL_LOAD_MIN_FILES:
+        try:
+            workers = min(len(stale), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                summaries = list(executor.map(_scan_one_monthly, [f for f, _ in stale]))
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            print(f"Warning: parallel load unavailable ({e}), continuing serially", file=sys.stderr)
+    if summaries is None:
+        summaries = [_scan_one_monthly(f) for f, _ in stale]
+
+    broken = set()
+    for (monthly_file, entry), (count, counts, evidence, error) in zip(stale, summaries):
+        entry.update(session_count=count, counts=counts, evidence=evidence)
+        if error is not None:
+            corrupted_files.append(monthly_file)
+            broken.add(os.path.basename(monthly_file))
+            print(f"Warning: {error}: {monthly_file}", file=sys.stderr)
+
+    # Step 3: Merge summaries in month order
+    session_count = 0
+    counts = {category: {} for category in PATTERN_CATEGORIES}
+    evidence = {category: {} for category in PATTERN_CATEGORIES}
+    for _, entry in months:
+        session_count += entry["session_count"]
+        for category in PATTERN_CATEGORIES:
+            _merge_evidence(
+                counts[category],
+                evidence[category],
+                entry["counts"].get(category, {}),
+                entry["evidence"].get(category, {})
+            )
+
+    patterns = _build_patterns(
+        counts,
+        evidence,
+        emerging_threshold,
+        strong_threshold,
+        critical_threshold,
+        detected_at
+    )
 
-    return dict(preferences)
+    # Corrupted months are left out so the next rebuild reports them again
+    new_index = {
+        "version": MONTH_INDEX_VERSION,
+        "months": {name: entry for name, entry in months if name not in broken},
+    }
+    return session_count, patterns, new_index
 
 
-def extract_code_patterns(sessions: List[Dict]) -> Dict[str, List[str]]:
+def _build_patterns(
+    counts: Dict[str, Dict[str, int]],
+    evidence: Dict[str, Dict[str, List[str]]],
+    emerging_threshold: int,
+    strong_threshold: int,
+    critical_threshold: int,
+    detected_at: Optional[str] = None
+) -> List[Pattern]:
     """
-    Extract code patterns from episodic records.
+    Turn per-category counts into pattern records above the emerging threshold.
 
     Args:
-        sessions: List of episodic records
+        counts: Category → description → occurrences
+        evidence: Category → description → example session IDs
+        emerging_threshold: Min occurrences for emerging pattern
+        strong_threshold: Min occurrences for strong pattern
+        critical_threshold: Min occurrences for critical pattern
+        detected_at: Timestamp for every pattern (default: now)
 
     Returns:
-        Dict mapping pattern description → list of session IDs (evidence)
+        List of detected patterns with evidence
     """
-    code_patterns = defaultdict(list)
+    if detected_at is None:
+        detected_at = get_timestamp()
 
-    for session in sessions:
-        session_id = session.get("session_id", "unknown")
+    patterns = []
 
-        # Extract from code_patterns field
-        if "code_patterns" in session:
-            for pattern in session["code_patterns"]:
-                if isinstance(pattern, str):
-                    code_patterns[pattern].append(session_id)
-                elif isinstance(pattern, dict) and "description" in pattern:
-                    code_patterns[pattern["description"]].append(session_id)
+    for category, (_, id_prefix) in PATTERN_CATEGORIES.items():
+        category_evidence = evidence[category]
+        for description, occurrences in counts[category].items():
+            if occurrences >= emerging_threshold:
+                # Inlined categorize_strength: "weak" is already filtered out
+                strength = (
+                    "critical" if occurrences >= critical_threshold
+                    else "strong" if occurrences >= strong_threshold
+                    else "emerging"
+                )
+                patterns.append(Pattern(
+                    pattern_id=pattern_id(id_prefix, description),
+                    description=description,
+                    category=category,
+                    strength=strength,
+                    occurrences=occurrences,
+                    evidence=category_evidence[description][:EVIDENCE_LIMIT],
+                    detected_at=detected_at
+                ))
 
-    return dict(code_patterns)
+    return patterns
 
 
-def extract_anti_patterns(sessions: List[Dict]) -> Dict[str, List[str]]:
+def pattern_id(prefix: str, description: str) -> str:
     """
-    Extract anti-patterns (mistakes to avoid) from episodic records.
+    Derive a stable pattern ID from its description.
+
+    hash() is salted per process, so IDs built from it changed between runs.
 
     Args:
-        sessions: List of episodic records
+        prefix: Category prefix (pref, code, anti)
+        description: Pattern description
 
     Returns:
-        Dict mapping anti-pattern description → list of session IDs (evidence)
+        ID such as "pref_3f2a9c01b7e4" (48-bit blake2b digest)
     """
-    anti_patterns = defaultdict(list)
+    digest = hashlib.blake2b(str(description).encode("utf-8"), digest_size=6).hexdigest()
+    return f"{prefix}_{digest}"
 
-    for session in sessions:
-        session_id = session.get("session_id", "unknown")
 
-        # Extract from anti_patterns field
-        if "anti_patterns" in session:
-            for anti in session["anti_patterns"]:
-                if isinstance(anti, str):
-                    anti_patterns[anti].append(session_id)
-                elif isinstance(anti, dict) and "description" in anti:
-                    anti_patterns[anti["description"]].append(session_id)
+def extract_user_preferences(sessions: Iterable[Dict]) -> Dict[str, List[str]]:
+    """
+    Extract user preferences from episodic records.
+    Prefer _scan_sessions when more than one category is needed.
+
+    Args:
+        sessions: Iterable of episodic records
+
+    Returns:
+        Dict mapping preference description → list of session IDs (evidence)
+    """
+    return _scan_sessions(sessions, categories=("preference",))[2]["preference"]
+
+
+def extract_code_patterns(sessions: Iterable[Dict]) -> Dict[str, List[str]]:
+    """
+    Extract code patterns from episodic records.
+    Prefer _scan_sessions when more than one category is needed.
+
+    Args:
+        sessions: Iterable of episodic records
 
-    return dict(anti_patterns)
+    Returns:
+        Dict mapping pattern description → list of session IDs (evidence)
+    """
+    return _scan_sessions(sessions, categories=("code_pattern",))[2]["code_pattern"]
+
+
+def extract_anti_patterns(sessions: Iterable[Dict]) -> Dict[str, List[str]]:
+    """
+    Extract anti-patterns (mistakes to avoid) from episodic records.
+    Prefer _scan_sessions when more than one category is needed.
+
+    Args:
+        sessions: Iterable of episodic records
+
+    Returns:
+        Dict mapping anti-pattern description → list of session IDs (evidence)
+    """
+    return _scan_sessions(sessions, categories=("anti_pattern",))[2]["anti_pattern"]
 
 
 def categorize_strength(
@@ -398,7 +985,8 @@ def save_semantic_knowledge(
     all_patterns: List[Dict],
     preferences: List[Dict],
     code_patterns: List[Dict],
-    anti_patterns: List[Dict]
+    anti_patterns: List[Dict],
+    ts: Optional[str] = None
 ) -> bool:
     """
     Save semantic knowledge to JSON files.
@@ -409,60 +997,41 @@ def save_semantic_knowledge(
         preferences: User preference patterns
         code_patterns: Code pattern patterns
         anti_patterns: Anti-pattern patterns
+        ts: Timestamp for every file's last_updated (default: now)
 
     Returns:
-        True if successful
+        True if successful, False otherwise
     """
-    try:
-        # Save all patterns
-        patterns_file = semantic_dir / "patterns.json"
-        safe_save(
-            str(patterns_file),
-            {
-                "patterns": all_patterns,
-                "count": len(all_patterns),
-                "last_updated": get_timestamp()
-            }
-        )
-
-        # Save preferences
-        preferences_file = semantic_dir / "preferences.json"
-        safe_save(
-            str(preferences_file),
-            {
-                "preferences": preferences,
-                "count": len(preferences),
-                "last_updated": get_timestamp()
-            }
-        )
-
-        # Save code patterns
-        code_patterns_file = semantic_dir / "code-patterns.json"
-        safe_save(
-            str(code_patterns_file),
-            {
-                "code_patterns": code_patterns,
-                "count": len(code_patterns),
-                "last_updated": get_timestamp()
-            }
-        )
-
-        # Save anti-patterns
-        anti_patterns_file = semantic_dir / "anti-patterns.json"
-        safe_save(
-            str(anti_patterns_file),
-            {
-                "anti_patterns": anti_patterns,
-                "count": len(anti_patterns),
-                "last_updated": get_timestamp()
-            }
-        )
-
-        return True
-
-    except Exception as e:
-        print(f"Error saving semantic knowledge: {e}", file=sys.stderr)
-        return False
+    if ts is None:
+        ts = get_timestamp()
+
+    # Stage all four files, then rename them together
+    saved = save_many([
+        (str(semantic_dir / "patterns.json"), {
+            "patterns": all_patterns,
+            "count": len(all_patterns),
+            "last_updated": ts
+        }),
+        (str(semantic_dir / "preferences.json"), {
+            "preferences": preferences,
+            "count": len(preferences),
+            "last_updated": ts
+        }),
+        (str(semantic_dir / "code-patterns.json"), {
+            "code_patterns": code_patterns,
+            "count": len(code_patterns),
+            "last_updated": ts
+        }),
+        (str(semantic_dir / "anti-patterns.json"), {
+            "anti_patterns": anti_patterns,
+            "count": len(anti_patterns),
+            "last_updated": ts
+        }),
+    ])
+
+    if not saved:
+        print("Error saving semantic knowledge", file=sys.stderr)
+    return saved
 
 
 def main():
@@ -483,13 +1052,19 @@ def main():
         help="Minimum sessions before extraction (uses config if not specified)"
     )
 
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore saved extraction state and rescan all sessions"
+    )
+
     args = parser.parse_args()
 
     # Determine project path
     project_path = args.project_path or get_project_path()
 
     # Extract patterns
-    success = extract_patterns(project_path, args.min_sessions)
+    success = extract_patterns(project_path, args.min_sessions, full=args.full)
 
     sys.exit(0 if success else 1)
 
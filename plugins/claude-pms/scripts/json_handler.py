@@ -3,11 +3,47 @@ Safe JSON handling for Claude PMS
 Atomic writes, corruption handling, and schema validation
 """
 
+import contextlib
+import dataclasses
 import json
+import mmap
 import os
-import shutil
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    # orjson is optional - stdlib json is used when it is not installed
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # fcntl is POSIX-only; without it compactions of a month are not serialized
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    # ijson is optional - monthly files are loaded whole when it is not installed
+    import ijson
+except ImportError:
+    ijson = None
+
+from utils import io_executor, parse_jsonl
+
+
+# Files smaller than this are read() rather than memory-mapped
+_MMAP_MIN_SIZE = 64 * 1024
+
+# Bytes per read() when streaming monthly files through ijson (its default
+# is 64 KiB); scans are sequential, so larger reads mean fewer syscalls
+STREAM_READ_BUFSIZE = 1 << 20
+
+# Sessions added to an existing month are appended to its JSONL sidecar
+# (sessions-YYYY-MM.jsonl) and folded into the monthly file once the
+# sidecar reaches this size
+SIDECAR_COMPACT_BYTES = 256 * 1024
 
 
 def safe_load(filepath: str, default: Any = None) -> Any:
@@ -23,8 +59,8 @@ def safe_load(filepath: str, default: Any = None) -> Any:
         Loaded JSON data or default value
     """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(filepath, 'rb') as f:
+            return _load_mapped(f)
     except FileNotFoundError:
         return default if default is not None else {}
     except json.JSONDecodeError as e:
@@ -40,9 +76,132 @@ def safe_load(filepath: str, default: Any = None) -> Any:
         return default if default is not None else {}
 
 
+def sidecar_path(monthly_filepath: str) -> str:
+    """Return the JSONL sidecar path for a monthly sessions file"""
+    return os.path.splitext(monthly_filepath)[0] + ".jsonl"
+
+
+def pending_sidecar_path(monthly_filepath: str) -> str:
+    """Return the path a sidecar is renamed to while compact_month folds it in"""
+    return sidecar_path(monthly_filepath) + ".compacting"
+
+
+def iter_sessions(filepath: str) -> Iterator[Any]:
+    """
+    Yield session records from a monthly episodic file one at a time,
+    followed by the sessions still waiting in its JSONL sidecars: first the
+    one an unfinished compaction left behind, then the current one.
+
+    The sidecars are read before the monthly file, so a compaction running
+    meanwhile cannot move sessions past the reader. Sidecar sessions already
+    in the monthly file (same session_id and timestamp) are skipped, as in
+    compact_month. A corrupted monthly file does not hide the sidecars: its
+    error is raised after their sessions.
+
+    Args:
+        filepath: Path to monthly sessions file
+
+    Yields:
+        Session records
+
+    Raises:
+        ValueError: If the monthly file is corrupted or has an invalid structure
+    """
+    # Sessions move sidecar -> pending -> monthly file; read against that flow
+    current = list(parse_jsonl(sidecar_path(filepath)))
+    pending = list(parse_jsonl(pending_sidecar_path(filepath)))
+
+    present = set()
+    error = None
+    try:
+        if pending or current:
+            for session in _iter_monthly_file(filepath):
+                if isinstance(session, dict):
+                    present.add(_session_key(session))
+                yield session
+        else:
+            yield from _iter_monthly_file(filepath)
+    except ValueError as e:
+        error = e
+
+    for records in (pending, current):
+        records = _not_merged(records, present)
+        yield from records
+        present.update(_session_key(r) for r in records if isinstance(r, dict))
+
+    if error is not None:
+        raise error
+
+
+def _session_key(record: Dict) -> Tuple[Any, Any]:
+    """Identity of a session record for duplicate checks"""
+    return (record.get("session_id"), record.get("timestamp"))
+
+
+def _not_merged(records: List[Any], present: set) -> List[Any]:
+    """Records whose (session_id, timestamp) is not in present (non-dicts are kept)"""
+    if not present:
+        return records
+    return [
+        r for r in records
+        if not isinstance(r, dict) or _session_key(r) not in present
+    ]
+
+
+def _iter_monthly_file(filepath: str) -> Iterator[Any]:
+    """
+    Yield session records from the monthly JSON file itself.
+
+    With ijson installed the "sessions" array is streamed, so only one
+    session is held in memory. A file that streams no sessions (empty,
+    missing key, wrong type, corrupted) goes through safe_load instead,
+    which repairs it or reports the problem.
+    Streaming cannot take back sessions already yielded, so a file that is
+    truncated part way contributes the sessions before the damage.
+
+    Args:
+        filepath: Path to monthly sessions file
+
+    Yields:
+        Session records
+
+    Raises:
+        ValueError: If the file is corrupted or has an invalid structure
+    """
+    if ijson is not None:
+        streamed = 0
+        try:
+            with open(filepath, 'rb') as f:
+                sessions = ijson.items(
+                    f, 'sessions.item', buf_size=STREAM_READ_BUFSIZE, use_float=True
+                )
+                for session in sessions:
+                    streamed += 1
+                    yield session
+        except ijson.JSONError as e:
+            if streamed:
+                reason = str(e).splitlines()[0] if str(e) else type(e).__name__
+                raise ValueError(f"Corrupted file after {streamed} sessions: {reason}")
+            # Nothing yielded yet - let safe_load attempt its repair
+        if streamed:
+            return
+
+    data = safe_load(filepath, default=None)
+
+    if data is None:
+        raise ValueError("Corrupted file")
+    if not isinstance(data, dict) or "sessions" not in data:
+        raise ValueError("Invalid structure (missing 'sessions' key)")
+    if not isinstance(data["sessions"], list):
+        raise ValueError("Invalid structure ('sessions' not a list)")
+
+    yield from data["sessions"]
+
+
 def safe_save(filepath: str, data: Any, indent: int = 2, max_retries: int = 3) -> bool:
     """
     Safely save JSON file using atomic write (temp file + rename) with retry logic.
+    Set PMS_VERIFY_JSON=1 to re-read and parse the temp file before renaming.
 
     Args:
         filepath: Path to JSON file
@@ -53,8 +212,6 @@ def safe_save(filepath: str, data: Any, indent: int = 2, max_retries: int = 3) -
     Returns:
         True if successful, False otherwise
     """
-    import time
-
     for attempt in range(max_retries):
         try:
             # Ensure directory exists
@@ -62,28 +219,22 @@ def safe_save(filepath: str, data: Any, indent: int = 2, max_retries: int = 3) -
 
             # Write to temporary file first
             temp_filepath = f"{filepath}.tmp"
-            with open(temp_filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=indent, ensure_ascii=False)
+            with open(temp_filepath, 'wb') as f:
+                f.write(_dumps(data, indent))
                 f.flush()
                 os.fsync(f.fileno())
 
-            # Verify temp file was written successfully
-            if not os.path.exists(temp_filepath):
-                raise Exception("Temp file creation failed")
-
-            # Verify temp file is readable and valid JSON
-            try:
-                with open(temp_filepath, 'r', encoding='utf-8') as f:
-                    json.load(f)
-            except json.JSONDecodeError as e:
-                raise Exception(f"Generated invalid JSON: {e}")
+            # Serializing in-memory data cannot produce invalid JSON, so the
+            # read-back check only runs when explicitly requested
+            if os.environ.get("PMS_VERIFY_JSON") == "1":
+                try:
+                    with open(temp_filepath, 'rb') as f:
+                        _loads(f.read())
+                except json.JSONDecodeError as e:
+                    raise Exception(f"Generated invalid JSON: {e}")
 
             # Atomic rename
-            shutil.move(temp_filepath, filepath)
-
-            # Verify final file exists
-            if not os.path.exists(filepath):
-                raise Exception("Final file not created after rename")
+            os.replace(temp_filepath, filepath)
 
             return True
 
@@ -95,9 +246,8 @@ def safe_save(filepath: str, data: Any, indent: int = 2, max_retries: int = 3) -
 
                 # Clean up temp file if it exists
                 try:
-                    if os.path.exists(f"{filepath}.tmp"):
-                        os.remove(f"{filepath}.tmp")
-                except Exception:
+                    os.remove(f"{filepath}.tmp")
+                except OSError:
                     pass
             else:
                 # Final attempt failed
@@ -105,9 +255,8 @@ def safe_save(filepath: str, data: Any, indent: int = 2, max_retries: int = 3) -
 
                 # Clean up temp file if it exists
                 try:
-                    if os.path.exists(f"{filepath}.tmp"):
-                        os.remove(f"{filepath}.tmp")
-                except Exception:
+                    os.remove(f"{filepath}.tmp")
+                except OSError:
                     pass
 
                 return False
@@ -115,6 +264,54 @@ def safe_save(filepath: str, data: Any, indent: int = 2, max_retries: int = 3) -
     return False
 
 
+def _loads(data: Any) -> Any:
+    """Parse JSON from str or bytes (orjson when available)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _load_mapped(f) -> Any:
+    """
+    Parse an open binary file through a read-only memory map.
+    orjson reads the mapping directly, so large monthly files are never
+    copied into an intermediate bytes object.
+    """
+    if orjson is None or os.fstat(f.fileno()).st_size < _MMAP_MIN_SIZE:
+        # stdlib json needs a contiguous copy; for small files one read()
+        # is cheaper than setting up and tearing down a mapping
+        return _loads(f.read())
+
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            return orjson.loads(view)
+        finally:
+            view.release()
+
+
+def _dumps(data: Any, indent: int = 2) -> bytes:
+    """
+    Serialize to UTF-8 JSON bytes (orjson when available).
+    orjson only supports 2-space indentation; other widths use stdlib json.
+    Dataclass instances are written as objects. Output ends with a newline.
+    """
+    if orjson is not None and indent == 2:
+        return orjson.dumps(
+            data,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        )
+    text = json.dumps(data, indent=indent, ensure_ascii=False, default=_json_default)
+    return (text + "\n").encode('utf-8')
+
+
+def _json_default(obj: Any) -> Any:
+    """stdlib json fallback for types orjson serializes natively"""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
 def merge_monthly(session_record: Dict, monthly_filepath: str) -> bool:
     """
     Append session record to monthly episodic file.
@@ -129,20 +326,10 @@ def merge_monthly(session_record: Dict, monthly_filepath: str) -> bool:
     """
     try:
         # Load existing records (default to empty list)
-        existing_data = safe_load(monthly_filepath, default={"sessions": []})
-
-        # Ensure structure
-        if not isinstance(existing_data, dict):
-            existing_data = {"sessions": []}
-        if "sessions" not in existing_data:
-            existing_data["sessions"] = []
-
-        # Append new record
-        existing_data["sessions"].append(session_record)
-
-        # Update metadata
-        existing_data["count"] = len(existing_data["sessions"])
-        existing_data["last_updated"] = session_record.get("timestamp")
+        existing_data = _append_session(
+            safe_load(monthly_filepath, default={"sessions": []}),
+            session_record
+        )
 
         # Save atomically
         return safe_save(monthly_filepath, existing_data)
@@ -152,6 +339,334 @@ def merge_monthly(session_record: Dict, monthly_filepath: str) -> bool:
         return False
 
 
+def save_episodic(session_record: Dict, monthly_filepath: str, index_filepath: str) -> bool:
+    """
+    Append session record to its monthly file and register it in index.json.
+
+    The first record of a month creates the monthly file; both files are
+    written through save_many, so the index never points at a record that
+    was not saved. Later records are appended to the month's JSONL sidecar
+    before the index is saved, so each save costs O(record), not O(month).
+
+    Args:
+        session_record: New session record (must have "session_id")
+        monthly_filepath: Path to monthly sessions file
+        index_filepath: Path to index.json
+
+    Returns:
+        True if successful, False otherwise
+    """
+    if os.path.exists(monthly_filepath):
+        return _save_episodic_appending(session_record, monthly_filepath, index_filepath)
+
+    try:
+        monthly_data = _append_session(
+            safe_load(monthly_filepath, default={"sessions": []}),
+            session_record
+        )
+
+        index = safe_load(index_filepath, default={})
+        if not isinstance(index, dict):
+            index = {}
+        index[session_record["session_id"]] = os.path.basename(monthly_filepath)
+
+    except Exception as e:
+        print(f"Error saving episodic record: {e}")
+        return False
+
+    return save_many([(monthly_filepath, monthly_data), (index_filepath, index)])
+
+
+def _save_episodic_appending(session_record: Dict, monthly_filepath: str, index_filepath: str) -> bool:
+    """save_episodic for a month that already has its file: append to the sidecar"""
+    try:
+        index = safe_load(index_filepath, default={})
+        if not isinstance(index, dict):
+            index = {}
+        index[session_record["session_id"]] = os.path.basename(monthly_filepath)
+
+        # Record first, then index: the index never points at a missing record
+        sidecar_size = _append_line(sidecar_path(monthly_filepath), session_record)
+
+    except Exception as e:
+        print(f"Error saving episodic record: {e}")
+        return False
+
+    if not safe_save(index_filepath, index):
+        return False
+
+    if sidecar_size >= SIDECAR_COMPACT_BYTES or os.path.exists(pending_sidecar_path(monthly_filepath)):
+        # The record is already durable - a failed or interrupted compaction
+        # (its pending sidecar is still there) is retried on the next save
+        compact_month(monthly_filepath)
+
+    return True
+
+
+def _append_line(filepath: str, record: Any) -> int:
+    """
+    Append one record as a JSON line with a single O_APPEND write and fsync.
+
+    Returns:
+        Size of the file after the append
+    """
+    if orjson is not None:
+        line = orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    else:
+        line = (json.dumps(record, ensure_ascii=False, default=_json_default) + "\n").encode('utf-8')
+
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        if os.write(fd, line) != len(line):
+            raise OSError(f"Short write appending to {filepath}")
+        os.fsync(fd)
+        return os.fstat(fd).st_size
+    finally:
+        os.close(fd)
+
+
+def compact_month(monthly_filepath: str) -> bool:
+    """
+    Fold a month's JSONL sidecar into its monthly file.
+
+    The sidecar is first renamed aside, so appends that arrive meanwhile
+    start a fresh sidecar. If a previous compaction was interrupted after
+    saving, its renamed file is merged again with sessions already present
+    (same session_id and timestamp) skipped. Only one process compacts a
+    month at a time; the others return without waiting.
+
+    Args:
+        monthly_filepath: Path to monthly sessions file
+
+    Returns:
+        True if successful (or nothing to do), False otherwise
+    """
+    with _compaction_lock(monthly_filepath) as locked:
+        if not locked:
+            # Another process is compacting this month right now
+            return True
+
+        ok, leftover = _fold_sidecar(monthly_filepath)
+        if ok and leftover:
+            # A leftover was merged first; the current sidecar is handled now
+            ok, _ = _fold_sidecar(monthly_filepath)
+        return ok
+
+
+def _fold_sidecar(monthly_filepath: str) -> Tuple[bool, bool]:
+    """
+    One compaction step of compact_month (caller holds the lock).
+
+    Returns:
+        Tuple of (success, merged a leftover pending sidecar)
+    """
+    sidecar = sidecar_path(monthly_filepath)
+    pending = pending_sidecar_path(monthly_filepath)
+    leftover = False
+
+    try:
+        leftover = os.path.exists(pending)
+        if not leftover:
+            try:
+                os.replace(sidecar, pending)
+            except FileNotFoundError:
+                return True, False
+
+        data = safe_load(monthly_filepath, default={"sessions": []})
+        records = parse_jsonl(pending)
+        if leftover:
+            sessions = data.get("sessions") if isinstance(data, dict) else None
+            present = {_session_key(s) for s in sessions or () if isinstance(s, dict)}
+            records = _not_merged(list(records), present)
+
+        for record in records:
+            data = _append_session(data, record)
+
+        if not safe_save(monthly_filepath, data):
+            return False, leftover
+        os.remove(pending)
+
+    except Exception as e:
+        print(f"Error compacting monthly file: {e}")
+        return False, leftover
+
+    return True, leftover
+
+
+@contextlib.contextmanager
+def _compaction_lock(monthly_filepath: str) -> Iterator[bool]:
+    """
+    Hold the month's compaction lock (flock on "<sidecar>.lock") for the block.
+
+    Yields False at once if another process holds it. The lock file is
+    removed on release; a process that opened it just before sees that its
+    inode is gone and opens it again. Without fcntl, or where the filesystem
+    does not support flock, the block runs unlocked.
+    """
+    if fcntl is None:
+        yield True
+        return
+
+    lock_path = sidecar_path(monthly_filepath) + ".lock"
+    while True:
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            yield False
+            return
+        except OSError:
+            # No flock support here (some network filesystems)
+            os.close(fd)
+            yield True
+            return
+
+        try:
+            if os.stat(lock_path).st_ino == os.fstat(fd).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        # Locked a file the previous holder already removed
+        os.close(fd)
+
+    try:
+        yield True
+    finally:
+        try:
+            os.remove(lock_path)
+        finally:
+            os.close(fd)
+
+
+def save_many(files: Sequence[Tuple[str, Any]], indent: int = 2, max_retries: int = 3) -> bool:
+    """
+    Save several JSON files as one batch with retry logic.
+
+    All payloads are serialized up front, then written and fsynced to their
+    temp files concurrently (one thread per file - the work is I/O bound).
+    Nothing is renamed into place until every temp file is staged, so a
+    failure while serializing or staging leaves all targets untouched. The
+    renames themselves run one after another: if a later one fails, the
+    targets renamed before it already hold their new contents.
+
+    Args:
+        files: (filepath, data) pairs
+        indent: JSON indentation (default: 2 spaces)
+        max_retries: Maximum retry attempts (default: 3)
+
+    Returns:
+        True if successful, False otherwise
+    """
+    # Serialization errors are not transient - fail without retrying
+    try:
+        payloads = [(filepath, _dumps(data, indent)) for filepath, data in files]
+    except Exception as e:
+        print(f"Error serializing {len(files)} file(s): {e}")
+        return False
+
+    for attempt in range(max_retries):
+        staged = []
+        try:
+            _stage_all(payloads, staged)
+
+            for temp_filepath, filepath in staged:
+                os.replace(temp_filepath, filepath)
+
+            return True
+
+        except Exception as e:
+            # Clean up any temp files that were not renamed
+            for temp_filepath, _ in staged:
+                try:
+                    os.remove(temp_filepath)
+                except OSError:
+                    pass
+
+            if attempt < max_retries - 1:
+                print(f"Warning: Batch save attempt {attempt + 1} failed, retrying: {e}")
+                time.sleep(0.1 * (attempt + 1))
+            else:
+                print(f"Error saving {len(files)} file(s) after {max_retries} attempts: {e}")
+
+    return False
+
+
+def _append_session(existing_data: Any, session_record: Dict) -> Dict:
+    """Append record to monthly file data, repairing its structure if needed"""
+    # Ensure structure
+    if not isinstance(existing_data, dict):
+        existing_data = {"sessions": []}
+    if "sessions" not in existing_data:
+        existing_data["sessions"] = []
+
+    # Append new record
+    existing_data["sessions"].append(session_record)
+
+    # Update metadata
+    existing_data["count"] = len(existing_data["sessions"])
+    existing_data["last_updated"] = session_record.get("timestamp")
+
+    return existing_data
+
+
+def _stage_all(payloads: List[Tuple[str, bytes]], staged: List[Tuple[str, str]]) -> None:
+    """
+    Write every payload to its temp file, in parallel when there are several.
+
+    Successfully written (temp_filepath, filepath) pairs are appended to
+    staged even when another write fails, so the caller can clean them up.
+
+    Raises:
+        The first write error, after all writes have finished
+    """
+    if len(payloads) <= 1:
+        for filepath, payload in payloads:
+            staged.append((_write_temp(filepath, payload), filepath))
+        return
+
+    executor = io_executor()
+    futures = [
+        (executor.submit(_write_temp, filepath, payload), filepath)
+        for filepath, payload in payloads
+    ]
+
+    error = None
+    for future, filepath in futures:
+        try:
+            staged.append((future.result(), filepath))
+        except Exception as e:
+            error = error or e
+
+    if error is not None:
+        raise error
+
+
+def _write_temp(filepath: str, payload: bytes) -> str:
+    """
+    Write serialized JSON to "<filepath>.tmp" and fsync it.
+
+    Returns:
+        Path to the temp file (caller renames it into place)
+    """
+    Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+
+    temp_filepath = f"{filepath}.tmp"
+    try:
+        with open(temp_filepath, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+    except Exception:
+        try:
+            os.remove(temp_filepath)
+        except OSError:
+            pass
+        raise
+
+    return temp_filepath
+
+
 def update_index(index_filepath: str, session_id: str, monthly_filename: str) -> bool:
     """
     Update index.json with session ID → monthly file mapping.
@@ -193,17 +708,19 @@ def _attempt_repair(filepath: str) -> Any:
     Raises:
         Exception if repair fails
     """
-    with open(filepath, 'r', encoding='utf-8') as f:
+    # Work on raw bytes: both parsers take UTF-8 directly, so the file is
+    # never decoded to str just to be re-encoded on every attempt
+    with open(filepath, 'rb') as f:
         content = f.read()
 
     # Try to find last complete JSON structure
-    # Look for closing } or ]
-    for i in range(len(content) - 1, -1, -1):
-        if content[i] in ('}', ']'):
-            try:
-                return json.loads(content[:i+1])
-            except json.JSONDecodeError:
-                continue
+    # Look for closing } or ], stepping back from the end with rfind
+    end = max(content.rfind(b'}'), content.rfind(b']'))
+    while end >= 0:
+        try:
+            return _loads(content[:end + 1])
+        except json.JSONDecodeError:
+            end = max(content.rfind(b'}', 0, end), content.rfind(b']', 0, end))
 
     # Repair failed
     raise Exception("Unable to repair JSON")
@@ -5,19 +5,39 @@ Provides rebuild, backup, validation, and reset functions
 """
 
 import argparse
+import json
+import os
 import shutil
 import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+try:
+    # fcntl is POSIX-only; without it backups are always plain copies
+    import fcntl
+except ImportError:
+    fcntl = None
+
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from config import load_config
-from extract import load_all_sessions, detect_frequency_patterns
-from json_handler import safe_load, safe_save
-from utils import ensure_directory, get_project_path, get_timestamp
+from config import clear_config_cache, load_config
+from extract import (
+    EXTRACT_STATE_FILE,
+    MONTH_INDEX_FILE,
+    detect_patterns_by_month,
+    list_monthly_files,
+    save_semantic_knowledge,
+)
+from json_handler import pending_sidecar_path, safe_load, safe_save, sidecar_path
+from utils import (
+    clear_directory_cache,
+    ensure_directory,
+    get_project_path,
+    get_timestamp,
+    io_executor,
+)
 
 
 def rebuild_semantic(project_path: str) -> bool:
@@ -41,28 +61,39 @@ def rebuild_semantic(project_path: str) -> bool:
             print("Error: No episodic directory found", file=sys.stderr)
             return False
 
-        # Load all sessions (with corruption handling)
-        all_sessions, corrupted_files = load_all_sessions(episodic_dir)
+        # Load config for thresholds
+        config = load_config(project_path)
+
+        # One timestamp for every rebuilt pattern and file
+        ts = get_timestamp()
+
+        semantic_dir = pms_dir / "semantic"
+        index_file = semantic_dir / MONTH_INDEX_FILE
+
+        # Summarize each month (with corruption handling), re-parsing only
+        # months whose content changed since the last rebuild
+        corrupted_files = []
+        month_index = safe_load(str(index_file), default={})
+        if not isinstance(month_index, dict):
+            month_index = {}
+        session_count, patterns, month_index = detect_patterns_by_month(
+            episodic_dir,
+            corrupted_files,
+            month_index,
+            config.emerging_pattern,
+            config.strong_pattern,
+            config.critical_pattern,
+            detected_at=ts
+        )
 
         if corrupted_files:
             print(f"Warning: Skipped {len(corrupted_files)} corrupted file(s)", file=sys.stderr)
 
-        if not all_sessions:
+        if not session_count:
             print("Error: No episodic records found", file=sys.stderr)
             return False
 
-        print(f"Loaded {len(all_sessions)} episodic records")
-
-        # Load config for thresholds
-        config = load_config(project_path)
-
-        # Detect patterns
-        patterns = detect_frequency_patterns(
-            all_sessions,
-            config.emerging_pattern,
-            config.strong_pattern,
-            config.critical_pattern
-        )
+        print(f"Loaded {session_count} episodic records")
 
         if not patterns:
             print("No patterns detected")
@@ -71,54 +102,26 @@ def rebuild_semantic(project_path: str) -> bool:
         print(f"Detected {len(patterns)} patterns")
 
         # Categorize
-        preferences = [p for p in patterns if p.get("category") == "preference"]
-        code_patterns = [p for p in patterns if p.get("category") == "code_pattern"]
-        anti_patterns = [p for p in patterns if p.get("category") == "anti_pattern"]
+        preferences = [p for p in patterns if p.category == "preference"]
+        code_patterns = [p for p in patterns if p.category == "code_pattern"]
+        anti_patterns = [p for p in patterns if p.category == "anti_pattern"]
 
         # Save semantic knowledge
-        semantic_dir = pms_dir / "semantic"
         ensure_directory(semantic_dir)
 
-        # Save patterns.json
-        patterns_file = semantic_dir / "patterns.json"
-        safe_save(
-            str(patterns_file),
-            {
-                "patterns": patterns,
-                "count": len(patterns),
-                "last_updated": get_timestamp()
-            }
-        )
-
-        # Save preferences.json
-        safe_save(
-            str(semantic_dir / "preferences.json"),
-            {
-                "preferences": preferences,
-                "count": len(preferences),
-                "last_updated": get_timestamp()
-            }
-        )
+        # Drop incremental extraction state so the next run starts fresh
+        state_file = semantic_dir / EXTRACT_STATE_FILE
+        if state_file.exists():
+            state_file.unlink()
 
-        # Save code-patterns.json
-        safe_save(
-            str(semantic_dir / "code-patterns.json"),
-            {
-                "code_patterns": code_patterns,
-                "count": len(code_patterns),
-                "last_updated": get_timestamp()
-            }
-        )
+        # Save all four semantic files with one timestamp
+        if not save_semantic_knowledge(
+            semantic_dir, patterns, preferences, code_patterns, anti_patterns, ts=ts
+        ):
+            return False
 
-        # Save anti-patterns.json
-        safe_save(
-            str(semantic_dir / "anti-patterns.json"),
-            {
-                "anti_patterns": anti_patterns,
-                "count": len(anti_patterns),
-                "last_updated": get_timestamp()
-            }
-        )
+        # Month summaries for the next rebuild (a failed write only costs a re-parse)
+        safe_save(str(index_file), month_index)
 
         print(f"✓ Rebuilt semantic knowledge successfully")
         print(f"  - {len(preferences)} preferences")
@@ -198,41 +201,47 @@ def validate_memory_structure(project_path: str) -> Tuple[bool, List[str]]:
 
     print("Validating PMS memory structure...")
 
-    # Validate episodic records
+    # Gather files first: (path, requires "sessions" key)
+    files = []
+
+    # Episodic records, plus the JSONL sidecars of sessions not yet compacted
     episodic_dir = pms_dir / "episodic"
+    sidecars = []
     if episodic_dir.exists():
-        for monthly_file in episodic_dir.glob("sessions-*.json"):
-            data = safe_load(str(monthly_file), default=None)
-            if data is None:
-                errors.append(f"Corrupted: {monthly_file}")
-            elif "sessions" not in data:
-                errors.append(f"Missing 'sessions' key: {monthly_file}")
-
-        # Validate index
-        index_file = episodic_dir / "index.json"
-        if index_file.exists():
-            index = safe_load(str(index_file), default=None)
-            if index is None:
-                errors.append(f"Corrupted: {index_file}")
-
-    # Validate semantic knowledge
-    semantic_dir = pms_dir / "semantic"
-    if semantic_dir.exists():
-        for semantic_file in ["patterns.json", "preferences.json", "code-patterns.json", "anti-patterns.json"]:
-            filepath = semantic_dir / semantic_file
-            if filepath.exists():
-                data = safe_load(str(filepath), default=None)
-                if data is None:
-                    errors.append(f"Corrupted: {filepath}")
-
-    # Validate procedural metadata
-    procedural_dir = pms_dir / "procedural"
-    if procedural_dir.exists():
-        metadata_file = procedural_dir / "rules-metadata.json"
-        if metadata_file.exists():
-            data = safe_load(str(metadata_file), default=None)
+        monthly_files = list_monthly_files(episodic_dir)
+        files.extend((monthly_file, True) for monthly_file in monthly_files)
+        sidecars = [
+            path for monthly_file in monthly_files
+            for path in (pending_sidecar_path(monthly_file), sidecar_path(monthly_file))
+            if os.path.exists(path)
+        ]
+
+    # Index, semantic knowledge and procedural metadata
+    for directory, names in (
+        (episodic_dir, ("index.json",)),
+        (pms_dir / "semantic", ("patterns.json", "preferences.json", "code-patterns.json", "anti-patterns.json")),
+        (pms_dir / "procedural", ("rules-metadata.json",)),
+    ):
+        files.extend((filepath, False) for filepath in _existing_files(directory, names))
+
+    # Load in parallel - reads and parsing are I/O bound or release the GIL
+    if files:
+        loaded = list(io_executor().map(lambda f: safe_load(f[0], default=None), files))
+
+        for (filepath, needs_sessions), data in zip(files, loaded):
             if data is None:
-                errors.append(f"Corrupted: {metadata_file}")
+                errors.append(f"Corrupted: {filepath}")
+            elif needs_sessions and "sessions" not in data:
+                errors.append(f"Missing 'sessions' key: {filepath}")
+
+    if sidecars:
+        for sidecar, bad_lines in zip(sidecars, io_executor().map(_invalid_sidecar_lines, sidecars)):
+            if bad_lines is None:
+                errors.append(f"Unreadable: {sidecar}")
+            elif bad_lines:
+                shown = ", ".join(str(n) for n in bad_lines[:5])
+                more = f" (+{len(bad_lines) - 5} more)" if len(bad_lines) > 5 else ""
+                errors.append(f"Corrupted lines {shown}{more}: {sidecar}")
 
     # Report results
     if errors:
@@ -245,6 +254,93 @@ def validate_memory_structure(project_path: str) -> Tuple[bool, List[str]]:
         return True, []
 
 
+# Linux FICLONE ioctl (_IOW(0x94, 9, int)): share extents copy-on-write
+_FICLONE = 0x40049409
+
+
+def _clone_file(src: str, dst: str) -> str:
+    """
+    copytree copy_function: copy-on-write clone where the filesystem
+    supports it (btrfs, XFS, ...), regular copy2 otherwise.
+    """
+    if fcntl is not None and sys.platform.startswith("linux"):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return dst
+        except OSError:
+            # EOPNOTSUPP / EXDEV / EINVAL: no clone support here
+            pass
+
+    return shutil.copy2(src, dst)
+
+
+def _fast_rmtree(path: Path) -> None:
+    """
+    Remove a directory tree with one scandir per directory.
+    Entry types come from the dirent, so files are unlinked without a stat;
+    symlinks are unlinked, never followed.
+    """
+    # ensure_directory must not trust its record of these directories
+    clear_directory_cache()
+
+    # Step 1: Unlink files depth-first, remembering directories in visit order
+    directories = []
+    stack = [os.fspath(path)]
+    while stack:
+        directory = stack.pop()
+        directories.append(directory)
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    os.unlink(entry.path)
+
+    # Step 2: Children were visited after their parents - remove in reverse
+    for directory in reversed(directories):
+        os.rmdir(directory)
+
+
+def _invalid_sidecar_lines(filepath: str) -> Optional[List[int]]:
+    """
+    Return the 1-based numbers of the lines in a JSONL sidecar that are not
+    a JSON object (blank lines are fine), or None if it cannot be read.
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            lines = f.read().split(b'\n')
+    except OSError:
+        return None
+
+    bad = []
+    for line_num, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            bad.append(line_num)
+    return bad
+
+
+def _existing_files(directory: Path, names: Tuple[str, ...]) -> List[str]:
+    """
+    Return paths of the named files present in directory, in names order.
+    One scandir pass replaces an exists() stat per name.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            present = {entry.name: entry.path for entry in entries if entry.is_file()}
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+    return [present[name] for name in names if name in present]
+
+
 def reset_pms(project_path: str, keep_episodic: bool = True) -> bool:
     """
     Reset PMS to clean state.
@@ -273,31 +369,34 @@ def reset_pms(project_path: str, keep_episodic: bool = True) -> bool:
                 timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
                 backup_path = backup_dir / f"episodic_{timestamp}"
 
-                shutil.copytree(str(episodic_dir), str(backup_path))
+                shutil.copytree(str(episodic_dir), str(backup_path), copy_function=_clone_file)
                 print(f"✓ Backed up episodic records to: {backup_path}")
 
         # Remove semantic and procedural
         semantic_dir = pms_dir / "semantic"
         if semantic_dir.exists():
-            shutil.rmtree(str(semantic_dir))
+            _fast_rmtree(semantic_dir)
             print("✓ Removed semantic knowledge")
 
         procedural_dir = pms_dir / "procedural"
         if procedural_dir.exists():
-            shutil.rmtree(str(procedural_dir))
+            _fast_rmtree(procedural_dir)
             print("✓ Removed procedural metadata")
 
         # Remove rule files
         rules_dir = Path(project_path) / ".claude" / "rules" / "pms"
         if rules_dir.exists():
-            shutil.rmtree(str(rules_dir))
+            _fast_rmtree(rules_dir)
             print("✓ Removed rule files")
 
         # If not keeping episodic, remove everything
         if not keep_episodic:
-            shutil.rmtree(str(pms_dir))
+            _fast_rmtree(pms_dir)
             print("✓ Removed all PMS data")
 
+        # Nothing cached from before the reset may outlive it
+        clear_config_cache()
+
         print("")
         print("✓ PMS reset complete")
 
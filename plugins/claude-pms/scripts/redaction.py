@@ -4,8 +4,32 @@ Automatically redacts sensitive data before storage
 """
 
 import re
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
+try:
+    # re2 is optional - linear-time matching for user-supplied patterns;
+    # stdlib re is used when it is not installed
+    import re2
+except ImportError:
+    re2 = None
+
+if re2 is not None:
+    # Case-insensitive like the stdlib patterns; unsupported syntax is
+    # reported through re2.error, not logged
+    _RE2_OPTIONS = re2.Options()
+    _RE2_OPTIONS.case_sensitive = False
+    _RE2_OPTIONS.log_errors = False
+
+
+# PEM private key blocks; its lazy .*? makes it the costliest default
+_PEM_PATTERN = re.compile(
+    r'-----BEGIN\s+(?:RSA\s+)?PRIVATE\s+KEY-----.*?-----END\s+(?:RSA\s+)?PRIVATE\s+KEY-----',
+    re.DOTALL
+)
+
+# Literal a pattern cannot match without; the pattern only runs when a
+# plain substring check finds it
+_PREFILTERS = {_PEM_PATTERN: "-----BEGIN"}
 
 # Default redaction patterns (compiled for performance)
 DEFAULT_PATTERNS = [
@@ -27,14 +51,25 @@ DEFAULT_PATTERNS = [
     (re.compile(r'Bearer\s+[\w-]+', re.IGNORECASE), 'Bearer [REDACTED]'),
 
     # Private keys (PEM format)
-    (re.compile(r'-----BEGIN\s+(?:RSA\s+)?PRIVATE\s+KEY-----.*?-----END\s+(?:RSA\s+)?PRIVATE\s+KEY-----', re.DOTALL), '[REDACTED_PRIVATE_KEY]'),
+    (_PEM_PATTERN, '[REDACTED_PRIVATE_KEY]'),
 ]
 
+# Shortest text each default pattern can match, in DEFAULT_PATTERNS order.
+# Strings shorter than every pattern's minimum skip the regex engine; a
+# pattern missing from here (any custom one) disables the shortcut.
+_MIN_LENGTHS = dict(zip(
+    (pattern for pattern, _ in DEFAULT_PATTERNS),
+    (20, 8, 13, 11, 11, 10, 8, 12, 8, 52)
+))
+
 
 def redact_sensitive(text: str, patterns: List[Tuple[re.Pattern, str]] = None) -> Tuple[str, int]:
     """
     Redact sensitive data from text using regex patterns.
 
+    Patterns run in order, each over the previous one's output, so a match
+    of one pattern cannot hide another (e.g. "Bearer password=x").
+
     Args:
         text: Text to redact
         patterns: List of (regex_pattern, replacement) tuples
@@ -46,21 +81,64 @@ def redact_sensitive(text: str, patterns: List[Tuple[re.Pattern, str]] = None) -
     if patterns is None:
         patterns = DEFAULT_PATTERNS
 
+    passes, min_length = _prepare_patterns(tuple(patterns))
+
+    # Too short for any pattern (IDs, keys, timestamps, "ok")
+    if len(text) < min_length:
+        return text, 0
+
     redaction_count = 0
     redacted_text = text
 
-    for pattern, replacement in patterns:
-        matches = pattern.findall(redacted_text)
-        if matches:
-            redaction_count += len(matches)
-            redacted_text = pattern.sub(replacement, redacted_text)
+    for pattern, replacement, literal in passes:
+        # Prefiltered patterns only run when their literal is present
+        if literal is not None and literal not in redacted_text:
+            continue
+        redacted_text, count = pattern.subn(replacement, redacted_text)
+        redaction_count += count
 
     return redacted_text, redaction_count
 
 
+# Last pattern tuple and its prepared form. Callers reuse one pattern list
+# for a whole record, and tuple equality short-circuits on identity, so
+# this is cheaper than hashing compiled patterns on every call.
+_prepared_cache: List[Any] = [None, None]
+
+
+def _prepare_patterns(
+    patterns: Tuple[Tuple[re.Pattern, str], ...]
+) -> Tuple[Tuple[Tuple[re.Pattern, str, Optional[str]], ...], int]:
+    """
+    Redaction passes for a pattern tuple (memoized).
+
+    Returns:
+        Tuple of (passes, min_length): passes are (pattern, replacement,
+        _PREFILTERS literal or None) in order, and no pattern can match
+        text shorter than min_length
+    """
+    if _prepared_cache[0] == patterns:
+        return _prepared_cache[1]
+
+    passes = tuple(
+        (pattern, replacement, _PREFILTERS.get(pattern)) for pattern, replacement in patterns
+    )
+    min_length = min((_MIN_LENGTHS.get(pattern, 0) for pattern, _ in patterns), default=0)
+
+    result = passes, min_length
+    _prepared_cache[0] = patterns
+    _prepared_cache[1] = result
+    return result
+
+
 def detect_and_redact(data: Any, patterns: List[Tuple[re.Pattern, str]] = None) -> Tuple[Any, int]:
     """
-    Recursively redact sensitive data in nested structures.
+    Redact sensitive data in nested structures, in place.
+
+    Walks dicts and lists with an explicit stack (no recursion limit) and
+    only writes back strings that actually changed, so containers are never
+    copied. A bare string cannot be changed in place; its redacted copy is
+    returned instead.
 
     Args:
         data: Data to redact (str, dict, list, or primitive)
@@ -69,37 +147,46 @@ def detect_and_redact(data: Any, patterns: List[Tuple[re.Pattern, str]] = None)
     Returns:
         Tuple of (redacted_data, total_redaction_count)
     """
+    if isinstance(data, str):
+        return redact_sensitive(data, patterns)
+
     total_count = 0
+    stack = [data]
 
-    if isinstance(data, str):
-        redacted, count = redact_sensitive(data, patterns)
-        return redacted, count
-
-    elif isinstance(data, dict):
-        redacted_dict = {}
-        for key, value in data.items():
-            redacted_value, count = detect_and_redact(value, patterns)
-            redacted_dict[key] = redacted_value
-            total_count += count
-        return redacted_dict, total_count
-
-    elif isinstance(data, list):
-        redacted_list = []
-        for item in data:
-            redacted_item, count = detect_and_redact(item, patterns)
-            redacted_list.append(redacted_item)
-            total_count += count
-        return redacted_list, total_count
-
-    else:
-        # Primitives (int, float, bool, None) - no redaction needed
-        return data, 0
+    while stack:
+        node = stack.pop()
+
+        if isinstance(node, dict):
+            items = node.items()
+        elif isinstance(node, list):
+            items = enumerate(node)
+        else:
+            # Primitives (int, float, bool, None) - no redaction needed
+            continue
+
+        for key, value in items:
+            if isinstance(value, str):
+                redacted, count = redact_sensitive(value, patterns)
+                if count:
+                    # Replacing a value does not resize the container,
+                    # so this is safe while iterating
+                    node[key] = redacted
+                    total_count += count
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
+
+    return data, total_count
 
 
 def compile_custom_patterns(pattern_strings: List[str]) -> List[Tuple[re.Pattern, str]]:
     """
     Compile custom redaction patterns from strings.
 
+    With re2 installed, patterns are compiled for its linear-time engine, so
+    a pathological user regex such as (a+)+ cannot backtrack catastrophically.
+    Patterns re2 does not support (backreferences, lookarounds) and all
+    patterns without re2 use stdlib re.
+
     Args:
         pattern_strings: List of regex pattern strings
 
@@ -108,6 +195,14 @@ def compile_custom_patterns(pattern_strings: List[str]) -> List[Tuple[re.Pattern
     """
     compiled = []
     for pattern_str in pattern_strings:
+        if re2 is not None:
+            try:
+                compiled.append((re2.compile(pattern_str, _RE2_OPTIONS), '[REDACTED]'))
+                continue
+            except re2.error:
+                # Unsupported by re2 - try stdlib re
+                pass
+
         try:
             compiled.append((re.compile(pattern_str, re.IGNORECASE), '[REDACTED]'))
         except re.error:
@@ -5,7 +5,8 @@ Converts confirmed patterns into project-scoped rule files
 """
 
 import argparse
-import json
+import io
+import os
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -16,16 +17,33 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from config import load_config
 from json_handler import safe_load, safe_save
-from utils import ensure_directory, get_project_path, get_timestamp
+from utils import ensure_directory, get_project_path, get_timestamp, io_executor
 
 
-def synthesize_rules(project_path: str, require_approval: bool = True) -> bool:
+# Sort rank per pattern strength (higher first in rule files)
+STRENGTH_RANK = {"critical": 3, "strong": 2, "emerging": 1}
+
+# Strengths that become rules
+RULE_STRENGTHS = frozenset(("strong", "critical"))
+
+# Rule file → (pattern category, section title)
+RULE_FILES = (
+    ("user-preferences.md", "preference", "User Preferences"),
+    ("code-patterns.md", "code_pattern", "Code Patterns"),
+    ("anti-patterns.md", "anti_pattern", "Anti-Patterns"),
+)
+
+
+def synthesize_rules(project_path: str, require_approval: bool = True,
+                     patterns_override: Optional[Dict] = None) -> bool:
     """
     Synthesize procedural rules from semantic patterns.
 
     Args:
         project_path: Path to project root
         require_approval: Whether to require user approval for rules
+        patterns_override: Already-parsed patterns data (same shape as
+                           semantic/patterns.json) to use instead of reading it
 
     Returns:
         True if successful, False otherwise
@@ -35,20 +53,25 @@ def synthesize_rules(project_path: str, require_approval: bool = True) -> bool:
         config = load_config(project_path)
 
         # Load semantic knowledge
-        pms_dir = Path(project_path) / ".claude" / "pms"
+        claude_dir = Path(project_path) / ".claude"
+        pms_dir = claude_dir / "pms"
         semantic_dir = pms_dir / "semantic"
 
-        if not semantic_dir.exists():
-            print("No semantic knowledge found. Run extraction first.", file=sys.stderr)
-            return False
+        if patterns_override is not None:
+            patterns_data = patterns_override
+        else:
+            if not semantic_dir.exists():
+                print("No semantic knowledge found. Run extraction first.", file=sys.stderr)
+                return False
 
-        # Load patterns
-        patterns_file = semantic_dir / "patterns.json"
-        if not patterns_file.exists():
-            print("No patterns found. Run extraction first.", file=sys.stderr)
-            return False
+            # Load patterns
+            patterns_file = semantic_dir / "patterns.json"
+            if not patterns_file.exists():
+                print("No patterns found. Run extraction first.", file=sys.stderr)
+                return False
+
+            patterns_data = safe_load(str(patterns_file), default={"patterns": []})
 
-        patterns_data = safe_load(str(patterns_file), default={"patterns": []})
         all_patterns = patterns_data.get("patterns", [])
 
         if not all_patterns:
@@ -57,38 +80,25 @@ def synthesize_rules(project_path: str, require_approval: bool = True) -> bool:
 
         print(f"Loaded {len(all_patterns)} patterns from semantic knowledge")
 
-        # Filter strong patterns (≥3 occurrences)
-        strong_patterns = [p for p in all_patterns if p.get("strength") in ("strong", "critical")]
+        # Filter strong patterns (≥3 occurrences) and group them by category
+        buckets, strong_count, has_critical = group_strong_patterns(all_patterns)
 
-        if not strong_patterns:
+        if not strong_count:
             print("No strong patterns found (need strength='strong' or 'critical')", file=sys.stderr)
             return False
 
-        print(f"Found {len(strong_patterns)} strong patterns for rule generation")
+        print(f"Found {strong_count} strong patterns for rule generation")
 
-        # Group patterns by category
-        preferences = [p for p in strong_patterns if p.get("category") == "preference"]
-        code_patterns = [p for p in strong_patterns if p.get("category") == "code_pattern"]
-        anti_patterns = [p for p in strong_patterns if p.get("category") == "anti_pattern"]
+        preferences = buckets["preference"]
+        code_patterns = buckets["code_pattern"]
+        anti_patterns = buckets["anti_pattern"]
 
         print(f"  - {len(preferences)} user preferences")
         print(f"  - {len(code_patterns)} code patterns")
         print(f"  - {len(anti_patterns)} anti-patterns")
 
         # Generate rules for each category
-        rule_files = {}
-
-        if preferences:
-            rules = generate_rules_from_patterns(preferences, "User Preferences")
-            rule_files["user-preferences.md"] = rules
-
-        if code_patterns:
-            rules = generate_rules_from_patterns(code_patterns, "Code Patterns")
-            rule_files["code-patterns.md"] = rules
-
-        if anti_patterns:
-            rules = generate_rules_from_patterns(anti_patterns, "Anti-Patterns")
-            rule_files["anti-patterns.md"] = rules
+        rule_files = generate_rule_files(buckets)
 
         # User approval workflow (if enabled)
         if require_approval and not config.auto_synthesize:
@@ -106,7 +116,7 @@ def synthesize_rules(project_path: str, require_approval: bool = True) -> bool:
                 return False
 
         # Save rule files with permission error handling
-        rules_dir = Path(project_path) / ".claude" / "rules" / "pms"
+        rules_dir = claude_dir / "rules" / "pms"
 
         try:
             ensure_directory(rules_dir)
@@ -118,29 +128,38 @@ def synthesize_rules(project_path: str, require_approval: bool = True) -> bool:
         saved_files = []
         failed_files = []
 
+        # Validate markdown content before writing
+        to_write = []
         for filename, content in rule_files.items():
-            rule_file = rules_dir / filename
-            try:
-                # Validate markdown content before writing
-                if not content or len(content.strip()) == 0:
-                    print(f"Warning: Empty content for {filename}, skipping", file=sys.stderr)
-                    failed_files.append((filename, "Empty content"))
-                    continue
-
-                # Write rule file
-                rule_file.write_text(content, encoding='utf-8')
-                saved_files.append(filename)
-                print(f"Generated: {filename}")
-
-            except PermissionError as e:
-                print(f"Error: Permission denied writing {filename}", file=sys.stderr)
-                failed_files.append((filename, "Permission denied"))
-            except OSError as e:
-                print(f"Error: Failed to write {filename}: {e}", file=sys.stderr)
-                failed_files.append((filename, str(e)))
-            except Exception as e:
-                print(f"Error: Unexpected error writing {filename}: {e}", file=sys.stderr)
-                failed_files.append((filename, str(e)))
+            if not content or len(content.strip()) == 0:
+                print(f"Warning: Empty content for {filename}, skipping", file=sys.stderr)
+                failed_files.append((filename, "Empty content"))
+                continue
+            to_write.append((filename, content))
+
+        # Write rule files concurrently (binary: no newline translation layer)
+        if to_write:
+            executor = io_executor()
+            futures = [
+                executor.submit((rules_dir / filename).write_bytes, content.encode('utf-8'))
+                for filename, content in to_write
+            ]
+
+            for (filename, _), future in zip(to_write, futures):
+                try:
+                    future.result()
+                    saved_files.append(filename)
+                    print(f"Generated: {filename}")
+
+                except PermissionError as e:
+                    print(f"Error: Permission denied writing {filename}", file=sys.stderr)
+                    failed_files.append((filename, "Permission denied"))
+                except OSError as e:
+                    print(f"Error: Failed to write {filename}: {e}", file=sys.stderr)
+                    failed_files.append((filename, str(e)))
+                except Exception as e:
+                    print(f"Error: Unexpected error writing {filename}: {e}", file=sys.stderr)
+                    failed_files.append((filename, str(e)))
 
         # Report failures
         if failed_files:
@@ -158,10 +177,13 @@ def synthesize_rules(project_path: str, require_approval: bool = True) -> bool:
         try:
             ensure_directory(procedural_dir)
 
+            ts = get_timestamp()
+            confidence = "high" if has_critical else "medium"
+            saved = set(saved_files)
             metadata = {
-                "last_synthesis": get_timestamp(),
+                "last_synthesis": ts,
                 "rule_files": saved_files,
-                "pattern_count": len(strong_patterns),
+                "pattern_count": strong_count,
                 "breakdown": {
                     "preferences": len(preferences),
                     "code_patterns": len(code_patterns),
@@ -169,16 +191,12 @@ def synthesize_rules(project_path: str, require_approval: bool = True) -> bool:
                 },
                 "files": {
                     filename: {
-                        "created": get_timestamp(),
-                        "pattern_count": len([p for p in strong_patterns if p["category"] == category]),
-                        "confidence": "high" if any(p.get("strength") == "critical" for p in strong_patterns) else "medium"
+                        "created": ts,
+                        "pattern_count": len(buckets[category]),
+                        "confidence": confidence
                     }
-                    for filename, category in [
-                        ("user-preferences.md", "preference"),
-                        ("code-patterns.md", "code_pattern"),
-                        ("anti-patterns.md", "anti_pattern")
-                    ]
-                    if filename in saved_files
+                    for filename, category, _ in RULE_FILES
+                    if filename in saved
                 },
                 "failed_files": failed_files if failed_files else []
             }
@@ -202,6 +220,50 @@ def synthesize_rules(project_path: str, require_approval: bool = True) -> bool:
         return False
 
 
+def group_strong_patterns(all_patterns: List[Dict]) -> Tuple[Dict[str, List[Dict]], int, bool]:
+    """
+    Filter strong/critical patterns and group them by category in one pass.
+
+    Args:
+        all_patterns: Pattern dictionaries from semantic knowledge
+
+    Returns:
+        Tuple of (patterns per RULE_FILES category, number of strong patterns,
+        whether any of them is critical). Strong patterns of other categories
+        are counted but not grouped.
+    """
+    buckets = {category: [] for _, category, _ in RULE_FILES}
+    strong_count = 0
+    has_critical = False
+    for p in all_patterns:
+        strength = p.get("strength")
+        if strength in RULE_STRENGTHS:
+            strong_count += 1
+            has_critical = has_critical or strength == "critical"
+            bucket = buckets.get(p.get("category"))
+            if bucket is not None:
+                bucket.append(p)
+
+    return buckets, strong_count, has_critical
+
+
+def generate_rule_files(buckets: Dict[str, List[Dict]]) -> Dict[str, str]:
+    """
+    Generate the markdown of every rule file that has patterns.
+
+    Args:
+        buckets: Patterns per category (see group_strong_patterns)
+
+    Returns:
+        Dict of rule filename → markdown content, in RULE_FILES order
+    """
+    return {
+        filename: generate_rules_from_patterns(buckets[category], title)
+        for filename, category, title in RULE_FILES
+        if buckets.get(category)
+    }
+
+
 def generate_rules_from_patterns(patterns: List[Dict], category_title: str) -> str:
     """
     Generate markdown rule content from patterns.
@@ -217,51 +279,49 @@ def generate_rules_from_patterns(patterns: List[Dict], category_title: str) -> s
     # For now, use template-based generation
 
     timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
+    confidence = 'High' if any(p.get('strength') == 'critical' for p in patterns) else 'Medium'
+
+    buf = io.StringIO()
+    write = buf.write
 
     # Header
-    lines = [
-        f"# {category_title}",
-        "",
-        f"<!-- Auto-generated by Claude PMS on {timestamp} -->",
-        f"<!-- Pattern Count: {len(patterns)} | Confidence: {'High' if any(p.get('strength') == 'critical' for p in patterns) else 'Medium'} -->",
-        "",
-        f"## {category_title}",
-        ""
-    ]
+    write(
+        f"# {category_title}\n"
+        "\n"
+        f"<!-- Auto-generated by Claude PMS on {timestamp} -->\n"
+        f"<!-- Pattern Count: {len(patterns)} | Confidence: {confidence} -->\n"
+        "\n"
+        f"## {category_title}\n"
+    )
 
     # Sort by strength and occurrences
     sorted_patterns = sorted(
         patterns,
         key=lambda p: (
-            {"critical": 3, "strong": 2, "emerging": 1}.get(p.get("strength", "emerging"), 0),
+            STRENGTH_RANK.get(p.get("strength", "emerging"), 0),
             p.get("occurrences", 0)
         ),
         reverse=True
     )
 
-    # Generate rules
+    # Generate rules (each block opens with the blank line separating it)
     for pattern in sorted_patterns:
-        description = pattern.get("description", "")
-        occurrences = pattern.get("occurrences", 0)
-        strength = pattern.get("strength", "emerging")
-        evidence = pattern.get("evidence", [])
+        get = pattern.get
+        strength = get("strength", "emerging")
+        evidence = get("evidence", [])
 
         # Convert pattern to rule format
-        rule_text = convert_pattern_to_rule(description, strength)
+        rule_text = convert_pattern_to_rule(get("description", ""), strength)
 
-        lines.append(f"**{rule_text}**")
-        lines.append(f"- Observed {occurrences} times ({strength} pattern)")
+        write(f"\n**{rule_text}**\n- Observed {get('occurrences', 0)} times ({strength} pattern)\n")
 
         # Add evidence (limit to 5 sessions)
         if evidence:
-            evidence_preview = evidence[:5]
-            lines.append(f"- Evidence: {', '.join(evidence_preview)}")
+            write(f"- Evidence: {', '.join(evidence[:5])}\n")
             if len(evidence) > 5:
-                lines.append(f"  (and {len(evidence) - 5} more)")
-
-        lines.append("")
+                write(f"  (and {len(evidence) - 5} more)\n")
 
-    return "\n".join(lines)
+    return buf.getvalue()
 
 
 def convert_pattern_to_rule(description: str, strength: str) -> str:
@@ -298,13 +358,18 @@ def load_procedural_metadata(project_path: str) -> Optional[Dict]:
     Returns:
         Metadata dict or None
     """
-    metadata_file = Path(project_path) / ".claude" / "pms" / "procedural" / "rules-metadata.json"
+    metadata_file = _metadata_path(project_path)
     if not metadata_file.exists():
         return None
 
     return safe_load(str(metadata_file), default=None)
 
 
+def _metadata_path(project_path: str) -> Path:
+    """Path to rules-metadata.json"""
+    return Path(project_path) / ".claude" / "pms" / "procedural" / "rules-metadata.json"
+
+
 def check_existing_rules(project_path: str) -> List[str]:
     """
     Check for existing rule files.
@@ -316,11 +381,15 @@ def check_existing_rules(project_path: str) -> List[str]:
         List of existing rule file paths
     """
     rules_dir = Path(project_path) / ".claude" / "rules" / "pms"
-    if not rules_dir.exists():
+    try:
+        with os.scandir(rules_dir) as entries:
+            return [
+                entry.path for entry in entries
+                if entry.name.endswith(".md") and entry.is_file()
+            ]
+    except (FileNotFoundError, NotADirectoryError):
         return []
 
-    return [str(f) for f in rules_dir.glob("*.md")]
-
 
 def main():
     """Main entry point for synthesize.py"""
@@ -2,38 +2,116 @@
 Shared utility functions for Claude PMS
 """
 
+import atexit
+import mmap
 import os
-import uuid
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    # orjson is optional - stdlib json is used when it is not installed
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+
+# JSONL files at least this large are memory-mapped and split in place
+JSONL_MMAP_MIN_SIZE = 64 * 1024
+
+# Leading "YYYY-MM-DD" of an ISO 8601 timestamp (month captured)
+_ISO_DATE_PREFIX = re.compile(r'(\d{4}-(?:0[1-9]|1[0-2]))-\d{2}')
+
+# Seconds a looked-up git branch is reused for the same directory
+GIT_BRANCH_TTL = 5.0
+
+# Shared I/O thread pool, created on first use (see io_executor)
+_io_executor: Optional[ThreadPoolExecutor] = None
+
+
+def io_executor() -> ThreadPoolExecutor:
+    """
+    Return the process-wide thread pool for file I/O.
+    Created lazily and reused, so CLI commands spawn worker threads once.
+    Tasks on it must not block on other tasks submitted to it.
+    """
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(
+            max_workers=min(32, (os.cpu_count() or 1) * 4),
+            thread_name_prefix="pms-io"
+        )
+        atexit.register(_io_executor.shutdown, wait=False)
+    return _io_executor
+
+
+# Absolute paths ensure_directory has already created or found
+_ensured_dirs: set = set()
 
 
 def ensure_directory(path: str) -> Path:
     """
     Create directory if it doesn't exist.
     Returns Path object.
+
+    Each path is only checked once per process; code that deletes
+    directories must call clear_directory_cache().
     """
     dir_path = Path(path)
-    dir_path.mkdir(parents=True, exist_ok=True)
+    key = os.path.abspath(path)
+    if key not in _ensured_dirs:
+        dir_path.mkdir(parents=True, exist_ok=True)
+        _ensured_dirs.add(key)
     return dir_path
 
 
+def clear_directory_cache() -> None:
+    """Forget which directories exist (forces ensure_directory to check again)"""
+    _ensured_dirs.clear()
+
+
 def get_session_id() -> str:
     """
     Generate or retrieve current session UUID.
     For now, generates a new UUID each time.
     Future enhancement: retrieve from Claude Code session context.
+
+    Builds the canonical dashed UUID4 string straight from random bytes,
+    skipping the uuid.UUID object (same format as Claude Code session IDs).
     """
-    return str(uuid.uuid4())
+    raw = bytearray(os.urandom(16))
+    raw[6] = (raw[6] & 0x0F) | 0x40  # version 4
+    raw[8] = (raw[8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+# Last formatted second and its timestamp string (see get_timestamp)
+_timestamp_cache: list = [None, ""]
 
 
 def get_timestamp() -> str:
     """
     Get current timestamp in ISO 8601 format.
     Example: "2025-12-31T01:23:45Z"
+
+    The string only changes once per second, so it is formatted at most
+    once per second and reused in between.
     """
-    return datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    now = int(time.time())
+    if _timestamp_cache[0] != now:
+        t = time.gmtime(now)
+        _timestamp_cache[1] = (
+            f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}"
+            f"T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}Z"
+        )
+        _timestamp_cache[0] = now
+    return _timestamp_cache[1]
 
 
 def get_project_path() -> str:
@@ -46,57 +124,144 @@ def get_project_path() -> str:
            os.getcwd()
 
 
-def get_git_branch() -> Optional[str]:
+# Directory → (monotonic lookup time, branch) (see get_git_branch)
+_branch_cache: Dict[str, Tuple[float, Optional[str]]] = {}
+
+
+def get_git_branch(cwd: Optional[str] = None, ttl: float = GIT_BRANCH_TTL) -> Optional[str]:
     """
     Get current git branch name.
-    Returns None if not in git repo.
+    Returns None if not in git repo, or "HEAD" if HEAD is detached (as
+    git rev-parse --abbrev-ref HEAD prints).
+
+    Reads HEAD from the nearest enclosing repository instead of running git
+    (worktrees and submodules, whose .git is a "gitdir:" file, included).
+    Results are cached per directory for ttl seconds (0 always reads again).
+
+    Args:
+        cwd: Directory to look in (current directory if None)
+        ttl: Seconds a cached result stays valid
     """
+    key = os.path.abspath(cwd or os.getcwd())
+    now = time.monotonic()
+    cached = _branch_cache.get(key)
+    if cached is not None and now - cached[0] < ttl:
+        return cached[1]
+
+    branch = None
     try:
-        import subprocess
-        result = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout.strip()
-    except Exception:
-        return None
+        head = _read_git_head(Path(key))
+        if head is not None:
+            if head.startswith("ref: "):
+                ref = head[5:].strip()
+                branch = ref[11:] if ref.startswith("refs/heads/") else ref
+            else:
+                # Detached: HEAD holds a commit hash
+                branch = "HEAD"
+    except (OSError, UnicodeDecodeError):
+        branch = None
+
+    _branch_cache[key] = (now, branch)
+    return branch
+
+
+def _read_git_head(start: Path) -> Optional[str]:
+    """Return the HEAD contents of the repository enclosing start (None if none)"""
+    for directory in (start, *start.parents):
+        git_path = directory / ".git"
+        if git_path.is_dir():
+            return (git_path / "HEAD").read_text(encoding="utf-8").strip()
+        if git_path.is_file():
+            # Worktree / submodule: ".git" points at the real git directory
+            pointer = git_path.read_text(encoding="utf-8").strip()
+            if not pointer.startswith("gitdir:"):
+                return None
+            git_dir = directory / pointer[7:].strip()
+            return (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    return None
 
 
-def parse_jsonl(filepath: str, limit: Optional[int] = None) -> list:
+def parse_jsonl(filepath: str, limit: Optional[int] = None) -> Iterator[Any]:
     """
-    Parse JSONL file (one JSON object per line).
+    Parse JSONL file (one JSON object per line), yielding records as read.
+    Large files are never read whole; a missing file yields nothing.
+    Lines come from iter_jsonl_lines and are decoded by orjson when installed.
 
     Args:
         filepath: Path to JSONL file
         limit: Maximum number of lines to parse (for performance)
 
-    Returns:
-        List of parsed JSON objects
+    Yields:
+        Parsed JSON objects
     """
-    import json
-
-    records = []
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            for i, line in enumerate(f):
-                if limit and i >= limit:
-                    break
+        for line_num, line in iter_jsonl_lines(filepath):
+            if limit and line_num > limit:
+                return
 
-                line = line.strip()
-                if not line:
-                    continue
-
-                try:
-                    records.append(json.loads(line))
-                except json.JSONDecodeError:
-                    # Skip malformed lines
-                    continue
+            try:
+                record = _loads(line)
+            except ValueError:
+                # Skip malformed lines (JSONDecodeError, bad UTF-8)
+                continue
+            yield record
     except FileNotFoundError:
-        return []
+        return
+
+
+def iter_jsonl_lines(filepath) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield (line_number, line) for the non-blank lines of a JSONL file.
+
+    Lines are found with a C-level newline search over the raw bytes. Small
+    files are read and split at once; large ones are memory-mapped and
+    walked with find(), so only the current line is copied and a caller
+    that stops early never reads the rest.
+
+    Args:
+        filepath: Path to JSONL file
+
+    Yields:
+        Tuples of (1-based line number, stripped line bytes)
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    with open(filepath, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < JSONL_MMAP_MIN_SIZE:
+            for line_num, line in enumerate(f.read().split(b'\n'), 1):
+                line = line.strip()
+                if line:
+                    yield line_num, line
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
 
-    return records
+            find = mm.find
+            pos = 0
+            line_num = 0
+            while pos < size:
+                end = find(b'\n', pos)
+                if end < 0:
+                    end = size
+                line_num += 1
+                line = mm[pos:end].strip()
+                pos = end + 1
+                if line:
+                    yield line_num, line
+
+
+def parse_jsonl_list(filepath: str, limit: Optional[int] = None) -> list:
+    """
+    Parse JSONL file into a list (see parse_jsonl).
+
+    Returns:
+        List of parsed JSON objects
+    """
+    return list(parse_jsonl(filepath, limit))
 
 
 def get_monthly_filename(timestamp: Optional[str] = None) -> str:
@@ -111,8 +276,13 @@ def get_monthly_filename(timestamp: Optional[str] = None) -> str:
         Filename like "sessions-2025-12.json"
     """
     if timestamp:
+        # The month is the timestamp's own YYYY-MM, so read it off directly;
+        # anything unusual goes through the full parser
+        match = _ISO_DATE_PREFIX.match(timestamp)
+        if match:
+            return f"sessions-{match[1]}.json"
         dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-    else:
-        dt = datetime.utcnow()
+        return f"sessions-{dt.year:04d}-{dt.month:02d}.json"
 
-    return f"sessions-{dt.year:04d}-{dt.month:02d}.json"
+    t = time.gmtime()
+    return f"sessions-{t.tm_year:04d}-{t.tm_mon:02d}.json"
@@ -0,0 +1,111 @@
+"""
+Shared pytest configuration for Claude PMS tests
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+# Resolve scripts/ once for every test module; importing the core modules
+# here means the tests' own imports are plain sys.modules lookups
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import json_handler
+import recovery
+import redaction
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "durability: runs with real fsync calls (atomic write tests)"
+    )
+
+
+@pytest.fixture(autouse=True)
+def no_fsync(request, monkeypatch):
+    """
+    Make os.fsync a no-op so atomic writes skip the disk flush.
+    tmp_path is thrown away after each test, so durability only matters to
+    tests marked with @pytest.mark.durability, which keep the real call.
+    """
+    if request.node.get_closest_marker("durability") is None:
+        monkeypatch.setattr(os, "fsync", lambda fd: None)
+
+
+@pytest.fixture(autouse=True)
+def popen(monkeypatch):
+    """
+    Replace subprocess.Popen with a mock, so encoding never starts a real
+    background extract.py that outlives the test and its tmp_path.
+    Tests that check the spawn take this fixture to inspect the calls.
+    """
+    mock_popen = MagicMock()
+    monkeypatch.setattr(subprocess, "Popen", mock_popen)
+    return mock_popen
+
+
+@pytest.fixture(scope="session")
+def write_json():
+    """
+    Return a function that writes arrange-phase JSON to a path.
+    Uses orjson when installed; assertions keep reading with stdlib json.
+    """
+    try:
+        import orjson
+    except ImportError:
+        def write(path, data):
+            path.write_text(json.dumps(data))
+    else:
+        def write(path, data):
+            path.write_bytes(orjson.dumps(data))
+    return write
+
+
+@pytest.fixture(scope="session")
+def temp_leftovers():
+    """Return a function listing the *.tmp names in a directory (one scandir pass)"""
+    def leftovers(directory):
+        return [entry.name for entry in os.scandir(directory) if entry.name.endswith(".tmp")]
+    return leftovers
+
+
+@pytest.fixture(scope="session")
+def pms_template(tmp_path_factory, write_json):
+    """Valid, empty PMS tree built once per session (project root)"""
+    root = tmp_path_factory.mktemp("pms-template")
+    pms_dir = root / ".claude" / "pms"
+    for subdir in ("episodic", "semantic", "procedural"):
+        (pms_dir / subdir).mkdir(parents=True)
+
+    write_json(pms_dir / "episodic" / "sessions-2025-12.json", {"sessions": [], "count": 0})
+    write_json(pms_dir / "episodic" / "index.json", {})
+    write_json(pms_dir / "semantic" / "patterns.json", {"patterns": [], "count": 0})
+    write_json(pms_dir / "procedural" / "rules-metadata.json", {})
+    return root
+
+
+@pytest.fixture
+def pms_tree(pms_template, tmp_path):
+    """
+    Fresh copy of the template tree for one test, as a namespace of
+    root, pms_dir, episodic_dir, semantic_dir, procedural_dir and
+    episodic_file (the 2025-12 monthly file).
+    """
+    root = tmp_path / "project"
+    shutil.copytree(pms_template, root)
+    pms_dir = root / ".claude" / "pms"
+    return SimpleNamespace(
+        root=root,
+        pms_dir=pms_dir,
+        episodic_dir=pms_dir / "episodic",
+        semantic_dir=pms_dir / "semantic",
+        procedural_dir=pms_dir / "procedural",
+        episodic_file=pms_dir / "episodic" / "sessions-2025-12.json",
+    )
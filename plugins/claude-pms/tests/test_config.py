@@ -11,6 +11,7 @@ import pytest
 
 from scripts.config import (
     PMSConfig,
+    clear_config_cache,
     get_default_config,
     load_config,
     validate_config,
@@ -216,3 +217,76 @@ timeouts:
         # Values should be clamped to valid ranges
         assert config.min_sessions <= 1000  # Clamped to max
         assert config.timeout_encode <= 300  # Clamped to max
+
+
+def test_load_config_custom_redaction_patterns():
+    """Test that custom redaction patterns are parsed as a list"""
+    pytest.importorskip("yaml")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        claude_dir = Path(tmpdir) / ".claude"
+        claude_dir.mkdir()
+
+        config_file = claude_dir / "pms.local.md"
+        config_file.write_text("""---
+privacy:
+  redact_sensitive: true
+  custom_redaction_patterns:
+    - "secret[_-]?key"
+    - "internal_token_.*"
+---
+""")
+
+        config = load_config(tmpdir)
+
+        assert config.custom_redaction_patterns == ["secret[_-]?key", "internal_token_.*"]
+
+
+def test_load_config_cached_until_file_changes():
+    """Test that load_config reuses the parsed config until the file changes"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        claude_dir = Path(tmpdir) / ".claude"
+        claude_dir.mkdir()
+
+        config_file = claude_dir / "pms.local.md"
+        config_file.write_text("""---
+thresholds:
+  min_sessions: 15
+---
+""")
+
+        first = load_config(tmpdir)
+        assert load_config(tmpdir) is first
+
+        # Rewrite with a different size and mtime - cache must be invalidated
+        config_file.write_text("""---
+thresholds:
+  min_sessions: 250
+---
+""")
+        st = config_file.stat()
+        os.utime(config_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        second = load_config(tmpdir)
+        assert second is not first
+        assert second.min_sessions == 250
+
+        clear_config_cache()
+        assert load_config(tmpdir) is not second
+
+
+def test_load_config_missing_file_cached():
+    """Test that a missing config file is cached until the file appears"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        first = load_config(tmpdir)
+        assert load_config(tmpdir) is first
+
+        claude_dir = Path(tmpdir) / ".claude"
+        claude_dir.mkdir()
+        (claude_dir / "pms.local.md").write_text("""---
+thresholds:
+  min_sessions: 42
+---
+""")
+
+        assert load_config(tmpdir).min_sessions == 42
@@ -5,79 +5,223 @@ Tests episodic encoding from context and JSONL
 
 import json
 import os
-import tempfile
+import re
+import shutil
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
-# Import from scripts
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+import encode
+import utils
+from encode import encode_session, encode_from_context, encode_from_jsonl, trigger_extraction
 
-from encode import encode_session, encode_from_context, encode_from_jsonl
 
-
-def test_encode_from_context_creates_record():
+def test_encode_from_context_creates_record(tmp_path):
     """Test that context-first encoding creates valid episodic record"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        session_id = "test-session-123"
-        trigger = "manual"
-
-        record = encode_from_context(tmpdir, session_id, trigger)
-
-        # Verify required fields
-        assert record["session_id"] == session_id
-        assert record["timestamp"]  # Should have timestamp
-        assert record["project_path"] == tmpdir
-        assert record["trigger"] == trigger
-        assert record["encoding_mode"] == "context"
-
-        # Verify structure
-        assert "task_summary" in record
-        assert "work_summary" in record
-        assert "design_decisions" in record
-        assert "challenges" in record
-        assert "solutions" in record
-        assert "user_preferences" in record
-        assert "code_patterns" in record
-        assert "anti_patterns" in record
-        assert "context" in record
-
-
-def test_encode_from_jsonl_creates_record():
+    session_id = "test-session-123"
+    trigger = "manual"
+
+    record = encode_from_context(str(tmp_path), session_id, trigger)
+
+    # Verify required fields
+    assert record["session_id"] == session_id
+    assert record["timestamp"]  # Should have timestamp
+    assert record["project_path"] == str(tmp_path)
+    assert record["trigger"] == trigger
+    assert record["encoding_mode"] == "context"
+
+    # Verify structure
+    assert "task_summary" in record
+    assert "work_summary" in record
+    assert "design_decisions" in record
+    assert "challenges" in record
+    assert "solutions" in record
+    assert "user_preferences" in record
+    assert "code_patterns" in record
+    assert "anti_patterns" in record
+    assert "context" in record
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _transcript_dir(home: Path, project_path: str) -> Path:
+    """Directory Claude Code uses for a project's transcripts"""
+    project_slug = re.sub(r'[^A-Za-z0-9]', '-', os.path.abspath(project_path))
+    transcript_dir = home / ".claude" / "projects" / project_slug
+    transcript_dir.mkdir(parents=True, exist_ok=True)
+    return transcript_dir
+
+
+def test_encode_from_jsonl_creates_record(tmp_path):
     """Test that JSONL fallback encoding creates valid episodic record"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        session_id = "test-session-456"
-        trigger = "precompact"
+    session_id = "test-session-456"
+    trigger = "precompact"
+
+    # Place the session transcript where Claude Code would write it
+    home = tmp_path / "home"
+    project_path = str(tmp_path / "project")
+    transcript_dir = _transcript_dir(home, project_path)
+    shutil.copy(FIXTURES_DIR / "sample-transcript.jsonl", transcript_dir / f"{session_id}.jsonl")
+
+    with patch("pathlib.Path.home", return_value=home):
+        record = encode_from_jsonl(project_path, session_id, trigger)
+
+    # Verify required fields
+    assert record["session_id"] == session_id
+    assert record["timestamp"]
+    assert record["project_path"] == project_path
+    assert record["trigger"] == trigger
+    assert record["encoding_mode"] == "jsonl_fallback"
+
+    # Verify fallback structure
+    assert "task_summary" in record
+    assert "work_summary" in record
+    assert "transcript" in record
+    assert record["transcript"]["record_count"] == 9
+    assert sorted(record["context"]["files_modified"]) == ["src/auth/routes.py", "src/models/user.py"]
+
+
+def test_encode_from_jsonl_skips_malformed_lines(tmp_path):
+    """Test that malformed and blank JSONL lines are skipped and counted"""
+    home = tmp_path / "home"
+    project_path = str(tmp_path / "project")
+    transcript = _transcript_dir(home, project_path) / "session-bad.jsonl"
+    transcript.write_text(
+        '{"tool_name": "Read"}\n'
+        '\n'
+        '{"tool_name": "Edit", "incomplete\n'
+        '{"tool_name": "Read", "error": "boom"}'  # no trailing newline
+    )
+
+    with patch("pathlib.Path.home", return_value=home):
+        record = encode_from_jsonl(project_path, "session-bad", "manual")
+
+    assert record["transcript"]["record_count"] == 2
+    assert record["transcript"]["malformed_lines"] == 1
+    assert record["context"]["tool_counts"] == {"Read": 2}
+    assert record["challenges"] == ["boom"]
+
+
+def test_encode_session_timeout_saves_partial_record(tmp_path):
+    """Test that a transcript read past the deadline saves a partial record"""
+    home = tmp_path / "home"
+    project_path = str(tmp_path / "project")
+    transcript = _transcript_dir(home, project_path) / "session-slow.jsonl"
+    transcript.write_text('{"tool_name": "Read"}\n' * 200)
+
+    config_file = Path(project_path) / ".claude" / "pms.local.md"
+    config_file.parent.mkdir(parents=True)
+    config_file.write_text("""---
+encoding:
+  prefer_context: false
+  fallback_jsonl: true
+processing:
+  continuous_mode: false
+---
+""")
+
+    with patch("pathlib.Path.home", return_value=home):
+        success = encode_session(project_path, "manual", "session-slow", timeout=-1)
+
+    assert success is False
+
+    monthly_files = list((Path(project_path) / ".claude" / "pms" / "episodic").glob("sessions-*.json"))
+    data = json.loads(monthly_files[0].read_text())
+    assert data["sessions"][0]["encoding_mode"] == "partial_timeout"
+    assert data["sessions"][0]["session_id"] == "session-slow"
+
+
+@pytest.mark.parametrize("mmap_min_size", [0, 1 << 30])
+def test_iter_jsonl_lines_numbers_non_blank_lines(tmp_path, monkeypatch, mmap_min_size):
+    """Test read and memory-mapped scans yield the same numbered, stripped lines"""
+    monkeypatch.setattr(utils, "JSONL_MMAP_MIN_SIZE", mmap_min_size)
+    transcript = tmp_path / "t.jsonl"
+    transcript.write_bytes(b'{"a": 1}\n\n  \n {"b": 2} \r\n{"c": 3}')
+
+    assert list(utils.iter_jsonl_lines(transcript)) == [
+        (1, b'{"a": 1}'), (4, b'{"b": 2}'), (5, b'{"c": 3}')
+    ]
+
+
+def test_encode_from_jsonl_deadline_checked_despite_blank_lines(tmp_path):
+    """Test the deadline is checked when blank lines separate the records"""
+    home = tmp_path / "home"
+    project_path = str(tmp_path / "project")
+    transcript = _transcript_dir(home, project_path) / "session-spaced.jsonl"
+    transcript.write_text('{"tool_name": "Read"}\n\n' * 200)
+
+    with patch("pathlib.Path.home", return_value=home):
+        with pytest.raises(encode.TimeoutError):
+            encode_from_jsonl(project_path, "session-spaced", "manual", deadline=0.0)
+
+
+def test_encode_session_timeout_before_save_saves_partial_record(tmp_path):
+    """Test a deadline that passes after encoding still stops before the save"""
+    project_path = str(tmp_path / "project")
+    Path(project_path).mkdir()
 
-        record = encode_from_jsonl(tmpdir, session_id, trigger)
+    with patch("encode.encode_from_context", return_value={
+        "session_id": "session-ctx",
+        "timestamp": "2025-12-31T10:00:00Z",
+        "encoding_mode": "context",
+        "task_summary": "done",
+    }):
+        success = encode_session(project_path, "manual", "session-ctx", timeout=-1)
 
-        # Verify required fields
-        assert record["session_id"] == session_id
-        assert record["timestamp"]
-        assert record["project_path"] == tmpdir
-        assert record["trigger"] == trigger
-        assert record["encoding_mode"] == "jsonl_fallback"
+    assert success is False
+    monthly_files = list((Path(project_path) / ".claude" / "pms" / "episodic").glob("sessions-*.json"))
+    data = json.loads(monthly_files[0].read_text())
+    assert [s["encoding_mode"] for s in data["sessions"]] == ["partial_timeout"]
 
-        # Verify fallback structure
-        assert "task_summary" in record
-        assert "work_summary" in record
-        assert "transcript" in record
 
+def test_encode_session_timeout_appends_partial_record_to_sidecar(pms_tree):
+    """Test a partial record for an existing month is saved like a full one"""
+    from json_handler import iter_sessions, sidecar_path
 
-def test_encode_session_saves_monthly_file():
+    with patch("encode.get_timestamp", return_value="2025-12-31T10:00:00Z"):
+        success = encode_session(str(pms_tree.root), "manual", "session-late", timeout=-1)
+
+    assert success is False
+    assert os.path.exists(sidecar_path(str(pms_tree.episodic_file)))
+    index = json.loads((pms_tree.episodic_dir / "index.json").read_text())
+    assert index == {"session-late": "sessions-2025-12.json"}
+    assert [s["encoding_mode"] for s in iter_sessions(str(pms_tree.episodic_file))] == ["partial_timeout"]
+
+
+def test_encode_from_jsonl_ignores_other_sessions(tmp_path):
+    """Test that JSONL fallback only reads the requested session's transcript"""
+    home = tmp_path / "home"
+    other_dir = home / ".claude" / "projects" / "-some-other-project"
+    other_dir.mkdir(parents=True)
+    shutil.copy(FIXTURES_DIR / "sample-transcript.jsonl", other_dir / "other-session.jsonl")
+
+    with patch("pathlib.Path.home", return_value=home):
+        record = encode_from_jsonl(str(tmp_path / "project"), "missing-session", "manual")
+
+    assert record is None
+
+
+@pytest.fixture
+def pms_project(tmp_path):
+    """
+    Project root with .claude/pms created.
+    Returns a function that writes pms.local.md frontmatter and returns the
+    project path.
+    """
+    (tmp_path / ".claude" / "pms").mkdir(parents=True)
+
+    def write_config(frontmatter: str) -> str:
+        (tmp_path / ".claude" / "pms.local.md").write_text(f"---\n{frontmatter}---\n")
+        return str(tmp_path)
+
+    return write_config
+
+
+def test_encode_session_saves_monthly_file(pms_project):
     """Test that encode_session saves to monthly file"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Create PMS directory structure
-        pms_dir = Path(tmpdir) / ".claude" / "pms"
-        pms_dir.mkdir(parents=True)
-
-        # Create default config
-        config_file = Path(tmpdir) / ".claude" / "pms.local.md"
-        config_file.parent.mkdir(parents=True, exist_ok=True)
-        config_file.write_text("""---
-triggers:
+    project_path = pms_project("""triggers:
   precompact: true
 encoding:
   prefer_context: true
@@ -86,127 +230,151 @@ privacy:
   redact_sensitive: false
 processing:
   continuous_mode: false
----
 """)
 
-        # Encode session
-        success = encode_session(tmpdir, "manual", "test-session-789")
+    # Encode session
+    success = encode_session(project_path, "manual", "test-session-789")
 
-        assert success is True
+    assert success is True
 
-        # Verify monthly file created
-        episodic_dir = pms_dir / "episodic"
-        assert episodic_dir.exists()
+    # Verify monthly file created
+    episodic_dir = Path(project_path) / ".claude" / "pms" / "episodic"
+    assert episodic_dir.exists()
 
-        # Check for monthly file (sessions-YYYY-MM.json)
-        monthly_files = list(episodic_dir.glob("sessions-*.json"))
-        assert len(monthly_files) > 0
+    # Check for monthly file (sessions-YYYY-MM.json)
+    monthly_files = list(episodic_dir.glob("sessions-*.json"))
+    assert len(monthly_files) > 0
 
-        # Verify content
-        with open(monthly_files[0], 'r') as f:
-            data = json.load(f)
-            assert "sessions" in data
-            assert len(data["sessions"]) == 1
-            assert data["sessions"][0]["session_id"] == "test-session-789"
+    # Verify content
+    with open(monthly_files[0], 'r') as f:
+        data = json.load(f)
+        assert "sessions" in data
+        assert len(data["sessions"]) == 1
+        assert data["sessions"][0]["session_id"] == "test-session-789"
 
 
-def test_encode_session_updates_index():
+def test_encode_session_updates_index(pms_project):
     """Test that encode_session updates index.json"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Create PMS directory structure
-        pms_dir = Path(tmpdir) / ".claude" / "pms"
-        pms_dir.mkdir(parents=True)
-
-        # Create default config (redaction disabled for test)
-        config_file = Path(tmpdir) / ".claude" / "pms.local.md"
-        config_file.parent.mkdir(parents=True, exist_ok=True)
-        config_file.write_text("""---
-privacy:
+    # Redaction disabled for test
+    project_path = pms_project("""privacy:
   redact_sensitive: false
 processing:
   continuous_mode: false
----
 """)
 
-        # Encode session
-        session_id = "test-session-abc"
-        encode_session(tmpdir, "manual", session_id)
+    # Encode session
+    session_id = "test-session-abc"
+    encode_session(project_path, "manual", session_id)
 
-        # Verify index updated
-        index_file = pms_dir / "episodic" / "index.json"
-        assert index_file.exists()
+    # Verify index updated
+    index_file = Path(project_path) / ".claude" / "pms" / "episodic" / "index.json"
+    assert index_file.exists()
 
-        with open(index_file, 'r') as f:
-            index = json.load(f)
-            assert session_id in index
-            assert index[session_id].startswith("sessions-")
+    with open(index_file, 'r') as f:
+        index = json.load(f)
+        assert session_id in index
+        assert index[session_id].startswith("sessions-")
 
 
-def test_encode_session_applies_redaction():
+def test_encode_session_applies_redaction(pms_project):
     """Test that encode_session redacts sensitive data"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Create PMS structure
-        pms_dir = Path(tmpdir) / ".claude" / "pms"
-        pms_dir.mkdir(parents=True)
-
-        # Config with redaction enabled
-        config_file = Path(tmpdir) / ".claude" / "pms.local.md"
-        config_file.parent.mkdir(parents=True, exist_ok=True)
-        config_file.write_text("""---
-privacy:
+    project_path = pms_project("""privacy:
   redact_sensitive: true
 processing:
   continuous_mode: false
----
 """)
 
-        # Encode session
-        success = encode_session(tmpdir, "manual")
+    # Encode session
+    success = encode_session(project_path, "manual")
 
-        assert success is True
+    assert success is True
 
-        # Verify monthly file exists and check for redaction
-        episodic_dir = pms_dir / "episodic"
-        monthly_files = list(episodic_dir.glob("sessions-*.json"))
+    # Verify monthly file exists and check for redaction
+    episodic_dir = Path(project_path) / ".claude" / "pms" / "episodic"
+    monthly_files = list(episodic_dir.glob("sessions-*.json"))
 
-        with open(monthly_files[0], 'r') as f:
-            content = f.read()
-            # Sensitive patterns should be redacted if present
-            # (This test passes if no exceptions occur)
-            assert "sessions" in content
+    with open(monthly_files[0], 'r') as f:
+        content = f.read()
+        # Sensitive patterns should be redacted if present
+        # (This test passes if no exceptions occur)
+        assert "sessions" in content
 
 
-def test_encode_session_handles_missing_config():
+def test_encode_session_handles_missing_config(tmp_path, popen):
     """Test that encode_session works with missing config (uses defaults)"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # No config file created - should use defaults
+    # No config file created - should use defaults
 
-        # Encode session
-        success = encode_session(tmpdir, "manual")
+    # Encode session
+    success = encode_session(str(tmp_path), "manual")
 
-        # Should still succeed with default config
-        assert success is True
+    # Should still succeed with default config (continuous mode included)
+    assert success is True
+    popen.assert_called_once()
 
 
-def test_encode_from_context_captures_git_branch():
+def test_encode_session_triggers_background_extraction(pms_project, popen):
+    """Test that continuous mode starts extraction without waiting for it"""
+    project_path = pms_project("""privacy:
+  redact_sensitive: false
+processing:
+  continuous_mode: true
+""")
+
+    with patch("encode.get_git_branch", return_value=None):
+        success = encode_session(project_path, "manual", "test-session-bg")
+
+    assert success is True
+    popen.assert_called_once()
+    args = popen.call_args[0][0]
+    assert args[1].endswith("extract.py")
+    assert args[2:] == ["--project-path", project_path]
+    popen.return_value.wait.assert_not_called()
+
+
+def test_trigger_extraction_handles_spawn_failure():
+    """Test that a failed spawn is reported, not raised"""
+    with patch("subprocess.Popen", side_effect=OSError("no fork")):
+        assert trigger_extraction("/nonexistent") is False
+
+
+@pytest.fixture(scope="session")
+def git_template(tmp_path_factory):
+    """Empty git repository on branch feature-test, initialized once per session"""
+    import subprocess
+    repo = tmp_path_factory.mktemp("git-template")
+    try:
+        subprocess.run(["git", "init", "-q"], cwd=repo, check=True, capture_output=True)
+        subprocess.run(
+            ["git", "symbolic-ref", "HEAD", "refs/heads/feature-test"],
+            cwd=repo,
+            check=True,
+            capture_output=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip("Git not available")
+    return repo
+
+
+def test_encode_from_context_captures_git_branch(git_template, tmp_path):
     """Test that encoding captures git branch if available"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Initialize git repo
-        import subprocess
-        try:
-            subprocess.run(["git", "init"], cwd=tmpdir, check=True, capture_output=True)
-            subprocess.run(
-                ["git", "checkout", "-b", "feature-test"],
-                cwd=tmpdir,
-                check=True,
-                capture_output=True
-            )
-
-            record = encode_from_context(tmpdir, "test-id", "manual")
-
-            # Should capture branch name
-            assert record["git_branch"] == "feature-test"
-
-        except Exception:
-            # Git not available or other error - skip test
-            pytest.skip("Git not available")
+    project = tmp_path / "project"
+    shutil.copytree(git_template, project)
+
+    record = encode_from_context(str(project), "test-id", "manual")
+
+    # Should capture branch name
+    assert record["git_branch"] == "feature-test"
+
+
+@pytest.mark.parametrize("head, branch", [
+    ("ref: refs/heads/feature-test\n", "feature-test"),
+    ("0123456789abcdef0123456789abcdef01234567\n", "HEAD"),
+], ids=["branch", "detached"])
+def test_get_git_branch_reads_head(tmp_path, head, branch):
+    """Test the branch comes from .git/HEAD, with "HEAD" for a detached HEAD"""
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "HEAD").write_text(head)
+    subdir = tmp_path / "src"
+    subdir.mkdir()
+
+    assert utils.get_git_branch(str(subdir), ttl=0) == branch
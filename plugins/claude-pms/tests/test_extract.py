@@ -11,10 +11,6 @@ from unittest.mock import patch
 
 import pytest
 
-# Import from scripts
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
-
 from extract import (
     extract_patterns,
     load_all_sessions,
@@ -23,6 +19,7 @@ from extract import (
     extract_code_patterns,
     extract_anti_patterns,
     categorize_strength,
+    pattern_id,
     save_semantic_knowledge
 )
 
@@ -140,6 +137,41 @@ def test_load_all_sessions_from_multiple_files():
         assert len(corrupted_files) == 0  # No corrupted files
 
 
+def test_load_all_sessions_skips_corrupted_files():
+    """Test that invalid monthly files are reported and skipped"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        episodic_dir = Path(tmpdir)
+
+        (episodic_dir / "sessions-2025-10.json").write_text(json.dumps({"count": 0}))
+        (episodic_dir / "sessions-2025-11.json").write_text("not json at all")
+        (episodic_dir / "sessions-2025-12.json").write_text(json.dumps({
+            "sessions": [{"session_id": "session-1"}]
+        }))
+
+        all_sessions, corrupted_files = load_all_sessions(episodic_dir)
+
+        assert [s["session_id"] for s in all_sessions] == ["session-1"]
+        assert len(corrupted_files) == 2
+
+
+
+def test_load_all_sessions_parallel_keeps_month_order():
+    """Test that parsing many monthly files in workers preserves order"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        episodic_dir = Path(tmpdir)
+
+        for month in range(1, 6):
+            (episodic_dir / f"sessions-2025-{month:02d}.json").write_text(json.dumps({
+                "sessions": [{"session_id": f"{month}-{i}"} for i in range(3)]
+            }))
+
+        all_sessions, corrupted_files = load_all_sessions(episodic_dir)
+
+        assert [s["session_id"] for s in all_sessions] == [
+            f"{month}-{i}" for month in range(1, 6) for i in range(3)
+        ]
+        assert corrupted_files == []
+
 def test_categorize_strength():
     """Test pattern strength categorization"""
     # Test emerging (2+)
@@ -256,12 +288,12 @@ def test_detect_frequency_patterns_filters_by_threshold():
     patterns = detect_frequency_patterns(sessions, emerging_threshold=2, strong_threshold=3, critical_threshold=5)
 
     # "Common preference" appears 3 times - should be included
-    common_prefs = [p for p in patterns if p["description"] == "Common preference"]
+    common_prefs = [p for p in patterns if p.description == "Common preference"]
     assert len(common_prefs) == 1
-    assert common_prefs[0]["occurrences"] == 3
+    assert common_prefs[0].occurrences == 3
 
     # "Rare preference" appears 1 time - should be excluded
-    rare_prefs = [p for p in patterns if p["description"] == "Rare preference"]
+    rare_prefs = [p for p in patterns if p.description == "Rare preference"]
     assert len(rare_prefs) == 0
 
 
@@ -280,21 +312,62 @@ def test_detect_frequency_patterns_assigns_correct_strength():
     patterns = detect_frequency_patterns(sessions, emerging_threshold=2, strong_threshold=3, critical_threshold=5)
 
     # Critical pattern (10 occurrences)
-    critical = [p for p in patterns if p["description"] == "Critical pattern"][0]
-    assert critical["strength"] == "critical"
-    assert critical["occurrences"] == 10
+    critical = [p for p in patterns if p.description == "Critical pattern"][0]
+    assert critical.strength == "critical"
+    assert critical.occurrences == 10
 
     # Strong pattern (4 occurrences)
-    strong = [p for p in patterns if p["description"] == "Strong pattern"][0]
-    assert strong["strength"] == "strong"
-    assert strong["occurrences"] == 4
+    strong = [p for p in patterns if p.description == "Strong pattern"][0]
+    assert strong.strength == "strong"
+    assert strong.occurrences == 4
 
     # Emerging pattern (2 occurrences)
-    emerging = [p for p in patterns if p["description"] == "Emerging pattern"][0]
-    assert emerging["strength"] == "emerging"
-    assert emerging["occurrences"] == 2
+    emerging = [p for p in patterns if p.description == "Emerging pattern"][0]
+    assert emerging.strength == "emerging"
+    assert emerging.occurrences == 2
+
+
+
+def test_detect_frequency_patterns_uses_given_timestamp():
+    """Test that every pattern shares the detected_at passed in"""
+    sessions = [
+        {
+            "session_id": f"session-{i}",
+            "user_preferences": ["Pref"],
+            "code_patterns": ["Code"],
+            "anti_patterns": ["Anti"]
+        }
+        for i in range(3)
+    ]
+
+    patterns = detect_frequency_patterns(
+        sessions, emerging_threshold=2, strong_threshold=3, critical_threshold=5,
+        detected_at="2025-12-01T00:00:00Z"
+    )
+
+    assert len(patterns) == 3
+    assert {p.detected_at for p in patterns} == {"2025-12-01T00:00:00Z"}
 
 
+def test_detect_frequency_patterns_caps_evidence_but_counts_all():
+    """Test that evidence is capped while occurrences stay exact"""
+    sessions = [
+        {"session_id": f"session-{i}", "user_preferences": ["Popular"]}
+        for i in range(50)
+    ]
+
+    patterns = detect_frequency_patterns(sessions, emerging_threshold=2, strong_threshold=3, critical_threshold=5)
+
+    assert patterns[0].occurrences == 50
+    assert patterns[0].evidence == [f"session-{i}" for i in range(10)]
+
+
+def test_pattern_id_is_stable():
+    """Test that pattern IDs do not depend on the process hash seed"""
+    assert pattern_id("pref", "Always run tests") == "pref_4f934c619dfd"
+    assert pattern_id("anti", "Always run tests") == "anti_4f934c619dfd"
+    assert pattern_id("pref", "Use type hints") != pattern_id("pref", "Always run tests")
+
 def test_save_semantic_knowledge():
     """Test semantic knowledge file creation"""
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -405,3 +478,164 @@ processing:
             descriptions = [p["description"] for p in data["preferences"]]
             assert "Use TDD" in descriptions
             assert "String preference" in descriptions
+
+
+def test_extract_patterns_incremental_does_not_double_count():
+    """Test that repeated extraction only counts new sessions once"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        episodic_dir = Path(tmpdir) / ".claude" / "pms" / "episodic"
+        episodic_dir.mkdir(parents=True)
+        sessions_file = episodic_dir / "sessions-2025-12.json"
+
+        def write_sessions(count):
+            sessions_file.write_text(json.dumps({
+                "sessions": [
+                    {
+                        "session_id": f"session-{i}",
+                        "timestamp": f"2025-12-01T00:00:{i:02d}Z",
+                        "user_preferences": ["Always run tests before commits"]
+                    }
+                    for i in range(count)
+                ]
+            }))
+
+        def occurrences():
+            patterns_file = Path(tmpdir) / ".claude" / "pms" / "semantic" / "patterns.json"
+            patterns = json.loads(patterns_file.read_text())["patterns"]
+            return patterns[0]["occurrences"]
+
+        write_sessions(12)
+        assert extract_patterns(tmpdir, min_sessions=10) is True
+        assert occurrences() == 12
+
+        # Same episodic data again: nothing new to count
+        assert extract_patterns(tmpdir, min_sessions=10) is True
+        assert occurrences() == 12
+
+        # One appended session is picked up
+        write_sessions(13)
+        assert extract_patterns(tmpdir, min_sessions=10) is True
+        assert occurrences() == 13
+
+        # Full rescan ignores saved state
+        assert extract_patterns(tmpdir, min_sessions=10, full=True) is True
+        assert occurrences() == 13
+
+
+def test_extract_patterns_incremental_skips_consumed_months(capsys):
+    """Test that months unchanged since the last extraction are not reopened"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        episodic_dir = Path(tmpdir) / ".claude" / "pms" / "episodic"
+        episodic_dir.mkdir(parents=True)
+
+        for month in (11, 12):
+            (episodic_dir / f"sessions-2025-{month}.json").write_text(json.dumps({
+                "sessions": [
+                    {
+                        "session_id": f"{month}-{i}",
+                        "timestamp": f"2025-{month}-01T00:00:{i:02d}Z",
+                        "user_preferences": ["Always run tests before commits"]
+                    }
+                    for i in range(6)
+                ]
+            }))
+
+        assert extract_patterns(tmpdir, min_sessions=10) is True
+
+        # Garble November behind an unchanged size and mtime: were it read
+        # again, it would be reported as corrupted
+        november = episodic_dir / "sessions-2025-11.json"
+        st = november.stat()
+        november.write_text("x" * st.st_size)
+        os.utime(november, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        # A December session forces a run; only December is read
+        december = episodic_dir / "sessions-2025-12.json"
+        data = json.loads(december.read_text())
+        data["sessions"].append({
+            "session_id": "12-6",
+            "timestamp": "2025-12-01T00:00:06Z",
+            "user_preferences": ["Always run tests before commits"]
+        })
+        december.write_text(json.dumps(data))
+        capsys.readouterr()
+
+        assert extract_patterns(tmpdir, min_sessions=10) is True
+        assert "sessions-2025-11.json" not in capsys.readouterr().err
+
+        patterns_file = Path(tmpdir) / ".claude" / "pms" / "semantic" / "patterns.json"
+        patterns = json.loads(patterns_file.read_text())["patterns"]
+        assert patterns[0]["occurrences"] == 13
+
+
+def test_extract_patterns_incremental_counts_late_sessions():
+    """Test sessions saved after a newer one are still counted once"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        episodic_dir = Path(tmpdir) / ".claude" / "pms" / "episodic"
+        episodic_dir.mkdir(parents=True)
+        sessions_file = episodic_dir / "sessions-2025-12.json"
+        sessions = [
+            {
+                "session_id": f"session-{i}",
+                "timestamp": f"2025-12-02T00:00:{i:02d}Z",
+                "user_preferences": ["Always run tests before commits"]
+            }
+            for i in range(12)
+        ]
+
+        def occurrences():
+            patterns_file = Path(tmpdir) / ".claude" / "pms" / "semantic" / "patterns.json"
+            return json.loads(patterns_file.read_text())["patterns"][0]["occurrences"]
+
+        sessions_file.write_text(json.dumps({"sessions": sessions}))
+        assert extract_patterns(tmpdir, min_sessions=10) is True
+        assert occurrences() == 12
+
+        # Started encoding before every session above, saved after them
+        sessions.append({
+            "session_id": "late",
+            "timestamp": "2025-12-01T00:00:00Z",
+            "user_preferences": ["Always run tests before commits"]
+        })
+        sessions_file.write_text(json.dumps({"sessions": sessions}))
+        assert extract_patterns(tmpdir, min_sessions=10) is True
+        assert occurrences() == 13
+
+        # A record without a timestamp is counted once too
+        sessions.append({"session_id": "untimed", "user_preferences": ["Always run tests before commits"]})
+        sessions_file.write_text(json.dumps({"sessions": sessions}))
+        assert extract_patterns(tmpdir, min_sessions=10) is True
+        sessions_file.write_text(json.dumps({"sessions": sessions}, indent=2))
+        assert extract_patterns(tmpdir, min_sessions=10) is True
+        assert occurrences() == 14
+
+
+def test_extract_patterns_skips_unchanged_episodic_files(capsys):
+    """Test that extraction is a no-op when no monthly file changed"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        episodic_dir = Path(tmpdir) / ".claude" / "pms" / "episodic"
+        episodic_dir.mkdir(parents=True)
+        sessions_file = episodic_dir / "sessions-2025-12.json"
+
+        def write_sessions(count):
+            sessions_file.write_text(json.dumps({
+                "sessions": [
+                    {"session_id": f"session-{i}", "user_preferences": ["Always run tests"]}
+                    for i in range(count)
+                ]
+            }))
+
+        write_sessions(12)
+        assert extract_patterns(tmpdir, min_sessions=10) is True
+        patterns_file = Path(tmpdir) / ".claude" / "pms" / "semantic" / "patterns.json"
+        written = patterns_file.stat().st_mtime_ns
+        capsys.readouterr()
+
+        assert extract_patterns(tmpdir, min_sessions=10) is True
+        assert "up to date" in capsys.readouterr().out
+        assert patterns_file.stat().st_mtime_ns == written
+
+        write_sessions(13)
+        assert extract_patterns(tmpdir, min_sessions=10) is True
+        assert "up to date" not in capsys.readouterr().out
+        assert json.loads(patterns_file.read_text())["patterns"][0]["occurrences"] == 13
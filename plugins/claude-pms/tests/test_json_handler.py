@@ -6,30 +6,40 @@ Tests atomic writes, corruption handling, and safe operations
 import json
 import os
 import tempfile
-from pathlib import Path
 
 import pytest
 
-# Add parent directory to path for imports
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
-
 from json_handler import (
+    iter_sessions,
     safe_load,
     safe_save,
     merge_monthly,
+    save_episodic,
+    save_many,
+    compact_month,
     update_index,
 )
+import json_handler
 
 
 class TestSafeLoad:
     """Tests for safe_load function"""
 
-    def test_load_valid_json(self, tmp_path):
+    def test_load_valid_json(self, tmp_path, write_json):
         """Test loading valid JSON file"""
         test_file = tmp_path / "test.json"
         test_data = {"key": "value", "number": 42}
-        test_file.write_text(json.dumps(test_data))
+        write_json(test_file, test_data)
+
+        result = safe_load(str(test_file))
+        assert result == test_data
+
+    def test_load_large_json(self, tmp_path, write_json):
+        """Test loading a file large enough to be memory-mapped"""
+        test_file = tmp_path / "large.json"
+        test_data = {"sessions": [{"session_id": f"session-{i}", "note": "x" * 100} for i in range(1000)]}
+        write_json(test_file, test_data)
+        assert test_file.stat().st_size > 64 * 1024
 
         result = safe_load(str(test_file))
         assert result == test_data
@@ -66,6 +76,14 @@ class TestSafeLoad:
         # Should return default since repair attempts to parse as single JSON
         assert isinstance(result, dict)
 
+    def test_load_repairs_trailing_garbage(self, tmp_path):
+        """Test repair keeps the last complete structure before the damage"""
+        test_file = tmp_path / "corrupted.json"
+        test_file.write_text('{"sessions": [{"id": 1}, {"id": 2}]}\n{"id": 3}, {"trunc')
+
+        result = safe_load(str(test_file), default=None)
+        assert result == {"sessions": [{"id": 1}, {"id": 2}]}
+
 
 class TestSafeSave:
     """Tests for safe_save function"""
@@ -91,7 +109,8 @@ class TestSafeSave:
         assert result is True
         assert test_file.exists()
 
-    def test_save_uses_atomic_write(self, tmp_path):
+    @pytest.mark.durability
+    def test_save_uses_atomic_write(self, tmp_path, temp_leftovers):
         """Test saving uses temp file + rename pattern"""
         test_file = tmp_path / "test.json"
         test_data = {"atomic": True}
@@ -101,8 +120,7 @@ class TestSafeSave:
         assert result is True
 
         # Verify no temp file left behind
-        temp_file = Path(str(test_file) + ".tmp")
-        assert not temp_file.exists()
+        assert not temp_leftovers(tmp_path)
 
     def test_save_overwrites_existing(self, tmp_path):
         """Test saving overwrites existing file"""
@@ -132,12 +150,35 @@ class TestSafeSave:
                 raise OSError("Simulated failure")
             return original_open(*args, **kwargs)
 
-        monkeypatch.setattr("builtins.open", mock_open)
+        # Shadow open() in json_handler only; patching builtins would route
+        # every open() in the interpreter (pytest included) through the mock
+        monkeypatch.setattr(json_handler, "open", mock_open, raising=False)
+
+        # Record the backoff instead of sleeping through it
+        delays = []
+        monkeypatch.setattr(json_handler.time, "sleep", delays.append)
 
         result = safe_save(str(test_file), test_data, max_retries=3)
         # Should succeed on second attempt
         assert result is True
         assert attempt_count[0] >= 2
+        assert delays == [0.1]
+
+    @pytest.mark.parametrize("indent", [2, 4])
+    def test_save_dataclass_as_object(self, tmp_path, indent):
+        """Test dataclass instances are saved as JSON objects"""
+        from dataclasses import dataclass
+
+        @dataclass
+        class Point:
+            x: int
+            y: int
+
+        test_file = tmp_path / "test.json"
+        result = safe_save(str(test_file), {"points": [Point(1, 2)]}, indent=indent)
+
+        assert result is True
+        assert json.loads(test_file.read_text()) == {"points": [{"x": 1, "y": 2}]}
 
 
 class TestMergeMonthly:
@@ -163,7 +204,7 @@ class TestMergeMonthly:
         assert data["count"] == 1
         assert data["last_updated"] == session_record["timestamp"]
 
-    def test_merge_to_existing_file(self, tmp_path):
+    def test_merge_to_existing_file(self, tmp_path, write_json):
         """Test merging to existing monthly file"""
         monthly_file = tmp_path / "sessions-2025-12.json"
 
@@ -176,7 +217,7 @@ class TestMergeMonthly:
             "count": 1,
             "last_updated": "2025-12-30T10:00:00Z"
         }
-        monthly_file.write_text(json.dumps(existing_data))
+        write_json(monthly_file, existing_data)
 
         # Merge new session
         new_session = {
@@ -212,7 +253,7 @@ class TestUpdateIndex:
         index = json.loads(index_file.read_text())
         assert index["session-123"] == "sessions-2025-12.json"
 
-    def test_update_existing_index(self, tmp_path):
+    def test_update_existing_index(self, tmp_path, write_json):
         """Test updating existing index file"""
         index_file = tmp_path / "index.json"
 
@@ -220,7 +261,7 @@ class TestUpdateIndex:
         existing_index = {
             "old-session": "sessions-2025-11.json"
         }
-        index_file.write_text(json.dumps(existing_index))
+        write_json(index_file, existing_index)
 
         # Update index
         result = update_index(
@@ -237,5 +278,222 @@ class TestUpdateIndex:
         assert index["new-session"] == "sessions-2025-12.json"
 
 
+class TestIterSessions:
+    """Tests for iter_sessions function"""
+
+    def test_iter_valid_file(self, tmp_path, write_json):
+        """Test sessions are yielded in file order"""
+        monthly_file = tmp_path / "sessions-2025-12.json"
+        sessions = [{"session_id": "s1", "score": 1.5}, {"session_id": "s2"}]
+        write_json(monthly_file, {"sessions": sessions, "count": 2})
+
+        assert list(iter_sessions(str(monthly_file))) == sessions
+
+    def test_iter_empty_sessions(self, tmp_path, write_json):
+        """Test an empty sessions list yields nothing"""
+        monthly_file = tmp_path / "sessions-2025-12.json"
+        write_json(monthly_file, {"sessions": []})
+
+        assert list(iter_sessions(str(monthly_file))) == []
+
+    def test_iter_invalid_structure_raises(self, tmp_path, write_json):
+        """Test missing or non-list sessions raise ValueError"""
+        missing = tmp_path / "missing.json"
+        write_json(missing, {"count": 0})
+        not_list = tmp_path / "not_list.json"
+        write_json(not_list, {"sessions": {"s1": {}}})
+
+        with pytest.raises(ValueError):
+            list(iter_sessions(str(missing)))
+        with pytest.raises(ValueError):
+            list(iter_sessions(str(not_list)))
+
+    def test_iter_includes_pending_sidecar_without_duplicates(self, tmp_path, write_json):
+        """Test sessions of an unfinished compaction are yielded once, before the sidecar"""
+        monthly_file = tmp_path / "sessions-2025-12.json"
+        merged = {"session_id": "merged", "timestamp": "2025-12-01T10:00:00Z"}
+        pending = {"session_id": "pending", "timestamp": "2025-12-02T10:00:00Z"}
+        fresh = {"session_id": "fresh", "timestamp": "2025-12-03T10:00:00Z"}
+        write_json(monthly_file, {"sessions": [merged]})
+        (tmp_path / "sessions-2025-12.jsonl.compacting").write_text(
+            json.dumps(merged) + "\n" + json.dumps(pending) + "\n"
+        )
+        (tmp_path / "sessions-2025-12.jsonl").write_text(json.dumps(fresh) + "\n")
+
+        assert list(iter_sessions(str(monthly_file))) == [merged, pending, fresh]
+
+    def test_iter_corrupted_monthly_still_yields_sidecar(self, tmp_path):
+        """Test sidecar sessions are yielded before a corrupted monthly file's error"""
+        monthly_file = tmp_path / "sessions-2025-12.json"
+        monthly_file.write_text('{"sessions": [{"session_id": "s0"')
+        fresh = {"session_id": "s1", "timestamp": "2025-12-02T10:00:00Z"}
+        (tmp_path / "sessions-2025-12.jsonl").write_text(json.dumps(fresh) + "\n")
+
+        seen = []
+        with pytest.raises(ValueError):
+            for session in iter_sessions(str(monthly_file)):
+                seen.append(session)
+        assert seen == [fresh]
+
+
+class TestSaveEpisodic:
+    """Tests for save_episodic function"""
+
+    def test_save_writes_monthly_and_index(self, tmp_path, write_json, temp_leftovers):
+        """Test record is appended and indexed in one call"""
+        monthly_file = tmp_path / "sessions-2025-12.json"
+        index_file = tmp_path / "index.json"
+        write_json(index_file, {"old-session": "sessions-2025-11.json"})
+
+        session_record = {
+            "session_id": "new-session",
+            "timestamp": "2025-12-31T10:00:00Z"
+        }
+
+        result = save_episodic(session_record, str(monthly_file), str(index_file))
+        assert result is True
+
+        data = json.loads(monthly_file.read_text())
+        assert data["sessions"] == [session_record]
+        assert data["count"] == 1
+
+        index = json.loads(index_file.read_text())
+        assert index == {
+            "old-session": "sessions-2025-11.json",
+            "new-session": "sessions-2025-12.json"
+        }
+
+        assert not temp_leftovers(tmp_path)
+
+    def test_save_failure_leaves_files_untouched(self, tmp_path, temp_leftovers):
+        """Test a failed write renames neither file into place"""
+        monthly_file = tmp_path / "sessions-2025-12.json"
+        index_file = tmp_path / "index.json"
+
+        # Unserializable value makes the monthly write fail
+        session_record = {"session_id": "bad", "payload": object()}
+
+        result = save_episodic(session_record, str(monthly_file), str(index_file))
+        assert result is False
+        assert not monthly_file.exists()
+        assert not index_file.exists()
+        assert not temp_leftovers(tmp_path)
+
+
+    def test_later_records_go_to_sidecar_until_compacted(self, tmp_path, monkeypatch):
+        """Test existing months are appended to, then folded in at the size limit"""
+        monthly_file = tmp_path / "sessions-2025-12.json"
+        sidecar = tmp_path / "sessions-2025-12.jsonl"
+        index_file = tmp_path / "index.json"
+        records = [
+            {"session_id": f"s-{i}", "timestamp": f"2025-12-0{i + 1}T10:00:00Z"}
+            for i in range(3)
+        ]
+
+        assert save_episodic(records[0], str(monthly_file), str(index_file)) is True
+        assert save_episodic(records[1], str(monthly_file), str(index_file)) is True
+
+        # The monthly file is not rewritten; readers still see every session
+        assert json.loads(monthly_file.read_text())["sessions"] == records[:1]
+        assert sidecar.exists()
+        assert list(iter_sessions(str(monthly_file))) == records[:2]
+        assert set(json.loads(index_file.read_text())) == {"s-0", "s-1"}
+
+        monkeypatch.setattr(json_handler, "SIDECAR_COMPACT_BYTES", 1)
+        assert save_episodic(records[2], str(monthly_file), str(index_file)) is True
+
+        data = json.loads(monthly_file.read_text())
+        assert data["sessions"] == records
+        assert data["count"] == 3
+        assert not sidecar.exists()
+        assert list(iter_sessions(str(monthly_file))) == records
+
+    def test_failed_compaction_keeps_sessions_and_is_retried(self, tmp_path, monkeypatch):
+        """Test a failed compaction hides no session and is retried on the next save"""
+        monthly_file = tmp_path / "sessions-2025-12.json"
+        index_file = tmp_path / "index.json"
+        records = [
+            {"session_id": f"s{i}", "timestamp": f"2025-12-0{i + 1}T10:00:00Z"}
+            for i in range(4)
+        ]
+        assert save_episodic(records[0], str(monthly_file), str(index_file)) is True
+        assert save_episodic(records[1], str(monthly_file), str(index_file)) is True
+
+        # Compaction renames the sidecar aside, then fails to save
+        monkeypatch.setattr(json_handler, "SIDECAR_COMPACT_BYTES", 1)
+        real_safe_save = json_handler.safe_save
+        monkeypatch.setattr(
+            json_handler, "safe_save",
+            lambda path, data, **kw: path != str(monthly_file) and real_safe_save(path, data, **kw)
+        )
+        assert save_episodic(records[2], str(monthly_file), str(index_file)) is True
+        assert (tmp_path / "sessions-2025-12.jsonl.compacting").exists()
+        assert list(iter_sessions(str(monthly_file))) == records[:3]
+
+        # The next save retries it, whatever the sidecar size
+        monkeypatch.setattr(json_handler, "safe_save", real_safe_save)
+        monkeypatch.setattr(json_handler, "SIDECAR_COMPACT_BYTES", 1 << 30)
+        assert save_episodic(records[3], str(monthly_file), str(index_file)) is True
+        assert json.loads(monthly_file.read_text())["sessions"] == records
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["index.json", "sessions-2025-12.json"]
+        assert list(iter_sessions(str(monthly_file))) == records
+
+    def test_interrupted_compaction_is_not_merged_twice(self, tmp_path, write_json):
+        """Test a leftover sidecar from a crashed compaction adds no duplicates"""
+        monthly_file = tmp_path / "sessions-2025-12.json"
+        merged = {"session_id": "merged", "timestamp": "2025-12-01T10:00:00Z"}
+        pending = {"session_id": "pending", "timestamp": "2025-12-02T10:00:00Z"}
+        fresh = {"session_id": "fresh", "timestamp": "2025-12-03T10:00:00Z"}
+        write_json(monthly_file, {"sessions": [merged]})
+
+        # Crash after saving: the renamed sidecar still holds a merged record
+        (tmp_path / "sessions-2025-12.jsonl.compacting").write_text(
+            json.dumps(merged) + "\n" + json.dumps(pending) + "\n"
+        )
+        (tmp_path / "sessions-2025-12.jsonl").write_text(json.dumps(fresh) + "\n")
+
+        assert compact_month(str(monthly_file)) is True
+
+        assert json.loads(monthly_file.read_text())["sessions"] == [merged, pending, fresh]
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["sessions-2025-12.json"]
+
+    @pytest.mark.skipif(json_handler.fcntl is None, reason="compaction lock needs fcntl")
+    def test_compaction_skipped_while_another_holds_the_lock(self, tmp_path, write_json):
+        """Test a second compaction of the same month leaves the sidecar to the first"""
+        monthly_file = tmp_path / "sessions-2025-12.json"
+        merged = {"session_id": "merged", "timestamp": "2025-12-01T10:00:00Z"}
+        fresh = {"session_id": "fresh", "timestamp": "2025-12-02T10:00:00Z"}
+        write_json(monthly_file, {"sessions": [merged]})
+        (tmp_path / "sessions-2025-12.jsonl").write_text(json.dumps(fresh) + "\n")
+
+        with json_handler._compaction_lock(str(monthly_file)) as locked:
+            assert locked is True
+            assert compact_month(str(monthly_file)) is True
+            assert (tmp_path / "sessions-2025-12.jsonl").exists()
+
+        assert compact_month(str(monthly_file)) is True
+        assert json.loads(monthly_file.read_text())["sessions"] == [merged, fresh]
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["sessions-2025-12.json"]
+
+
+class TestSaveMany:
+    """Tests for save_many function"""
+
+    def test_failure_in_last_file_keeps_earlier_targets(self, tmp_path, write_json, temp_leftovers):
+        """Test no file is replaced unless every file was staged"""
+        first = tmp_path / "first.json"
+        second = tmp_path / "second.json"
+        write_json(first, {"version": 1})
+
+        result = save_many(
+            [(str(first), {"version": 2}), (str(second), {"bad": object()})],
+            max_retries=1
+        )
+        assert result is False
+        assert json.loads(first.read_text()) == {"version": 1}
+        assert not second.exists()
+        assert not temp_leftovers(tmp_path)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -5,34 +5,22 @@ Tests rebuild, backup, validation, and reset functions
 
 import json
 import os
-from pathlib import Path
 
 import pytest
 
-# Add parent directory to path for imports
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
-
 from recovery import (
     rebuild_semantic,
     backup_corrupted,
     validate_memory_structure,
     reset_pms,
 )
-from json_handler import safe_save
 
 
 class TestRebuildSemantic:
     """Tests for rebuild_semantic function"""
 
-    def test_rebuild_from_episodic_records(self, tmp_path):
+    def test_rebuild_from_episodic_records(self, pms_tree, write_json):
         """Test rebuilding semantic knowledge from episodic records"""
-        # Create PMS directory structure
-        pms_dir = tmp_path / ".claude" / "pms"
-        episodic_dir = pms_dir / "episodic"
-        semantic_dir = pms_dir / "semantic"
-        episodic_dir.mkdir(parents=True)
-
         # Create sample episodic records
         session1 = {
             "session_id": "session-1",
@@ -49,23 +37,19 @@ class TestRebuildSemantic:
             "anti_patterns": ["Avoid localStorage for tokens"]
         }
 
-        monthly_file = episodic_dir / "sessions-2025-12.json"
-        safe_save(
-            str(monthly_file),
-            {
-                "sessions": [session1, session2],
-                "count": 2,
-                "last_updated": "2025-12-31T10:00:00Z"
-            }
-        )
+        write_json(pms_tree.episodic_file, {
+            "sessions": [session1, session2],
+            "count": 2,
+            "last_updated": "2025-12-31T10:00:00Z"
+        })
 
         # Rebuild semantic knowledge
-        result = rebuild_semantic(str(tmp_path))
+        result = rebuild_semantic(str(pms_tree.root))
         assert result is True
 
         # Verify semantic files created
-        assert semantic_dir.exists()
-        patterns_file = semantic_dir / "patterns.json"
+        assert pms_tree.semantic_dir.exists()
+        patterns_file = pms_tree.semantic_dir / "patterns.json"
         assert patterns_file.exists()
 
         # Verify patterns detected
@@ -73,6 +57,39 @@ class TestRebuildSemantic:
         assert "patterns" in patterns_data
         assert patterns_data["count"] > 0
 
+    def test_rebuild_reuses_unchanged_months(self, tmp_path, write_json):
+        """Test rebuild only re-parses months whose content changed"""
+        pms_dir = tmp_path / ".claude" / "pms"
+        episodic_dir = pms_dir / "episodic"
+        episodic_dir.mkdir(parents=True)
+
+        def write_month(month, session_ids):
+            sessions = [
+                {"session_id": sid, "user_preferences": ["Use JWT for auth"]}
+                for sid in session_ids
+            ]
+            write_json(episodic_dir / f"sessions-{month}.json", {"sessions": sessions})
+
+        write_month("2025-11", ["s-1", "s-2"])
+        write_month("2025-12", ["s-3"])
+        assert rebuild_semantic(str(tmp_path)) is True
+
+        index_file = pms_dir / "semantic" / ".index.json"
+        index = json.loads(index_file.read_text())
+        assert set(index["months"]) == {"sessions-2025-11.json", "sessions-2025-12.json"}
+
+        # Doctor the cached summary of the unchanged month, then change the other
+        index["months"]["sessions-2025-11.json"]["counts"]["preference"]["Use JWT for auth"] = 40
+        write_json(index_file, index)
+        write_month("2025-12", ["s-3", "s-4"])
+
+        assert rebuild_semantic(str(tmp_path)) is True
+
+        patterns = json.loads((pms_dir / "semantic" / "patterns.json").read_text())["patterns"]
+        jwt = next(p for p in patterns if p["description"] == "Use JWT for auth")
+        assert jwt["occurrences"] == 42
+        assert jwt["evidence"] == ["s-1", "s-2", "s-3", "s-4"]
+
     def test_rebuild_with_no_episodic_data(self, tmp_path):
         """Test rebuild with no episodic data returns error"""
         # Create empty PMS directory
@@ -100,8 +117,8 @@ class TestBackupCorrupted:
         assert backup_dir.exists()
 
         # Verify backup file has timestamp in name (uses underscores)
-        backup_files = list(backup_dir.glob("corrupted_*.json"))
-        assert len(backup_files) == 1
+        names = [entry.name for entry in os.scandir(backup_dir)]
+        assert sum(1 for n in names if n.startswith("corrupted_") and n.endswith(".json")) == 1
 
         # Verify original file removed
         assert not corrupted_file.exists()
@@ -117,33 +134,9 @@ class TestBackupCorrupted:
 class TestValidateMemoryStructure:
     """Tests for validate_memory_structure function"""
 
-    def test_validate_valid_structure(self, tmp_path):
+    def test_validate_valid_structure(self, pms_tree):
         """Test validating valid memory structure"""
-        # Create valid PMS structure
-        pms_dir = tmp_path / ".claude" / "pms"
-        episodic_dir = pms_dir / "episodic"
-        semantic_dir = pms_dir / "semantic"
-        procedural_dir = pms_dir / "procedural"
-
-        episodic_dir.mkdir(parents=True)
-        semantic_dir.mkdir(parents=True)
-        procedural_dir.mkdir(parents=True)
-
-        # Create valid JSON files
-        safe_save(
-            str(episodic_dir / "sessions-2025-12.json"),
-            {"sessions": [], "count": 0}
-        )
-        safe_save(
-            str(episodic_dir / "index.json"),
-            {}
-        )
-        safe_save(
-            str(semantic_dir / "patterns.json"),
-            {"patterns": [], "count": 0}
-        )
-
-        result, errors = validate_memory_structure(str(tmp_path))
+        result, errors = validate_memory_structure(str(pms_tree.root))
         assert result is True
         assert len(errors) == 0
 
@@ -163,6 +156,15 @@ class TestValidateMemoryStructure:
         assert len(errors) > 0
         assert any("corrupted" in err.lower() or "invalid" in err.lower() for err in errors)
 
+    def test_validate_corrupted_sidecar_lines(self, pms_tree):
+        """Test sidecar lines of sessions not yet compacted are validated too"""
+        sidecar = pms_tree.episodic_dir / "sessions-2025-12.jsonl"
+        sidecar.write_text('{"session_id": "ok"}\n\n{"session_id": "trunc\n[1, 2]\n')
+
+        result, errors = validate_memory_structure(str(pms_tree.root))
+        assert result is False
+        assert errors == [f"Corrupted lines 3, 4: {sidecar}"]
+
     def test_validate_missing_directories(self, tmp_path):
         """Test validating structure with missing directories"""
         # Create minimal structure
@@ -178,63 +180,58 @@ class TestValidateMemoryStructure:
 class TestResetPMS:
     """Tests for reset_pms function"""
 
-    def test_reset_all_directories(self, tmp_path):
+    def test_reset_all_directories(self, pms_tree):
         """Test reset removes all PMS data"""
-        # Create full PMS structure
-        pms_dir = tmp_path / ".claude" / "pms"
-        episodic_dir = pms_dir / "episodic"
-        semantic_dir = pms_dir / "semantic"
-        procedural_dir = pms_dir / "procedural"
-
-        episodic_dir.mkdir(parents=True)
-        semantic_dir.mkdir(parents=True)
-        procedural_dir.mkdir(parents=True)
-
-        # Create files
-        (episodic_dir / "sessions-2025-12.json").write_text('{"sessions": []}')
-        (semantic_dir / "patterns.json").write_text('{"patterns": []}')
-        (procedural_dir / "rules-metadata.json").write_text('{}')
-
         # Reset without keeping episodic
-        result = reset_pms(str(tmp_path), keep_episodic=False)
+        result = reset_pms(str(pms_tree.root), keep_episodic=False)
         assert result is True
 
         # Verify all directories removed
-        assert not episodic_dir.exists()
-        assert not semantic_dir.exists()
-        assert not procedural_dir.exists()
+        assert not pms_tree.episodic_dir.exists()
+        assert not pms_tree.semantic_dir.exists()
+        assert not pms_tree.procedural_dir.exists()
 
-    def test_reset_keep_episodic(self, tmp_path):
+    def test_reset_keep_episodic(self, pms_tree):
         """Test reset keeps episodic data when requested"""
-        # Create full PMS structure
-        pms_dir = tmp_path / ".claude" / "pms"
-        episodic_dir = pms_dir / "episodic"
-        semantic_dir = pms_dir / "semantic"
-        procedural_dir = pms_dir / "procedural"
-
-        episodic_dir.mkdir(parents=True)
-        semantic_dir.mkdir(parents=True)
-        procedural_dir.mkdir(parents=True)
-
-        # Create files
-        episodic_file = episodic_dir / "sessions-2025-12.json"
+        episodic_file = pms_tree.episodic_file
         episodic_file.write_text('{"sessions": [{"id": "test"}]}')
-        (semantic_dir / "patterns.json").write_text('{"patterns": []}')
-        (procedural_dir / "rules-metadata.json").write_text('{}')
 
         # Reset keeping episodic
-        result = reset_pms(str(tmp_path), keep_episodic=True)
+        result = reset_pms(str(pms_tree.root), keep_episodic=True)
         assert result is True
 
         # Verify episodic preserved
-        assert episodic_dir.exists()
+        assert pms_tree.episodic_dir.exists()
         assert episodic_file.exists()
         content = json.loads(episodic_file.read_text())
         assert content["sessions"][0]["id"] == "test"
 
         # Verify semantic and procedural removed
-        assert not semantic_dir.exists()
-        assert not procedural_dir.exists()
+        assert not pms_tree.semantic_dir.exists()
+        assert not pms_tree.procedural_dir.exists()
+
+        # Verify backup copy matches the original
+        backups = list((pms_tree.root / ".claude" / "pms_backup_episodic").glob("episodic_*"))
+        assert len(backups) == 1
+        assert (backups[0] / "sessions-2025-12.json").read_text() == episodic_file.read_text()
+
+    def test_reset_removes_nested_tree_without_following_symlinks(self, tmp_path):
+        """Test reset removes nested directories and leaves symlink targets alone"""
+        pms_dir = tmp_path / ".claude" / "pms"
+        nested = pms_dir / "episodic" / ".backup" / "old"
+        nested.mkdir(parents=True)
+        (nested / "sessions-2025-01.json").write_text('{"sessions": []}')
+
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "keep.txt").write_text("keep")
+        (pms_dir / "episodic" / "link").symlink_to(outside, target_is_directory=True)
+
+        result = reset_pms(str(tmp_path), keep_episodic=False)
+        assert result is True
+
+        assert not pms_dir.exists()
+        assert (outside / "keep.txt").read_text() == "keep"
 
     def test_reset_nonexistent_directory(self, tmp_path):
         """Test reset handles non-existent PMS directory"""
@@ -5,18 +5,14 @@ Tests procedural rule generation from semantic patterns
 
 import json
 import os
-import tempfile
-from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
-# Import from scripts
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
-
 from synthesize import (
     synthesize_rules,
+    group_strong_patterns,
+    generate_rule_files,
     generate_rules_from_patterns,
     convert_pattern_to_rule,
     load_procedural_metadata,
@@ -24,182 +20,147 @@ from synthesize import (
 )
 
 
-def test_synthesize_rules_with_no_semantic_knowledge():
+def test_synthesize_rules_with_no_semantic_knowledge(tmp_path):
     """Test that synthesis fails when no semantic knowledge exists"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # No semantic directory
-        success = synthesize_rules(tmpdir, require_approval=False)
-        assert success is False
+    # No semantic directory
+    success = synthesize_rules(tmp_path, require_approval=False)
+    assert success is False
 
 
-def test_synthesize_rules_with_no_patterns():
+def test_synthesize_rules_with_no_patterns(tmp_path):
     """Test that synthesis fails when patterns file is empty"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Create empty semantic directory
-        semantic_dir = Path(tmpdir) / ".claude" / "pms" / "semantic"
-        semantic_dir.mkdir(parents=True)
+    # Create empty semantic directory
+    semantic_dir = tmp_path / ".claude" / "pms" / "semantic"
+    semantic_dir.mkdir(parents=True)
 
-        # Create empty patterns file
-        patterns_file = semantic_dir / "patterns.json"
-        patterns_file.write_text(json.dumps({"patterns": [], "count": 0}))
+    # Create empty patterns file
+    patterns_file = semantic_dir / "patterns.json"
+    patterns_file.write_text(json.dumps({"patterns": [], "count": 0}))
 
-        success = synthesize_rules(tmpdir, require_approval=False)
-        assert success is False
+    success = synthesize_rules(tmp_path, require_approval=False)
+    assert success is False
 
 
 def test_synthesize_rules_filters_weak_patterns():
     """Test that only strong/critical patterns are used for rules"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Create semantic directory
-        semantic_dir = Path(tmpdir) / ".claude" / "pms" / "semantic"
-        semantic_dir.mkdir(parents=True)
-
-        # Create patterns with mixed strengths
-        patterns_file = semantic_dir / "patterns.json"
-        patterns = {
-            "patterns": [
-                {
-                    "pattern_id": "weak_1",
-                    "description": "Weak pattern",
-                    "category": "preference",
-                    "strength": "emerging",
-                    "occurrences": 2,
-                    "evidence": ["s1", "s2"]
-                },
-                {
-                    "pattern_id": "strong_1",
-                    "description": "Strong pattern",
-                    "category": "preference",
-                    "strength": "strong",
-                    "occurrences": 3,
-                    "evidence": ["s1", "s2", "s3"]
-                }
-            ],
-            "count": 2
+    # Patterns with mixed strengths
+    patterns = [
+        {
+            "pattern_id": "weak_1",
+            "description": "Weak pattern",
+            "category": "preference",
+            "strength": "emerging",
+            "occurrences": 2,
+            "evidence": ["s1", "s2"]
+        },
+        {
+            "pattern_id": "strong_1",
+            "description": "Strong pattern",
+            "category": "preference",
+            "strength": "strong",
+            "occurrences": 3,
+            "evidence": ["s1", "s2", "s3"]
         }
-        patterns_file.write_text(json.dumps(patterns))
-
-        # Create config
-        config_file = Path(tmpdir) / ".claude" / "pms.local.md"
-        config_file.parent.mkdir(parents=True, exist_ok=True)
-        config_file.write_text("---\nprocessing:\n  auto_synthesize: true\n---\n")
-
-        # Synthesize
-        success = synthesize_rules(tmpdir, require_approval=False)
-        assert success is True
+    ]
 
-        # Verify only strong pattern generated rule
-        rules_dir = Path(tmpdir) / ".claude" / "rules" / "pms"
-        assert rules_dir.exists()
+    buckets, strong_count, has_critical = group_strong_patterns(patterns)
+    assert strong_count == 1
+    assert has_critical is False
 
-        rule_file = rules_dir / "user-preferences.md"
-        assert rule_file.exists()
+    # Verify only strong pattern generated rule
+    rule_files = generate_rule_files(buckets)
+    assert list(rule_files) == ["user-preferences.md"]
 
-        content = rule_file.read_text()
-        assert "Strong pattern" in content
-        assert "Weak pattern" not in content
+    content = rule_files["user-preferences.md"]
+    assert "Strong pattern" in content
+    assert "Weak pattern" not in content
 
 
 def test_synthesize_rules_creates_rule_files_by_category():
     """Test that rules are grouped into category files"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Create semantic directory
-        semantic_dir = Path(tmpdir) / ".claude" / "pms" / "semantic"
-        semantic_dir.mkdir(parents=True)
-
-        # Create patterns for each category
-        patterns_file = semantic_dir / "patterns.json"
-        patterns = {
-            "patterns": [
-                {
-                    "pattern_id": "pref_1",
-                    "description": "User preference pattern",
-                    "category": "preference",
-                    "strength": "strong",
-                    "occurrences": 3,
-                    "evidence": ["s1", "s2", "s3"]
-                },
-                {
-                    "pattern_id": "code_1",
-                    "description": "Code pattern",
-                    "category": "code_pattern",
-                    "strength": "strong",
-                    "occurrences": 4,
-                    "evidence": ["s1", "s2", "s3", "s4"]
-                },
-                {
-                    "pattern_id": "anti_1",
-                    "description": "Anti-pattern",
-                    "category": "anti_pattern",
-                    "strength": "critical",
-                    "occurrences": 5,
-                    "evidence": ["s1", "s2", "s3", "s4", "s5"]
-                }
-            ],
-            "count": 3
+    # Patterns for each category
+    patterns = [
+        {
+            "pattern_id": "pref_1",
+            "description": "User preference pattern",
+            "category": "preference",
+            "strength": "strong",
+            "occurrences": 3,
+            "evidence": ["s1", "s2", "s3"]
+        },
+        {
+            "pattern_id": "code_1",
+            "description": "Code pattern",
+            "category": "code_pattern",
+            "strength": "strong",
+            "occurrences": 4,
+            "evidence": ["s1", "s2", "s3", "s4"]
+        },
+        {
+            "pattern_id": "anti_1",
+            "description": "Anti-pattern",
+            "category": "anti_pattern",
+            "strength": "critical",
+            "occurrences": 5,
+            "evidence": ["s1", "s2", "s3", "s4", "s5"]
         }
-        patterns_file.write_text(json.dumps(patterns))
-
-        # Create config
-        config_file = Path(tmpdir) / ".claude" / "pms.local.md"
-        config_file.parent.mkdir(parents=True, exist_ok=True)
-        config_file.write_text("---\n---\n")
+    ]
 
-        # Synthesize
-        success = synthesize_rules(tmpdir, require_approval=False)
-        assert success is True
+    buckets, strong_count, has_critical = group_strong_patterns(patterns)
+    assert strong_count == 3
+    assert has_critical is True
 
-        # Verify all category files created
-        rules_dir = Path(tmpdir) / ".claude" / "rules" / "pms"
-        assert (rules_dir / "user-preferences.md").exists()
-        assert (rules_dir / "code-patterns.md").exists()
-        assert (rules_dir / "anti-patterns.md").exists()
+    # Verify all category files generated
+    rule_files = generate_rule_files(buckets)
+    assert list(rule_files) == ["user-preferences.md", "code-patterns.md", "anti-patterns.md"]
+    assert "User preference pattern" in rule_files["user-preferences.md"]
+    assert "Code pattern" in rule_files["code-patterns.md"]
+    assert "Anti-pattern" in rule_files["anti-patterns.md"]
 
 
-def test_synthesize_rules_updates_metadata():
+def test_synthesize_rules_updates_metadata(tmp_path):
     """Test that procedural metadata is created and updated"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Create semantic directory
-        semantic_dir = Path(tmpdir) / ".claude" / "pms" / "semantic"
-        semantic_dir.mkdir(parents=True)
-
-        # Create patterns
-        patterns_file = semantic_dir / "patterns.json"
-        patterns = {
-            "patterns": [
-                {
-                    "pattern_id": "pref_1",
-                    "description": "Test preference",
-                    "category": "preference",
-                    "strength": "strong",
-                    "occurrences": 3,
-                    "evidence": ["s1", "s2", "s3"]
-                }
-            ],
-            "count": 1
-        }
-        patterns_file.write_text(json.dumps(patterns))
-
-        # Create config
-        config_file = Path(tmpdir) / ".claude" / "pms.local.md"
-        config_file.parent.mkdir(parents=True, exist_ok=True)
-        config_file.write_text("---\n---\n")
-
-        # Synthesize
-        success = synthesize_rules(tmpdir, require_approval=False)
-        assert success is True
-
-        # Verify metadata created
-        metadata_file = Path(tmpdir) / ".claude" / "pms" / "procedural" / "rules-metadata.json"
-        assert metadata_file.exists()
-
-        with open(metadata_file) as f:
-            metadata = json.load(f)
-            assert "last_synthesis" in metadata
-            assert "rule_files" in metadata
-            assert "user-preferences.md" in metadata["rule_files"]
-            assert metadata["pattern_count"] == 1
-            assert metadata["breakdown"]["preferences"] == 1
+    # Create semantic directory
+    semantic_dir = tmp_path / ".claude" / "pms" / "semantic"
+    semantic_dir.mkdir(parents=True)
+
+    # Create patterns
+    patterns_file = semantic_dir / "patterns.json"
+    patterns = {
+        "patterns": [
+            {
+                "pattern_id": "pref_1",
+                "description": "Test preference",
+                "category": "preference",
+                "strength": "strong",
+                "occurrences": 3,
+                "evidence": ["s1", "s2", "s3"]
+            }
+        ],
+        "count": 1
+    }
+    patterns_file.write_text(json.dumps(patterns))
+
+    # Create config
+    config_file = tmp_path / ".claude" / "pms.local.md"
+    config_file.parent.mkdir(parents=True, exist_ok=True)
+    config_file.write_text("---\n---\n")
+
+    # Synthesize
+    success = synthesize_rules(tmp_path, require_approval=False)
+    assert success is True
+
+    # Verify metadata created
+    metadata_file = tmp_path / ".claude" / "pms" / "procedural" / "rules-metadata.json"
+    assert metadata_file.exists()
+
+    with open(metadata_file) as f:
+        metadata = json.load(f)
+        assert "last_synthesis" in metadata
+        assert "rule_files" in metadata
+        assert "user-preferences.md" in metadata["rule_files"]
+        assert metadata["pattern_count"] == 1
+        assert metadata["breakdown"]["preferences"] == 1
 
 
 def test_generate_rules_from_patterns():
@@ -291,120 +252,98 @@ def test_convert_pattern_to_rule():
     assert "Some pattern" in rule
 
 
-def test_load_procedural_metadata():
+def test_load_procedural_metadata(tmp_path):
     """Test loading procedural metadata"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # No metadata exists
-        metadata = load_procedural_metadata(tmpdir)
-        assert metadata is None
-
-        # Create metadata
-        procedural_dir = Path(tmpdir) / ".claude" / "pms" / "procedural"
-        procedural_dir.mkdir(parents=True)
-
-        metadata_file = procedural_dir / "rules-metadata.json"
-        test_metadata = {
-            "last_synthesis": "2025-12-31T00:00:00Z",
-            "rule_files": ["user-preferences.md"]
-        }
-        metadata_file.write_text(json.dumps(test_metadata))
+    # No metadata exists
+    metadata = load_procedural_metadata(tmp_path)
+    assert metadata is None
 
-        # Load metadata
-        metadata = load_procedural_metadata(tmpdir)
-        assert metadata is not None
-        assert metadata["last_synthesis"] == "2025-12-31T00:00:00Z"
+    # Create metadata
+    procedural_dir = tmp_path / ".claude" / "pms" / "procedural"
+    procedural_dir.mkdir(parents=True)
 
+    metadata_file = procedural_dir / "rules-metadata.json"
+    test_metadata = {
+        "last_synthesis": "2025-12-31T00:00:00Z",
+        "rule_files": ["user-preferences.md"]
+    }
+    metadata_file.write_text(json.dumps(test_metadata))
 
-def test_check_existing_rules():
-    """Test checking for existing rule files"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # No rules directory
-        rules = check_existing_rules(tmpdir)
-        assert rules == []
+    # Load metadata
+    metadata = load_procedural_metadata(tmp_path)
+    assert metadata is not None
+    assert metadata["last_synthesis"] == "2025-12-31T00:00:00Z"
 
-        # Create rules directory with files
-        rules_dir = Path(tmpdir) / ".claude" / "rules" / "pms"
-        rules_dir.mkdir(parents=True)
 
-        (rules_dir / "user-preferences.md").write_text("# Test")
-        (rules_dir / "code-patterns.md").write_text("# Test")
+def test_check_existing_rules(tmp_path):
+    """Test checking for existing rule files"""
+    # No rules directory
+    rules = check_existing_rules(tmp_path)
+    assert rules == []
 
-        # Check existing
-        rules = check_existing_rules(tmpdir)
-        assert len(rules) == 2
+    # Create rules directory with files
+    rules_dir = tmp_path / ".claude" / "rules" / "pms"
+    rules_dir.mkdir(parents=True)
 
+    (rules_dir / "user-preferences.md").write_text("# Test")
+    (rules_dir / "code-patterns.md").write_text("# Test")
 
-def test_synthesize_rules_with_no_strong_patterns():
-    """Test synthesis fails when no patterns meet threshold"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        semantic_dir = Path(tmpdir) / ".claude" / "pms" / "semantic"
-        semantic_dir.mkdir(parents=True)
-
-        # Only emerging patterns
-        patterns_file = semantic_dir / "patterns.json"
-        patterns = {
-            "patterns": [
-                {
-                    "pattern_id": "weak_1",
-                    "description": "Weak",
-                    "category": "preference",
-                    "strength": "emerging",
-                    "occurrences": 2,
-                    "evidence": ["s1"]
-                }
-            ],
-            "count": 1
-        }
-        patterns_file.write_text(json.dumps(patterns))
+    # Check existing
+    rules = check_existing_rules(tmp_path)
+    assert len(rules) == 2
 
-        # Create config
-        config_file = Path(tmpdir) / ".claude" / "pms.local.md"
-        config_file.parent.mkdir(parents=True, exist_ok=True)
-        config_file.write_text("---\n---\n")
 
-        success = synthesize_rules(tmpdir, require_approval=False)
-        assert success is False
-
-
-def test_rule_file_markdown_format():
+def test_synthesize_rules_with_no_strong_patterns(tmp_path):
+    """Test synthesis fails when no patterns meet threshold"""
+    # Only emerging patterns
+    patterns = {
+        "patterns": [
+            {
+                "pattern_id": "weak_1",
+                "description": "Weak",
+                "category": "preference",
+                "strength": "emerging",
+                "occurrences": 2,
+                "evidence": ["s1"]
+            }
+        ],
+        "count": 1
+    }
+
+    success = synthesize_rules(tmp_path, require_approval=False, patterns_override=patterns)
+    assert success is False
+
+
+def test_rule_file_markdown_format(tmp_path):
     """Test that generated rule files have correct markdown format"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        semantic_dir = Path(tmpdir) / ".claude" / "pms" / "semantic"
-        semantic_dir.mkdir(parents=True)
-
-        patterns_file = semantic_dir / "patterns.json"
-        patterns = {
-            "patterns": [
-                {
-                    "pattern_id": "p1",
-                    "description": "Test pattern",
-                    "category": "preference",
-                    "strength": "strong",
-                    "occurrences": 3,
-                    "evidence": ["s1", "s2", "s3"]
-                }
-            ],
-            "count": 1
-        }
-        patterns_file.write_text(json.dumps(patterns))
-
-        config_file = Path(tmpdir) / ".claude" / "pms.local.md"
-        config_file.parent.mkdir(parents=True, exist_ok=True)
-        config_file.write_text("---\n---\n")
-
-        success = synthesize_rules(tmpdir, require_approval=False)
-        assert success is True
-
-        # Check markdown format
-        rule_file = Path(tmpdir) / ".claude" / "rules" / "pms" / "user-preferences.md"
-        content = rule_file.read_text()
-
-        # Check header format
-        assert content.startswith("# User Preferences")
-        assert "<!-- Auto-generated" in content
-        assert "## User Preferences" in content
-
-        # Check pattern format
-        assert "**" in content  # Bold rules
-        assert "- Observed" in content  # Bullet points
-        assert "- Evidence:" in content
+    patterns = {
+        "patterns": [
+            {
+                "pattern_id": "p1",
+                "description": "Test pattern",
+                "category": "preference",
+                "strength": "strong",
+                "occurrences": 3,
+                "evidence": ["s1", "s2", "s3"]
+            }
+        ],
+        "count": 1
+    }
+
+    # No semantic directory needed when the patterns are passed in
+    success = synthesize_rules(tmp_path, require_approval=False, patterns_override=patterns)
+    assert success is True
+
+    # Check markdown format
+    rule_file = tmp_path / ".claude" / "rules" / "pms" / "user-preferences.md"
+    content = rule_file.read_text()
+
+    # Check header format
+    assert content.startswith("# User Preferences")
+    assert "<!-- Auto-generated" in content
+    assert "## User Preferences" in content
+
+    # Check pattern format
+    assert "**" in content  # Bold rules
+    assert "- Observed" in content  # Bullet points
+    assert "- Evidence:" in content
@@ -6,25 +6,127 @@ Analyzes text for ambiguous terminology using knowledge base and returns
 confidence scores and detected ambiguities.
 """
 
+import functools
 import json
 import re
 import sys
 from pathlib import Path
-from typing import Dict, List, Tuple
-
-
+from typing import Any, Dict, List, Tuple
+
+try:
+    # orjson is optional - stdlib json is used when it is not installed
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+try:
+    # pyahocorasick is optional - known terms are checked one by one without it
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    # hyperscan is optional - patterns are gated on their literals without it
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+
+# Detection patterns, compiled once at import
+_META_QUESTION_PATTERNS = tuple(re.compile(p) for p in (
+    r"am i making sense",
+    r"does this make sense",
+    r"is this right",
+    r"am i doing this right",
+    r"making sense\?"
+))
+
+_SELF_ID_PATTERNS = tuple(re.compile(p) for p in (
+    r"non-technical user",
+    r"i'm not technical",
+    r"i am not technical",
+    r"beginner",
+    r"not a programmer"
+))
+
+_VAGUE_VERB_PATTERNS = tuple(re.compile(p) for p in (
+    r"make it \w+",
+    r"do the thing",
+    r"fix it",
+    r"get it working",
+    r"create \w+ without specifics"
+))
+
+_GENERIC_TERMS = (
+    "agent", "task", "tool", "component", "service",
+    "module", "container", "wrapper", "handler"
+)
+
+# One word-boundary scan for every generic term
+_GENERIC_TERMS_RE = re.compile(rf"\b(?:{'|'.join(_GENERIC_TERMS)})\b")
+
+# Per-term word-boundary patterns, for the combined scan (see _LOWERCASE_SIGNALS)
+_GENERIC_TERM_PATTERNS = tuple(re.compile(rf"\b{term}\b") for term in _GENERIC_TERMS)
+
+_UNCLEAR_REFERENCE_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r"\bthat\b(?! \w+)",  # "that" without following noun
+    r"\bit\b(?! \w+)",    # "it" without following noun
+    r"the thing",
+    r"like before(?! \w+)"
+))
+
+# Keywords that make generic terms framework-specific
+_FRAMEWORK_CONTEXT_KEYWORDS = (
+    "autogen", "conversableagent", "groupchat", "assistantagent",
+    "langroid", "chatagent", "toolmessage", "task.run"
+)
+
+# Pattern detectors run over the lowercased text, in one scan (see
+# detect_pattern_signals); unclear references need the original text
+_LOWERCASE_SIGNALS = (
+    ("meta_questions", _META_QUESTION_PATTERNS),
+    ("user_self_id", _SELF_ID_PATTERNS),
+    ("vague_verbs", _VAGUE_VERB_PATTERNS),
+    ("generic_terms", _GENERIC_TERM_PATTERNS),
+)
+_LOWERCASE_PATTERNS = tuple(
+    pattern for _, patterns in _LOWERCASE_SIGNALS for pattern in patterns
+)
+
+# Literal that every match of a pattern contains, once lowercased: a pattern
+# whose literal is missing from the lowercased text is never scanned for
+_LITERAL_GATES = dict(zip(
+    _META_QUESTION_PATTERNS + _SELF_ID_PATTERNS + _VAGUE_VERB_PATTERNS
+    + _GENERIC_TERM_PATTERNS + _UNCLEAR_REFERENCE_PATTERNS,
+    (
+        "am i making sense", "does this make sense", "is this right",
+        "am i doing this right", "making sense?",
+        "non-technical user", "i'm not technical", "i am not technical",
+        "beginner", "not a programmer",
+        "make it ", "do the thing", "fix it", "get it working", " without specifics",
+    ) + _GENERIC_TERMS + (
+        "that", "it", "the thing", "like before",
+    )
+))
+
+# Every gate literal: text containing none of them has no pattern signal at all
+_SIGNAL_LITERALS = tuple(sorted(set(_LITERAL_GATES.values())))
+
+
+@functools.lru_cache(maxsize=4)
 def load_knowledge_base(plugin_root: Path) -> Dict:
-    """Load all knowledge base JSON files."""
-    knowledge_dir = plugin_root / "skills" / "semantic-validation" / "knowledge"
-
-    with open(knowledge_dir / "ambiguous-terms.json") as f:
-        ambiguous_terms = json.load(f)
+    """
+    Load all knowledge base JSON files.
 
-    with open(knowledge_dir / "technical-mappings.json") as f:
-        technical_mappings = json.load(f)
+    Cached per plugin root, so repeated analyze_text calls parse the files
+    once; callers share the result and must not modify it.
+    """
+    knowledge_dir = plugin_root / "skills" / "semantic-validation" / "knowledge"
 
-    with open(knowledge_dir / "ontology-graph.json") as f:
-        ontology_graph = json.load(f)
+    ambiguous_terms = _loads((knowledge_dir / "ambiguous-terms.json").read_bytes())
+    technical_mappings = _loads((knowledge_dir / "technical-mappings.json").read_bytes())
+    ontology_graph = _loads((knowledge_dir / "ontology-graph.json").read_bytes())
 
     return {
         "ambiguous_terms": ambiguous_terms,
@@ -35,134 +137,325 @@ def load_knowledge_base(plugin_root: Path) -> Dict:
 
 def detect_meta_questions(text: str) -> List[str]:
     """Detect meta-questions in text."""
-    meta_patterns = [
-        r"am i making sense",
-        r"does this make sense",
-        r"is this right",
-        r"am i doing this right",
-        r"making sense\?"
-    ]
-
     detected = []
     text_lower = text.lower()
 
-    for pattern in meta_patterns:
-        if re.search(pattern, text_lower):
-            detected.append(pattern)
+    for pattern in _META_QUESTION_PATTERNS:
+        if pattern.search(text_lower):
+            detected.append(pattern.pattern)
 
     return detected
 
 
 def detect_user_self_identification(text: str) -> List[str]:
     """Detect when user identifies as non-technical."""
-    patterns = [
-        r"non-technical user",
-        r"i'm not technical",
-        r"i am not technical",
-        r"beginner",
-        r"not a programmer"
-    ]
-
     detected = []
     text_lower = text.lower()
 
-    for pattern in patterns:
-        if re.search(pattern, text_lower):
-            detected.append(pattern)
+    for pattern in _SELF_ID_PATTERNS:
+        if pattern.search(text_lower):
+            detected.append(pattern.pattern)
 
     return detected
 
 
+# Last ambiguous-terms dict and its matcher (see _known_term_matcher). The
+# knowledge base is cached, so an identity check is enough to reuse it.
+_term_matcher_cache: List = [None, None]
+
+
+def _known_term_matcher(ambiguous_terms: Dict) -> Tuple:
+    """
+    Build (or reuse) the matcher for detect_known_ambiguous_terms.
+
+    Returns:
+        Tuple of (entries, automaton, always): entries are (term, data, words)
+        in knowledge base order, where words are the term and its lowercased
+        user_triggers; automaton maps every word to the entries containing it
+        (None without pyahocorasick); always holds entries with an empty word.
+    """
+    if _term_matcher_cache[0] is ambiguous_terms:
+        return _term_matcher_cache[1]
+
+    entries = []
+    for term, data in ambiguous_terms.items():
+        words = [term] + [trigger.lower() for trigger in data.get("user_triggers", ())]
+        entries.append((term, data, words))
+
+    automaton = None
+    always = frozenset(i for i, (_, _, words) in enumerate(entries) if "" in words)
+    if ahocorasick is not None and entries:
+        owners: Dict[str, set] = {}
+        for i, (_, _, words) in enumerate(entries):
+            for word in words:
+                if word:
+                    owners.setdefault(word, set()).add(i)
+
+        automaton = ahocorasick.Automaton()
+        for word, indexes in owners.items():
+            automaton.add_word(word, tuple(indexes))
+        automaton.make_automaton()
+
+    matcher = (entries, automaton, always)
+    _term_matcher_cache[0] = ambiguous_terms
+    _term_matcher_cache[1] = matcher
+    return matcher
+
+
 def detect_known_ambiguous_terms(text: str, knowledge: Dict) -> List[Tuple[str, Dict]]:
-    """Detect known ambiguous terms from knowledge base."""
-    detected = []
-    text_lower = text.lower()
+    """
+    Detect known ambiguous terms from knowledge base.
 
-    for term, data in knowledge["ambiguous_terms"].items():
-        # Check direct term match
-        if term in text_lower:
-            detected.append((term, data))
-            continue
+    A term is detected when it, or any of its user_triggers, appears in the
+    text. With pyahocorasick installed all of them are found in one pass.
+    """
+    return _match_known_terms(text.lower(), knowledge)
 
-        # Check user_triggers if present
-        if "user_triggers" in data:
-            for trigger in data["user_triggers"]:
-                if trigger.lower() in text_lower:
-                    detected.append((term, data))
-                    break
 
-    return detected
+def _match_known_terms(text_lower: str, knowledge: Dict) -> List[Tuple[str, Dict]]:
+    """detect_known_ambiguous_terms for text that is already lowercased."""
+    entries, automaton, always = _known_term_matcher(knowledge["ambiguous_terms"])
+
+    if automaton is None:
+        return [
+            (term, data) for term, data, words in entries
+            if any(word in text_lower for word in words)
+        ]
+
+    found = set(always)
+    for _, indexes in automaton.iter(text_lower):
+        found.update(indexes)
+
+    return [(entries[i][0], entries[i][1]) for i in sorted(found)]
 
 
 def detect_vague_verbs(text: str) -> List[str]:
     """Detect vague action verbs."""
-    patterns = [
-        r"make it \w+",
-        r"do the thing",
-        r"fix it",
-        r"get it working",
-        r"create \w+ without specifics"
-    ]
-
     detected = []
     text_lower = text.lower()
 
-    for pattern in patterns:
-        matches = re.findall(pattern, text_lower)
-        detected.extend(matches)
+    for pattern in _VAGUE_VERB_PATTERNS:
+        detected.extend(pattern.findall(text_lower))
 
     return detected
 
 
 def detect_generic_terms(text: str) -> List[str]:
     """Detect generic technical terms without context."""
-    generic_terms = [
-        "agent", "task", "tool", "component", "service",
-        "module", "container", "wrapper", "handler"
-    ]
-
     # Simple heuristic: word appears without specific framework context
     detected = []
     text_lower = text.lower()
 
-    # Check if text has framework-specific context
-    has_autogen_context = any(keyword in text_lower for keyword in [
-        "autogen", "conversableagent", "groupchat", "assistantagent"
-    ])
-    has_langroid_context = any(keyword in text_lower for keyword in [
-        "langroid", "chatagent", "toolmessage", "task.run"
-    ])
-
     # If no clear framework context, generic terms are ambiguous
-    if not has_autogen_context and not has_langroid_context:
-        for term in generic_terms:
-            # Word boundary match
-            if re.search(rf"\b{term}\b", text_lower):
-                detected.append(term)
+    if not _has_framework_context(text_lower):
+        # Word boundary match, reported once each in _GENERIC_TERMS order
+        found = set(_GENERIC_TERMS_RE.findall(text_lower))
+        detected = [term for term in _GENERIC_TERMS if term in found]
 
     return detected
 
 
+def _has_framework_context(text_lower: str) -> bool:
+    """Check if text names Autogen or Langroid specifics."""
+    return any(keyword in text_lower for keyword in _FRAMEWORK_CONTEXT_KEYWORDS)
+
+
 def detect_unclear_references(text: str) -> List[str]:
     """Detect unclear references."""
-    patterns = [
-        r"\bthat\b(?! \w+)",  # "that" without following noun
-        r"\bit\b(?! \w+)",    # "it" without following noun
-        r"the thing",
-        r"like before(?! \w+)"
-    ]
-
     detected = []
 
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        detected.extend(matches)
+    for pattern in _UNCLEAR_REFERENCE_PATTERNS:
+        detected.extend(pattern.findall(text))
 
     return detected
 
 
-def calculate_confidence_score(detections: Dict[str, List]) -> int:
-    """Calculate overall confidence score based on detected patterns."""
+@functools.lru_cache(maxsize=256)
+def _position_scanner(patterns: Tuple[re.Pattern, ...]) -> re.Pattern:
+    """Zero-width alternation matching wherever any of patterns starts a match."""
+    alternatives = []
+    for pattern in patterns:
+        body = pattern.pattern
+        if pattern.flags & re.IGNORECASE:
+            body = f"(?i:{body})"
+        alternatives.append(f"(?={body})")
+    return re.compile("|".join(alternatives))
+
+
+# Negative lookahead group (Hyperscan does not support lookarounds)
+_NEGATIVE_LOOKAHEAD_RE = re.compile(r"\(\?!(?:[^()\\]|\\.)*\)")
+
+
+@functools.lru_cache(maxsize=None)
+def _hyperscan_gate(patterns: Tuple[re.Pattern, ...]):
+    """
+    Hyperscan database reporting (once each) which of patterns can match.
+
+    Negative lookaheads are dropped, which only widens what a pattern
+    matches, so a pattern that is not reported cannot match. Returns None if
+    the patterns do not compile.
+    """
+    # Patterns are written in lowercase and the scanned text is lowercased,
+    # so no caseless matching is needed
+    flags = [hyperscan.HS_FLAG_SINGLEMATCH] * len(patterns)
+
+    database = hyperscan.Database()
+    try:
+        database.compile(
+            expressions=[
+                _NEGATIVE_LOOKAHEAD_RE.sub("", pattern.pattern).encode("ascii")
+                for pattern in patterns
+            ],
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            flags=flags
+        )
+    except (hyperscan.error, UnicodeEncodeError):
+        return None
+    return database
+
+
+def _gate_patterns(patterns: Tuple[re.Pattern, ...], gate_text: str) -> List[int]:
+    """
+    Indexes of patterns that may match the text gate_text is the lowercase of.
+
+    With hyperscan installed every pattern is checked in one pass over ASCII
+    text (where its word characters and boundaries agree with re's);
+    otherwise each pattern's literal from _LITERAL_GATES is looked up.
+    """
+    database = None
+    if hyperscan is not None and gate_text.isascii():
+        database = _hyperscan_gate(patterns)
+
+    if database is None:
+        return [i for i, pattern in enumerate(patterns) if _LITERAL_GATES[pattern] in gate_text]
+
+    # A trailing newline changes no match (nothing here matches across it), but
+    # keeps a final \b off the end of the buffer: with several patterns in the
+    # database, Hyperscan 5.4 (python-hyperscan 0.9.1) misses e.g. \bit\b at
+    # the very end of 49-69 byte buffers, while a one-pattern database finds it
+    possible = set()
+    database.scan(
+        gate_text.encode("ascii") + b"\n",
+        match_event_handler=lambda index, start, end, flags, context: possible.add(index)
+    )
+    return sorted(possible)
+
+
+def _findall_each(text: str, patterns: Tuple[re.Pattern, ...],
+                  collect: bool = True, gate_text: str = None) -> List:
+    """
+    Same result as [p.findall(text) for p in patterns] for patterns without
+    capture groups, from one scan: only positions where some pattern starts
+    a match are tried, and each pattern's matches still never overlap.
+    With collect=False each pattern's match count is returned instead.
+
+    When gate_text (the lowercased text) is given, patterns that cannot
+    match it (see _gate_patterns) are skipped without running any regex.
+    """
+    found = [[] for _ in patterns] if collect else [0] * len(patterns)
+    resume = [0] * len(patterns)
+
+    active = range(len(patterns))
+    if gate_text is not None:
+        active = _gate_patterns(patterns, gate_text)
+        if not active:
+            return found
+    scanner = _position_scanner(tuple(patterns[i] for i in active))
+
+    for hit in scanner.finditer(text):
+        pos = hit.start()
+        for i in active:
+            if pos < resume[i]:
+                continue
+            match = patterns[i].match(text, pos)
+            if match:
+                if collect:
+                    found[i].append(match.group())
+                else:
+                    found[i] += 1
+                resume[i] = match.end()
+
+    return found
+
+
+def detect_pattern_signals(text: str) -> Dict[str, List]:
+    """
+    Run every regex-based detector: one scan of the lowercased text for
+    meta-questions, self-identification, vague verbs and generic terms, and
+    one of the original text for unclear references.
+
+    Returns:
+        Dictionary of detections, identical to calling each detect_* function.
+    """
+    text_lower = text.lower()
+    signals = _lowercase_signals(text_lower)
+    signals["unclear_refs"] = _unclear_references(text, text_lower)
+    return signals
+
+
+def _lowercase_signals(text_lower: str, verbose: bool = True) -> Dict[str, Any]:
+    """
+    Meta-question, self-identification, vague-verb and generic-term detections
+    (counts instead of lists unless verbose).
+    """
+    hits = iter(_findall_each(
+        text_lower, _LOWERCASE_PATTERNS, collect=verbose, gate_text=text_lower
+    ))
+    by_signal = {
+        name: [next(hits) for _ in patterns] for name, patterns in _LOWERCASE_SIGNALS
+    }
+
+    generic_terms = [] if verbose else 0
+    if not _has_framework_context(text_lower):
+        generic_terms = _matched_names(_GENERIC_TERMS, by_signal["generic_terms"], verbose)
+
+    return {
+        "meta_questions": _matched_names(
+            [pattern.pattern for pattern in _META_QUESTION_PATTERNS],
+            by_signal["meta_questions"], verbose
+        ),
+        "user_self_id": _matched_names(
+            [pattern.pattern for pattern in _SELF_ID_PATTERNS],
+            by_signal["user_self_id"], verbose
+        ),
+        "vague_verbs": _all_matches(by_signal["vague_verbs"], verbose),
+        "generic_terms": generic_terms,
+    }
+
+
+def _unclear_references(text: str, text_lower: str, verbose: bool = True) -> Any:
+    """Unclear-reference detections (case-insensitive, on the original text)."""
+    # IGNORECASE also folds non-ASCII letters (e.g. U+0130) that lower() maps
+    # differently, so the literal gates only apply to ASCII text
+    gate_text = text_lower if text.isascii() else None
+    found = _findall_each(text, _UNCLEAR_REFERENCE_PATTERNS, collect=verbose, gate_text=gate_text)
+    return _all_matches(found, verbose)
+
+
+def _matched_names(names, results: List, verbose: bool) -> Any:
+    """Names whose pattern matched at least once (or how many did)."""
+    matched = [name for name, found in zip(names, results) if found]
+    return matched if verbose else len(matched)
+
+
+def _all_matches(results: List, verbose: bool) -> Any:
+    """Every matched string, pattern by pattern (or the number of matches)."""
+    if verbose:
+        return [match for found in results for match in found]
+    return sum(results)
+
+
+def _count(found: Any) -> int:
+    """Number of detections, whether listed or already counted."""
+    return found if isinstance(found, int) else len(found)
+
+
+def calculate_confidence_score(detections: Dict[str, Any]) -> int:
+    """
+    Calculate overall confidence score based on detected patterns.
+    Pattern signals may be lists of detections or plain counts.
+    """
     score = 0
 
     # Meta-questions: +100 (auto-trigger)
@@ -178,34 +471,79 @@ def calculate_confidence_score(detections: Dict[str, List]) -> int:
         score += int(data.get("ambiguity_score", 0.8) * 100)
 
     # Vague action verbs: +30 each
-    score += len(detections["vague_verbs"]) * 30
+    score += _count(detections["vague_verbs"]) * 30
 
     # Generic terms without context: +25 each
-    score += len(detections["generic_terms"]) * 25
+    score += _count(detections["generic_terms"]) * 25
 
     # Unclear references: +20 each
-    score += len(detections["unclear_refs"]) * 20
+    score += _count(detections["unclear_refs"]) * 20
 
     return min(score, 100)  # Cap at 100
 
 
-def analyze_text(text: str, plugin_root: Path) -> Dict:
+def analyze_text(text: str, plugin_root: Path, verbose: bool = False) -> Dict:
     """
     Analyze text for semantic ambiguities.
 
+    The score is capped at 100, so detectors stop running once it is reached:
+    the regex signals (meta-questions, self-identification, vague verbs,
+    generic terms) are collected first, then known terms, then unclear
+    references. Detectors that were skipped report nothing, e.g. a
+    meta-question alone never loads the knowledge base. Text containing none
+    of the pattern literals only goes through the known-term match.
+
+    Args:
+        text: Text to analyze
+        plugin_root: Plugin root directory path
+        verbose: List the matched patterns and strings for every signal;
+                 otherwise pattern signals are reported as counts (known
+                 terms are always listed)
+
     Returns:
         Dictionary with detections and confidence score.
+
+    Results are memoized per (text, plugin_root, verbose); each call returns
+    its own copy of the result dict and detection lists.
     """
-    knowledge = load_knowledge_base(plugin_root)
+    cached = _analyze_text_cached(text, plugin_root, verbose)
+    result = dict(cached)
+    result["detections"] = {
+        name: found if isinstance(found, int) else list(found)
+        for name, found in cached["detections"].items()
+    }
+    return result
 
+
+@functools.lru_cache(maxsize=4096)
+def _analyze_text_cached(text: str, plugin_root: Path, verbose: bool) -> Dict:
+    """Compute analyze_text results (shared - callers must copy before changing)."""
+    none = [] if verbose else 0
     detections = {
-        "meta_questions": detect_meta_questions(text),
-        "user_self_id": detect_user_self_identification(text),
-        "known_terms": detect_known_ambiguous_terms(text, knowledge),
-        "vague_verbs": detect_vague_verbs(text),
-        "generic_terms": detect_generic_terms(text),
-        "unclear_refs": detect_unclear_references(text)
+        "meta_questions": none,
+        "user_self_id": none,
+        "known_terms": [],
+        "vague_verbs": none,
+        "generic_terms": none,
+        "unclear_refs": none
     }
+    # Lowercased once for every case-insensitive detector
+    text_lower = text.lower()
+
+    # One literal check rejects text that no pattern detector can match
+    # (non-ASCII text is always scanned, see _unclear_references)
+    has_signals = not text.isascii() or any(
+        literal in text_lower for literal in _SIGNAL_LITERALS
+    )
+    if has_signals:
+        detections.update(_lowercase_signals(text_lower, verbose))
+
+    if calculate_confidence_score(detections) < 100:
+        knowledge = load_knowledge_base(plugin_root)
+        detections["known_terms"] = _match_known_terms(text_lower, knowledge)
+
+    if has_signals and calculate_confidence_score(detections) < 100:
+        detections["unclear_refs"] = _unclear_references(text, text_lower, verbose)
 
     confidence_score = calculate_confidence_score(detections)
 
@@ -230,7 +568,7 @@ def main():
     text = sys.argv[1]
     plugin_root = Path(sys.argv[2]) if len(sys.argv) > 2 else Path(__file__).parent.parent
 
-    result = analyze_text(text, plugin_root)
+    result = analyze_text(text, plugin_root, verbose=True)
     print(json.dumps(result, indent=2))
 
 
@@ -6,21 +6,37 @@ Maps terminology between Autogen, Langroid, and general AI concepts using
 the ontology graph and technical mappings knowledge base.
 """
 
+import bisect
+import functools
 import json
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
+try:
+    # orjson is optional - stdlib json is used when it is not installed
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
+
+# Separator between keys in a lookup haystack (see _build_lookup)
+_KEY_SEPARATOR = "\n"
+
+
+@functools.lru_cache(maxsize=4)
 def load_mappings(plugin_root: Path) -> Dict:
-    """Load technical mappings and ontology graph."""
-    knowledge_dir = plugin_root / "skills" / "semantic-validation" / "knowledge"
+    """
+    Load technical mappings and ontology graph.
 
-    with open(knowledge_dir / "technical-mappings.json") as f:
-        technical_mappings = json.load(f)
+    Cached per plugin root, so repeated lookups parse the files once;
+    callers share the result and must not modify it.
+    """
+    knowledge_dir = plugin_root / "skills" / "semantic-validation" / "knowledge"
 
-    with open(knowledge_dir / "ontology-graph.json") as f:
-        ontology_graph = json.load(f)
+    technical_mappings = _loads((knowledge_dir / "technical-mappings.json").read_bytes())
+    ontology_graph = _loads((knowledge_dir / "ontology-graph.json").read_bytes())
 
     return {
         "technical": technical_mappings,
@@ -28,95 +44,134 @@ def load_mappings(plugin_root: Path) -> Dict:
     }
 
 
+def _build_lookup(entries: List[Tuple[str, Dict]]) -> Tuple:
+    """
+    Index (key, result) entries for "first key containing the term" searches.
+
+    The lowercased keys are joined into one haystack, so a single str.find
+    locates the first key, in entry order, that contains a term.
+    """
+    keys_lower = [key.lower() for key, _ in entries]
+    starts = []
+    offset = 0
+    for key_lower in keys_lower:
+        starts.append(offset)
+        offset += len(key_lower) + len(_KEY_SEPARATOR)
+
+    return (_KEY_SEPARATOR.join(keys_lower), starts, keys_lower, [result for _, result in entries])
+
+
+def _first_containing(lookup: Tuple, term_lower: str) -> Optional[int]:
+    """Return the index of the first entry whose key contains term_lower."""
+    haystack, starts, keys_lower, results = lookup
+    if not results:
+        return None
+
+    if _KEY_SEPARATOR in term_lower:
+        # Could span two keys in the haystack - check keys one by one
+        for i, key_lower in enumerate(keys_lower):
+            if term_lower in key_lower:
+                return i
+        return None
+
+    pos = haystack.find(term_lower)
+    if pos < 0:
+        return None
+    return bisect.bisect_right(starts, pos) - 1
+
+
+# Last mappings dict and its lookups (see _get_lookups). Mappings come from
+# the cached load_mappings, so an identity check is enough to reuse them.
+_lookup_cache: List = [None, None]
+
+
+def _get_lookups(mappings: Dict) -> Dict[str, Tuple]:
+    """Build (or reuse) the key lookups for every domain search in mappings."""
+    if _lookup_cache[0] is mappings:
+        return _lookup_cache[1]
+
+    technical = mappings["technical"]
+    lookups = {}
+
+    for domain in ("autogen", "langroid"):
+        lookups[domain] = _build_lookup([
+            (key, {"category": category, "term": key, "details": value})
+            for category, items in technical.get(domain, {}).items()
+            if isinstance(items, dict)
+            for key, value in items.items()
+        ])
+
+    ontology = mappings["ontology"]
+    lookups["ontology"] = _build_lookup(
+        [
+            (key, {"domain": domain, "term": key, "ontology": value})
+            for domain in ("autogen", "langroid")
+            for key, value in ontology.get(domain, {}).items()
+        ] + [
+            (concept, {"domain": "conceptual", "concept": concept, "relationships": data})
+            for concept, data in ontology.get("conceptual_relationships", {}).items()
+        ]
+    )
+
+    lookups["cross_domain"] = _build_lookup([
+        (domain_term, {"concept": concept, "equivalents": equivalents, "matched_domain": domain})
+        for concept, equivalents in technical.get("cross_domain_equivalents", {}).items()
+        for domain, domain_term in equivalents.items()
+    ])
+
+    _lookup_cache[0] = mappings
+    _lookup_cache[1] = lookups
+    return lookups
+
+
+def _lookup_result(lookup: Tuple, index: Optional[int]) -> Optional[Dict]:
+    """Fresh copy of the result stored for an entry (None if no entry)."""
+    if index is None:
+        return None
+    return dict(lookup[3][index])
+
+
 def find_cross_domain_equivalent(term: str, mappings: Dict) -> Optional[Dict]:
-    """Find cross-domain equivalents for a term."""
-    # Check in cross_domain_equivalents
-    cross_domain = mappings["technical"].get("cross_domain_equivalents", {})
+    """
+    Find cross-domain equivalents for a term.
 
-    for concept, equivalents in cross_domain.items():
-        # Check if term matches any value in equivalents
-        for domain, domain_term in equivalents.items():
-            if term.lower() in domain_term.lower() or domain_term.lower() in term.lower():
-                return {
-                    "concept": concept,
-                    "equivalents": equivalents,
-                    "matched_domain": domain
-                }
+    Matches the first domain term that contains the term or is contained in it.
+    """
+    lookup = _get_lookups(mappings)["cross_domain"]
+    term_lower = term.lower()
 
-    return None
+    # First domain term containing the term, then any earlier one inside it
+    match = _first_containing(lookup, term_lower)
+    keys_lower = lookup[2]
+    limit = len(keys_lower) if match is None else match
+    for i in range(limit):
+        if keys_lower[i] in term_lower:
+            match = i
+            break
+
+    return _lookup_result(lookup, match)
 
 
 def get_autogen_mapping(term: str, mappings: Dict) -> Optional[Dict]:
     """Get Autogen-specific mapping for a term."""
-    autogen = mappings["technical"].get("autogen", {})
-
-    # Search in all categories
-    for category, items in autogen.items():
-        if isinstance(items, dict):
-            for key, value in items.items():
-                if term.lower() in key.lower():
-                    return {
-                        "category": category,
-                        "term": key,
-                        "details": value
-                    }
-
-    return None
+    lookup = _get_lookups(mappings)["autogen"]
+    return _lookup_result(lookup, _first_containing(lookup, term.lower()))
 
 
 def get_langroid_mapping(term: str, mappings: Dict) -> Optional[Dict]:
     """Get Langroid-specific mapping for a term."""
-    langroid = mappings["technical"].get("langroid", {})
-
-    # Search in all categories
-    for category, items in langroid.items():
-        if isinstance(items, dict):
-            for key, value in items.items():
-                if term.lower() in key.lower():
-                    return {
-                        "category": category,
-                        "term": key,
-                        "details": value
-                    }
-
-    return None
+    lookup = _get_lookups(mappings)["langroid"]
+    return _lookup_result(lookup, _first_containing(lookup, term.lower()))
 
 
 def get_ontology_entry(term: str, mappings: Dict) -> Optional[Dict]:
-    """Get ontology graph entry for a term."""
-    ontology = mappings["ontology"]
+    """
+    Get ontology graph entry for a term.
 
-    # Search in autogen ontology
-    autogen_ontology = ontology.get("autogen", {})
-    for key, value in autogen_ontology.items():
-        if term.lower() in key.lower():
-            return {
-                "domain": "autogen",
-                "term": key,
-                "ontology": value
-            }
-
-    # Search in langroid ontology
-    langroid_ontology = ontology.get("langroid", {})
-    for key, value in langroid_ontology.items():
-        if term.lower() in key.lower():
-            return {
-                "domain": "langroid",
-                "term": key,
-                "ontology": value
-            }
-
-    # Search in conceptual relationships
-    conceptual = ontology.get("conceptual_relationships", {})
-    for concept, data in conceptual.items():
-        if term.lower() in concept.lower():
-            return {
-                "domain": "conceptual",
-                "concept": concept,
-                "relationships": data
-            }
-
-    return None
+    Searches the autogen ontology, then langroid, then conceptual relationships.
+    """
+    lookup = _get_lookups(mappings)["ontology"]
+    return _lookup_result(lookup, _first_containing(lookup, term.lower()))
 
 
 def map_term(term: str, source_domain: Optional[str], target_domain: Optional[str],
@@ -132,7 +187,20 @@ def map_term(term: str, source_domain: Optional[str], target_domain: Optional[st
 
     Returns:
         Dictionary with mapping results
+
+    Results are memoized per argument tuple; each call returns its own copy
+    of the result and mapping dicts (knowledge base values are shared).
     """
+    cached = _map_term_cached(term, source_domain, target_domain, plugin_root)
+    result = dict(cached)
+    result["mappings"] = {name: dict(entry) for name, entry in cached["mappings"].items()}
+    return result
+
+
+@functools.lru_cache(maxsize=4096)
+def _map_term_cached(term: str, source_domain: Optional[str], target_domain: Optional[str],
+                     plugin_root: Path) -> Dict:
+    """Compute map_term results (shared - callers must copy before changing)."""
     mappings = load_mappings(plugin_root)
 
     result = {
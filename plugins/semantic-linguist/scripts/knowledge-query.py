@@ -6,30 +6,212 @@ Query the semantic-linguist knowledge base (ambiguous terms, technical mappings,
 ontology graph) with various filters and search patterns.
 """
 
+import argparse
+import bisect
+import functools
 import json
+import marshal
+import operator
+import os
 import sys
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+try:
+    # pyahocorasick is optional - multi-term queries are checked one by one without it
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    # orjson is optional - stdlib json is used when it is not installed
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = json.loads
+
+
+# Knowledge base key → JSON file in the knowledge directory
+KNOWLEDGE_FILES = (
+    ("ambiguous_terms", "ambiguous-terms.json"),
+    ("technical_mappings", "technical-mappings.json"),
+    ("ontology_graph", "ontology-graph.json"),
+)
+_KNOWLEDGE_FILENAMES = dict(KNOWLEDGE_FILES)
+
+# Marshal snapshot of a parsed file, kept next to it (format: file name)
+KNOWLEDGE_CACHE_NAME = ".{}.marshal"
+
+# Query types accepted by the batch subcommand
+BATCH_QUERY_TYPES = ("ambiguous", "domain", "ontology", "cross-domain")
+
+# Argument tuples whose results are kept per knowledge base (see _memoized)
+RESULT_CACHE_SIZE = 512
+
+# Ontology section → (result domain, result key field) for search_ontology
+ONTOLOGY_SECTIONS = (
+    ("autogen", "autogen", "key"),
+    ("langroid", "langroid", "key"),
+    ("conceptual_relationships", "conceptual", "concept"),
+)
+
+
+class KnowledgeBase(dict):
+    """
+    Knowledge base dictionary whose files are loaded on first access.
+
+    knowledge["ambiguous_terms"] parses ambiguous-terms.json the first time
+    it is looked up (likewise for the other KNOWLEDGE_FILES keys), so a query
+    only reads the files it uses. Search indexes and memoized results are
+    kept on the object (see _indexed) and go away with it.
+    """
+
+    def __init__(self, knowledge_dir: Path):
+        super().__init__()
+        self.knowledge_dir = knowledge_dir
+        self._derived = {}
+
+    def __missing__(self, key):
+        filename = _KNOWLEDGE_FILENAMES.get(key)
+        if filename is None:
+            raise KeyError(key)
+        value = self[key] = _load_knowledge_file(self.knowledge_dir / filename)
+        return value
 
 
 def load_knowledge(plugin_root: Path) -> Dict:
-    """Load all knowledge base files."""
-    knowledge_dir = plugin_root / "skills" / "semantic-validation" / "knowledge"
+    """
+    Open the knowledge base.
 
-    with open(knowledge_dir / "ambiguous-terms.json") as f:
-        ambiguous = json.load(f)
+    Files are read lazily, when a query first uses them (see KnowledgeBase).
+    """
+    return KnowledgeBase(plugin_root / "skills" / "semantic-validation" / "knowledge")
 
-    with open(knowledge_dir / "technical-mappings.json") as f:
-        technical = json.load(f)
 
-    with open(knowledge_dir / "ontology-graph.json") as f:
-        ontology = json.load(f)
+def _load_knowledge_file(path: Path):
+    """
+    Parse one knowledge file.
 
-    return {
-        "ambiguous_terms": ambiguous,
-        "technical_mappings": technical,
-        "ontology_graph": ontology
-    }
+    The parsed file is snapshotted with marshal (KNOWLEDGE_CACHE_NAME) and
+    the snapshot is loaded instead while the file keeps its mtime and size.
+    Set SL_KB_NOCACHE to always parse the JSON.
+    """
+    use_cache = not os.environ.get("SL_KB_NOCACHE")
+    if use_cache:
+        cache_path = path.with_name(KNOWLEDGE_CACHE_NAME.format(path.name))
+        stamp = _knowledge_stamp(path)
+        cached = _read_knowledge_cache(cache_path, stamp)
+        if cached is not None:
+            return cached
+
+    data = _loads(path.read_bytes())
+
+    if use_cache:
+        _write_knowledge_cache(cache_path, stamp, data)
+    return data
+
+
+def _knowledge_stamp(path: Path) -> tuple:
+    """Python version plus the file's (mtime, size), to validate its snapshot."""
+    st = os.stat(path)
+    return (tuple(sys.version_info[:2]), st.st_mtime_ns, st.st_size)
+
+
+def _read_knowledge_cache(cache_path: Path, stamp: tuple):
+    """Data from the snapshot, or None if it is missing, stale or unreadable."""
+    try:
+        # One read: marshal.load on a file object reads it piecemeal
+        cached_stamp, data = marshal.loads(cache_path.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return data if cached_stamp == stamp else None
+
+
+def _write_knowledge_cache(cache_path: Path, stamp: tuple, data) -> None:
+    """Atomically replace the snapshot (skipped if the directory is read-only)."""
+    temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, "wb") as f:
+            marshal.dump((stamp, data), f)
+        os.replace(temp_path, cache_path)
+    except (OSError, ValueError):
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def _indexed(knowledge: Dict, name, build):
+    """
+    Lowercased search keys (or other derived data) for one part of knowledge,
+    built on first use. Each string is lowercased once, so repeated queries
+    only do substring checks.
+
+    Kept on a KnowledgeBase; for a plain dict it is built on every call
+    (nothing is stored in the caller's dict).
+    """
+    derived = getattr(knowledge, "_derived", None)
+    if derived is None:
+        return build()
+    entries = derived.get(name)
+    if entries is None:
+        entries = derived[name] = build()
+    return entries
+
+
+def _memoized(knowledge: Dict, compute):
+    """
+    compute(knowledge, *args) as a function of args, memoized for the last
+    RESULT_CACHE_SIZE argument tuples of this knowledge base (see _indexed).
+    """
+    return _indexed(knowledge, compute, lambda: functools.lru_cache(maxsize=RESULT_CACHE_SIZE)(
+        functools.partial(compute, knowledge)
+    ))
+
+
+def _copy_results(results: List[Dict]) -> List[Dict]:
+    """Fresh list and result dicts (the knowledge data inside stays shared)."""
+    return [dict(result) for result in results]
+
+
+def _flatten_mappings(obj) -> List[Tuple]:
+    """
+    Searchable keys and string values under obj, depth first.
+
+    Walks nested dicts with an explicit stack of item iterators (no recursion,
+    so deep mappings cannot hit the recursion limit).
+
+    Returns:
+        (path, key, value, text lowercased) tuples in search_domain_mappings
+        result order; key is None for string values, whose own text is searched
+    """
+    entries = []
+    append = entries.append
+
+    if isinstance(obj, str):
+        append(("", None, obj, obj.lower()))
+    if not isinstance(obj, dict):
+        return entries
+
+    stack = [(iter(obj.items()), "")]
+    while stack:
+        items, path = stack[-1]
+        for key, value in items:
+            current_path = f"{path}.{key}" if path else key
+            append((current_path, key, value, key.lower()))
+
+            if isinstance(value, dict):
+                # Descend; this level resumes from its iterator afterwards
+                stack.append((iter(value.items()), current_path))
+                break
+            if isinstance(value, str):
+                append((current_path, None, value, value.lower()))
+        else:
+            stack.pop()
+
+    return entries
 
 
 def search_ambiguous_terms(query: str, knowledge: Dict,
@@ -46,26 +228,99 @@ def search_ambiguous_terms(query: str, knowledge: Dict,
 
     Returns:
         List of matching terms with their data
+
+    Results are memoized per KnowledgeBase and arguments; each call returns
+    its own list of result dicts.
     """
+    return _copy_results(_memoized(knowledge, _compute_ambiguous_terms)(query, min_score, category))
+
+
+def _compute_ambiguous_terms(knowledge: Dict, query: str, min_score: Optional[float],
+                             category: Optional[str]) -> List[Dict]:
+    """Compute search_ambiguous_terms results (shared - callers must copy)."""
     results = []
     ambiguous = knowledge["ambiguous_terms"]
+    query_lower = query.lower()
+    category_lower = category.lower() if category is not None else None
+
+    index = _ambiguous_index(knowledge)
+    candidates = _category_candidates(knowledge, index, category_lower)
+
+    # Only terms holding every trigram of the query can contain it
+    if len(query_lower) >= 3:
+        trigrams = _indexed(knowledge, "ambiguous_trigrams", lambda: _trigram_index(index))
+        matching = _trigram_candidates(query_lower, trigrams)
+        if category_lower is not None:
+            allowed = set(candidates)
+            matching = [i for i in matching if i in allowed]
+        candidates = matching
+
+    for i in candidates:
+        term, term_lower, _ = index[i]
+        data = ambiguous[term]
+
+        # Score filter (cheaper than the substring check)
+        if min_score is not None:
+            score = data.get("ambiguity_score", 0)
+            if score < min_score:
+                continue
 
-    for term, data in ambiguous.items():
         # Query match
-        if query.lower() not in term.lower():
+        if query_lower not in term_lower:
             continue
 
-        # Score filter
+        results.append({
+            "term": term,
+            "data": data
+        })
+
+    return results
+
+
+def search_ambiguous_terms_multi(queries: List[str], knowledge: Dict,
+                                min_score: Optional[float] = None,
+                                category: Optional[str] = None) -> List[Dict]:
+    """
+    Search ambiguous terms matching any of several query strings.
+
+    Same filters and result format as search_ambiguous_terms; each term is
+    reported once, in knowledge base order. With pyahocorasick installed
+    every term is checked against all queries in one pass.
+    """
+    results = []
+    ambiguous = knowledge["ambiguous_terms"]
+    queries_lower = {query.lower() for query in queries}
+    category_lower = category.lower() if category is not None else None
+
+    index = _ambiguous_index(knowledge)
+    candidates = _category_candidates(knowledge, index, category_lower)
+
+    if not queries_lower:
+        return results
+    if "" in queries_lower:
+        # The empty query is contained in every term
+        matches = None
+    elif ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for query_lower in queries_lower:
+            automaton.add_word(query_lower, query_lower)
+        automaton.make_automaton()
+        matches = lambda term_lower: next(automaton.iter(term_lower), None) is not None
+    else:
+        matches = lambda term_lower: any(q in term_lower for q in queries_lower)
+
+    for i in candidates:
+        term, term_lower, _ = index[i]
+        data = ambiguous[term]
+
+        # Score filter (cheaper than the query match)
         if min_score is not None:
             score = data.get("ambiguity_score", 0)
             if score < min_score:
                 continue
 
-        # Category filter
-        if category is not None:
-            term_category = data.get("category", "")
-            if category.lower() not in term_category.lower():
-                continue
+        if matches is not None and not matches(term_lower):
+            continue
 
         results.append({
             "term": term,
@@ -75,6 +330,66 @@ def search_ambiguous_terms(query: str, knowledge: Dict,
     return results
 
 
+def _ambiguous_index(knowledge: Dict) -> List[Tuple]:
+    """(term, term lowercased, category lowercased) for every ambiguous term."""
+    return _indexed(knowledge, "ambiguous_terms", lambda: [
+        (term, term.lower(), data.get("category", "").lower())
+        for term, data in knowledge["ambiguous_terms"].items()
+    ])
+
+
+def _category_candidates(knowledge: Dict, index: List[Tuple], category_lower: Optional[str]):
+    """
+    Ascending index positions to visit for a category filter (all of them
+    when category_lower is None); only terms of the (few) matching
+    categories are visited.
+    """
+    if category_lower is None:
+        return range(len(index))
+    by_category = _indexed(knowledge, "ambiguous_categories", lambda: _category_index(index))
+    return sorted(
+        i for term_category, ids in by_category.items()
+        if category_lower in term_category
+        for i in ids
+    )
+
+
+def _category_index(entries: List[Tuple]) -> Dict[str, List[int]]:
+    """Map every lowercased category to the (ascending) entry indexes in it."""
+    by_category: Dict[str, List[int]] = {}
+    for i, (_, _, term_category) in enumerate(entries):
+        by_category.setdefault(term_category, []).append(i)
+    return by_category
+
+
+def _trigram_index(entries: List[Tuple]) -> Dict[str, List[int]]:
+    """Map every trigram of the lowercased terms to the (ascending) entry indexes containing it."""
+    postings: Dict[str, List[int]] = {}
+    for i, (_, term_lower, _) in enumerate(entries):
+        for trigram in {term_lower[j:j + 3] for j in range(len(term_lower) - 2)}:
+            postings.setdefault(trigram, []).append(i)
+    return postings
+
+
+def _trigram_candidates(query_lower: str, postings: Dict[str, List[int]]) -> List[int]:
+    """Entry indexes (ascending) whose terms hold every trigram of query_lower."""
+    lists = []
+    for trigram in {query_lower[j:j + 3] for j in range(len(query_lower) - 2)}:
+        posting = postings.get(trigram)
+        if posting is None:
+            return []
+        lists.append(posting)
+
+    # Intersect starting from the shortest posting list
+    lists.sort(key=len)
+    found = set(lists[0])
+    for posting in lists[1:]:
+        found.intersection_update(posting)
+        if not found:
+            return []
+    return sorted(found)
+
+
 def get_term_details(term: str, knowledge: Dict) -> Optional[Dict]:
     """Get complete details for a specific ambiguous term."""
     ambiguous = knowledge["ambiguous_terms"]
@@ -82,29 +397,62 @@ def get_term_details(term: str, knowledge: Dict) -> Optional[Dict]:
 
 
 def get_all_categories(knowledge: Dict) -> List[str]:
-    """Get all unique categories from ambiguous terms."""
-    categories = set()
-    for data in knowledge["ambiguous_terms"].values():
-        if "category" in data:
-            categories.add(data["category"])
-    return sorted(list(categories))
+    """
+    Get all unique categories from ambiguous terms.
 
+    Computed once per KnowledgeBase; callers share the list and must not
+    modify it.
+    """
+    return _indexed(knowledge, "categories", lambda: sorted({
+        data["category"]
+        for data in knowledge["ambiguous_terms"].values()
+        if "category" in data
+    }))
 
-def get_high_ambiguity_terms(knowledge: Dict, threshold: float = 0.8) -> List[Dict]:
-    """Get all terms with ambiguity score above threshold."""
-    results = []
-    for term, data in knowledge["ambiguous_terms"].items():
-        score = data.get("ambiguity_score", 0)
-        if score >= threshold:
-            results.append({
-                "term": term,
-                "score": score,
-                "data": data
-            })
 
-    # Sort by score descending
-    results.sort(key=lambda x: x["score"], reverse=True)
-    return results
+def get_high_ambiguity_terms(knowledge: Dict, threshold: float = 0.8,
+                             top: Optional[int] = None) -> List[Dict]:
+    """
+    Get all terms with ambiguity score above threshold.
+
+    Args:
+        knowledge: Knowledge base dictionary
+        threshold: Minimum ambiguity score
+        top: Only return the top highest-scoring terms (all if None)
+
+    Results are memoized per KnowledgeBase and arguments; each call returns
+    its own list of result dicts.
+    """
+    return _copy_results(_memoized(knowledge, _compute_high_ambiguity_terms)(threshold, top))
+
+
+def _compute_high_ambiguity_terms(knowledge: Dict, threshold: float,
+                                  top: Optional[int]) -> List[Dict]:
+    """Compute get_high_ambiguity_terms results (shared - callers must copy)."""
+    ranked, negated_scores = _indexed(knowledge, "ambiguous_by_score", lambda: _score_index(knowledge))
+
+    # Terms scoring >= threshold are a prefix of the ranking
+    count = bisect.bisect_right(negated_scores, -threshold)
+    if top is not None:
+        count = min(count, max(top, 0))
+
+    return [
+        {"term": term, "score": score, "data": data}
+        for term, score, data in ranked[:count]
+    ]
+
+
+def _score_index(knowledge: Dict) -> Tuple[List[Tuple], List]:
+    """
+    Ambiguous terms as (term, score, data) by score descending (ties keep
+    file order), plus their negated scores (ascending, for bisect).
+    """
+    scored = [
+        (term, data.get("ambiguity_score", 0), data)
+        for term, data in knowledge["ambiguous_terms"].items()
+    ]
+    scored.sort(key=operator.itemgetter(1), reverse=True)
+    return scored, [-score for _, score, _ in scored]
 
 
 def search_domain_mappings(domain: str, query: str, knowledge: Dict) -> List[Dict]:
@@ -118,41 +466,44 @@ def search_domain_mappings(domain: str, query: str, knowledge: Dict) -> List[Dic
 
     Returns:
         List of matching mappings
+
+    Results are memoized per KnowledgeBase and arguments; each call returns
+    its own list of result dicts.
     """
+    return _copy_results(_memoized(knowledge, _compute_domain_mappings)(domain, query))
+
+
+def _compute_domain_mappings(knowledge: Dict, domain: str, query: str) -> List[Dict]:
+    """Compute search_domain_mappings results (shared - callers must copy)."""
     results = []
     technical = knowledge["technical_mappings"]
 
     if domain not in technical:
         return results
 
-    domain_data = technical[domain]
-
-    # Recursive search through nested structure
-    def search_nested(obj, path=""):
-        if isinstance(obj, dict):
-            for key, value in obj.items():
-                current_path = f"{path}.{key}" if path else key
+    query_lower = query.lower()
 
-                # Match on key
-                if query.lower() in key.lower():
-                    results.append({
-                        "path": current_path,
-                        "key": key,
-                        "value": value
-                    })
+    # Nested keys and string values, flattened depth first
+    index = _indexed(knowledge, ("technical_mappings", domain), lambda: _flatten_mappings(technical[domain]))
 
-                # Recurse
-                search_nested(value, current_path)
+    for path, key, value, text_lower in index:
+        if query_lower not in text_lower:
+            continue
 
-        elif isinstance(obj, str):
+        if key is not None:
+            # Match on key
+            results.append({
+                "path": path,
+                "key": key,
+                "value": value
+            })
+        else:
             # Match on string values
-            if query.lower() in obj.lower():
-                results.append({
-                    "path": path,
-                    "value": obj
-                })
+            results.append({
+                "path": path,
+                "value": value
+            })
 
-    search_nested(domain_data)
     return results
 
 
@@ -163,58 +514,63 @@ def get_cross_domain_mapping(concept: str, knowledge: Dict) -> Optional[Dict]:
 
 
 def search_ontology(query: str, knowledge: Dict) -> List[Dict]:
-    """Search ontology graph for matching entries."""
-    results = []
-    ontology = knowledge["ontology_graph"]
+    """
+    Search ontology graph for matching entries.
 
-    # Search in autogen
-    if "autogen" in ontology:
-        for key, value in ontology["autogen"].items():
-            if query.lower() in key.lower():
-                results.append({
-                    "domain": "autogen",
-                    "key": key,
-                    "data": value
-                })
+    Results are memoized per KnowledgeBase and arguments; each call returns
+    its own list of result dicts.
+    """
+    return _copy_results(_memoized(knowledge, _compute_ontology)(query))
 
-    # Search in langroid
-    if "langroid" in ontology:
-        for key, value in ontology["langroid"].items():
-            if query.lower() in key.lower():
-                results.append({
-                    "domain": "langroid",
-                    "key": key,
-                    "data": value
-                })
 
-    # Search in conceptual relationships
-    if "conceptual_relationships" in ontology:
-        for concept, data in ontology["conceptual_relationships"].items():
-            if query.lower() in concept.lower():
+def _compute_ontology(knowledge: Dict, query: str) -> List[Dict]:
+    """Compute search_ontology results (shared - callers must copy)."""
+    results = []
+    ontology = knowledge["ontology_graph"]
+    query_lower = query.lower()
+
+    # (result domain, key field, section entries, [(key, key lowercased)])
+    # for autogen, langroid and conceptual relationships
+    index = _indexed(knowledge, "ontology_graph", lambda: [
+        (domain, field, ontology[section], [(key, key.lower()) for key in ontology[section]])
+        for section, domain, field in ONTOLOGY_SECTIONS
+        if section in ontology
+    ])
+
+    for domain, field, entries, keys in index:
+        for key, key_lower in keys:
+            if query_lower in key_lower:
                 results.append({
-                    "domain": "conceptual",
-                    "concept": concept,
-                    "data": data
+                    "domain": domain,
+                    field: key,
+                    "data": entries[key]
                 })
 
     return results
 
 
 def get_statistics(knowledge: Dict) -> Dict:
-    """Get statistics about the knowledge base."""
+    """
+    Get statistics about the knowledge base.
+
+    Computed once per KnowledgeBase; callers share the result and must not
+    modify it.
+    """
+    return _indexed(knowledge, "statistics", lambda: _compute_statistics(knowledge))
+
+
+def _compute_statistics(knowledge: Dict) -> Dict:
+    """Statistics for get_statistics."""
     ambiguous_count = len(knowledge["ambiguous_terms"])
 
-    # Count by category
-    category_counts = {}
+    # Count by category and high ambiguity in one pass
+    category_counts = Counter()
+    high_ambiguity = 0
     for data in knowledge["ambiguous_terms"].values():
-        cat = data.get("category", "unknown")
-        category_counts[cat] = category_counts.get(cat, 0) + 1
-
-    # High ambiguity count
-    high_ambiguity = sum(
-        1 for data in knowledge["ambiguous_terms"].values()
-        if data.get("ambiguity_score", 0) >= 0.8
-    )
+        get = data.get
+        category_counts[get("category", "unknown")] += 1
+        if get("ambiguity_score", 0) >= 0.8:
+            high_ambiguity += 1
 
     # Domain counts
     autogen_count = len(knowledge["technical_mappings"].get("autogen", {}))
@@ -229,7 +585,7 @@ def get_statistics(knowledge: Dict) -> Dict:
     return {
         "ambiguous_terms": {
             "total": ambiguous_count,
-            "by_category": category_counts,
+            "by_category": dict(category_counts),
             "high_ambiguity": high_ambiguity
         },
         "technical_mappings": {
@@ -246,93 +602,235 @@ def get_statistics(knowledge: Dict) -> Dict:
 
 def format_search_results(results: List[Dict], query_type: str) -> str:
     """Format search results for display."""
-    output = []
-
     if not results:
-        output.append(f"No results found for query type: {query_type}")
-        return "\n".join(output)
+        return f"No results found for query type: {query_type}"
 
-    output.append(f"# Search Results ({len(results)} found)")
-    output.append("")
+    output = [f"# Search Results ({len(results)} found)", ""]
+    append = output.append
 
     for i, result in enumerate(results, 1):
-        output.append(f"## Result {i}")
+        append(f"## Result {i}")
 
         if query_type == "ambiguous":
-            output.append(f"**Term**: {result['term']}")
+            append(f"**Term**: {result['term']}")
             data = result['data']
-            output.append(f"**Score**: {data.get('ambiguity_score', 'N/A')}")
-            output.append(f"**Category**: {data.get('category', 'N/A')}")
+            append(f"**Score**: {data.get('ambiguity_score', 'N/A')}")
+            append(f"**Category**: {data.get('category', 'N/A')}")
 
             if 'domains' in data:
-                output.append("\n**Domains**:")
+                append("\n**Domains**:")
                 for domain, meanings in data['domains'].items():
-                    output.append(f"  - {domain}: {', '.join(meanings)}")
+                    append(f"  - {domain}: {', '.join(meanings)}")
 
         elif query_type == "domain":
-            output.append(f"**Path**: {result.get('path', 'N/A')}")
-            output.append(f"**Key**: {result.get('key', 'N/A')}")
+            append(f"**Path**: {result.get('path', 'N/A')}")
+            append(f"**Key**: {result.get('key', 'N/A')}")
             if 'value' in result and isinstance(result['value'], (str, int, float)):
-                output.append(f"**Value**: {result['value']}")
+                append(f"**Value**: {result['value']}")
 
         elif query_type == "ontology":
-            output.append(f"**Domain**: {result.get('domain', 'N/A')}")
-            output.append(f"**Key**: {result.get('key', result.get('concept', 'N/A'))}")
+            append(f"**Domain**: {result.get('domain', 'N/A')}")
+            append(f"**Key**: {result.get('key', result.get('concept', 'N/A'))}")
 
-        output.append("")
+        append("")
 
     return "\n".join(output)
 
 
+def print_json(obj) -> None:
+    """Print obj as JSON indented by two spaces (serialized by orjson when installed)."""
+    if orjson is None:
+        print(json.dumps(obj, indent=2))
+        return
+    sys.stdout.flush()
+    sys.stdout.buffer.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2) + b"\n")
+    sys.stdout.buffer.flush()
+
+
+def batch_query(args: argparse.Namespace, query: str, knowledge: Dict):
+    """Result of one batch query of type args.type (see run_batch)."""
+    if args.type == "ambiguous":
+        return search_ambiguous_terms(query, knowledge, args.min_score, args.category)
+    if args.type == "domain":
+        return search_domain_mappings(args.domain, query, knowledge)
+    if args.type == "ontology":
+        return search_ontology(query, knowledge)
+    return get_cross_domain_mapping(query, knowledge)
+
+
+def run_batch(args: argparse.Namespace, knowledge: Dict, lines, out) -> int:
+    """
+    Run one query per input line against an already loaded knowledge base.
+
+    Writes a {"q": query, "r": results} JSON line per query, so many queries
+    share a single interpreter start and knowledge load. Blank lines are
+    skipped.
+
+    Returns:
+        Number of queries run
+    """
+    count = 0
+    for line in lines:
+        query = line.rstrip("\r\n")
+        if not query:
+            continue
+        result = batch_query(args, query, knowledge)
+        out.write(json.dumps({"q": query, "r": result}) + "\n")
+        count += 1
+    return count
+
+
 def main():
     """CLI entry point."""
-    if len(sys.argv) < 3:
-        print("Usage: knowledge-query.py <query_type> <query> [options]")
-        print("\nQuery types:")
-        print("  ambiguous <term> [--min-score 0.8] [--category meta_question]")
-        print("  domain <domain> <query>  (e.g., 'domain autogen agent')")
-        print("  ontology <query>")
-        print("  cross-domain <concept>")
-        print("  stats")
-        print("  categories")
-        print("  high-ambiguity [threshold]")
+    parser = argparse.ArgumentParser(
+        description="Query the semantic-linguist knowledge base"
+    )
+    subparsers = parser.add_subparsers(dest="query_type", help="Query type")
+
+    # ambiguous
+    ambiguous_parser = subparsers.add_parser(
+        "ambiguous",
+        help="Search ambiguous terms"
+    )
+    ambiguous_parser.add_argument(
+        "query",
+        nargs="+",
+        help="Search term (partial match); terms matching any of several are listed"
+    )
+    ambiguous_parser.add_argument(
+        "--min-score",
+        type=float,
+        default=None,
+        help="Minimum ambiguity score (e.g., 0.8)"
+    )
+    ambiguous_parser.add_argument(
+        "--category",
+        default=None,
+        help="Category filter (e.g., meta_question)"
+    )
+
+    # domain
+    domain_parser = subparsers.add_parser(
+        "domain",
+        help="Search technical mappings of a domain (e.g., 'domain autogen agent')"
+    )
+    domain_parser.add_argument("domain", help="Domain to search (autogen, langroid, general, ...)")
+    domain_parser.add_argument("query", help="Search term")
+
+    # ontology
+    ontology_parser = subparsers.add_parser(
+        "ontology",
+        help="Search the ontology graph"
+    )
+    ontology_parser.add_argument("query", help="Search term")
+
+    # cross-domain
+    cross_domain_parser = subparsers.add_parser(
+        "cross-domain",
+        help="Show cross-domain equivalents of a concept"
+    )
+    cross_domain_parser.add_argument("concept", help="Concept name")
+
+    # stats
+    subparsers.add_parser(
+        "stats",
+        help="Show knowledge base statistics"
+    )
+
+    # categories
+    subparsers.add_parser(
+        "categories",
+        help="List ambiguous-term categories"
+    )
+
+    # high-ambiguity
+    high_parser = subparsers.add_parser(
+        "high-ambiguity",
+        help="List terms at or above an ambiguity score"
+    )
+    high_parser.add_argument(
+        "threshold",
+        nargs="?",
+        type=float,
+        default=0.8,
+        help="Score threshold (default: 0.8)"
+    )
+    high_parser.add_argument(
+        "--top",
+        type=int,
+        default=None,
+        help="Only list the N highest-scoring terms"
+    )
+
+    # batch
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="Run newline-delimited queries from stdin, one JSON line per query"
+    )
+    batch_parser.add_argument(
+        "--type",
+        required=True,
+        choices=BATCH_QUERY_TYPES,
+        help="Query type of every line"
+    )
+    batch_parser.add_argument(
+        "--domain",
+        default=None,
+        help="Domain to search (required with --type domain)"
+    )
+    batch_parser.add_argument(
+        "--min-score",
+        type=float,
+        default=None,
+        help="Minimum ambiguity score (--type ambiguous)"
+    )
+    batch_parser.add_argument(
+        "--category",
+        default=None,
+        help="Category filter (--type ambiguous)"
+    )
+
+    args = parser.parse_args()
+    query_type = args.query_type
+
+    if query_type is None:
+        parser.print_help()
         sys.exit(1)
 
-    query_type = sys.argv[1]
+    if query_type == "batch" and args.type == "domain" and args.domain is None:
+        batch_parser.error("--domain is required with --type domain")
+
+    # Loaded only once the arguments are valid
     plugin_root = Path(__file__).parent.parent
     knowledge = load_knowledge(plugin_root)
 
     # Handle different query types
     if query_type == "ambiguous":
-        query = sys.argv[2]
-        min_score = float(sys.argv[4]) if "--min-score" in sys.argv else None
-        category = sys.argv[sys.argv.index("--category") + 1] if "--category" in sys.argv else None
-
-        results = search_ambiguous_terms(query, knowledge, min_score, category)
+        if len(args.query) == 1:
+            results = search_ambiguous_terms(args.query[0], knowledge, args.min_score, args.category)
+        else:
+            results = search_ambiguous_terms_multi(args.query, knowledge, args.min_score, args.category)
         print(format_search_results(results, "ambiguous"))
 
     elif query_type == "domain":
-        domain = sys.argv[2]
-        query = sys.argv[3]
-        results = search_domain_mappings(domain, query, knowledge)
+        results = search_domain_mappings(args.domain, args.query, knowledge)
         print(format_search_results(results, "domain"))
 
     elif query_type == "ontology":
-        query = sys.argv[2]
-        results = search_ontology(query, knowledge)
+        results = search_ontology(args.query, knowledge)
         print(format_search_results(results, "ontology"))
 
     elif query_type == "cross-domain":
-        concept = sys.argv[2]
+        concept = args.concept
         result = get_cross_domain_mapping(concept, knowledge)
         if result:
-            print(json.dumps({concept: result}, indent=2))
+            print_json({concept: result})
         else:
             print(f"No cross-domain mapping found for: {concept}")
 
     elif query_type == "stats":
         stats = get_statistics(knowledge)
-        print(json.dumps(stats, indent=2))
+        print_json(stats)
 
     elif query_type == "categories":
         categories = get_all_categories(knowledge)
@@ -341,16 +839,15 @@ def main():
             print(f"  - {cat}")
 
     elif query_type == "high-ambiguity":
-        threshold = float(sys.argv[2]) if len(sys.argv) > 2 else 0.8
-        results = get_high_ambiguity_terms(knowledge, threshold)
+        threshold = args.threshold
+        results = get_high_ambiguity_terms(knowledge, threshold, args.top)
         print(f"# High Ambiguity Terms (score >= {threshold})")
         print("")
         for result in results:
             print(f"- **{result['term']}**: {result['score']}")
 
-    else:
-        print(f"Unknown query type: {query_type}")
-        sys.exit(1)
+    elif query_type == "batch":
+        run_batch(args, knowledge, sys.stdin, sys.stdout)
 
 
 if __name__ == "__main__":
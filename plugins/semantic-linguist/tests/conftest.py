@@ -0,0 +1,46 @@
+"""
+Shared pytest configuration for semantic-linguist tests
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+PLUGIN_ROOT = Path(__file__).parent.parent
+KNOWLEDGE_DIR = PLUGIN_ROOT / "skills" / "semantic-translation" / "knowledge"
+
+
+def _load_script(module_name: str, filename: str):
+    """Import a (hyphen-named) script from scripts/ as module_name."""
+    spec = importlib.util.spec_from_file_location(module_name, PLUGIN_ROOT / "scripts" / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# Loaded once for every test module, whose own imports are then plain
+# sys.modules lookups
+_load_script("detect_ambiguity", "detect-ambiguity.py")
+_load_script("knowledge_query", "knowledge-query.py")
+
+
+@pytest.fixture(autouse=True)
+def no_knowledge_snapshots(monkeypatch):
+    """Keep tests from writing marshal snapshots next to the shipped knowledge files."""
+    monkeypatch.setenv("SL_KB_NOCACHE", "1")
+
+
+@pytest.fixture
+def knowledge_dir():
+    """The shipped knowledge files."""
+    return KNOWLEDGE_DIR
+
+
+@pytest.fixture
+def knowledge(knowledge_dir):
+    """A fresh lazily loaded copy of the shipped knowledge base."""
+    import knowledge_query
+    return knowledge_query.KnowledgeBase(knowledge_dir)
@@ -0,0 +1,105 @@
+"""
+Unit tests for detect-ambiguity.py
+Tests the pattern gates in front of the regex detectors
+"""
+
+import re
+
+import pytest
+
+import detect_ambiguity
+from detect_ambiguity import (
+    _LITERAL_GATES,
+    _LOWERCASE_PATTERNS,
+    _NEGATIVE_LOOKAHEAD_RE,
+    _UNCLEAR_REFERENCE_PATTERNS,
+    _gate_patterns,
+    detect_pattern_signals,
+)
+
+SAMPLE_TEXTS = [
+    "",
+    "Am I making sense? I'm not technical, just fix it.",
+    "Make it faster and do the thing like before",
+    "The agent calls a tool for each task with the wrapper module",
+    "AutoGen ConversableAgent with a GroupChat and a tool",
+    "that",
+    "it",
+    "with bit, admit it",
+    "Can you get it working? Does this make sense",
+    "Update the handler like before it breaks",
+    # A final word boundary at the end of 49-69 byte buffers (see _gate_patterns)
+    "make fix tool beginner with before sense? ! agent agent it",
+    "x" * 46 + " it",
+    "x" * 60 + " that",
+    "x" * 70 + " the thing",
+    "Ünïcode text about the agent, fix it",
+]
+
+PATTERN_SETS = [
+    pytest.param(_LOWERCASE_PATTERNS, id="lowercase"),
+    pytest.param(_UNCLEAR_REFERENCE_PATTERNS, id="unclear_references"),
+]
+
+
+def literal_gate(patterns, gate_text):
+    """Indexes _gate_patterns returns without hyperscan."""
+    return [i for i, pattern in enumerate(patterns) if _LITERAL_GATES[pattern] in gate_text]
+
+
+def lookahead_free_matches(patterns, gate_text):
+    """Indexes of patterns that match gate_text once negative lookaheads are dropped."""
+    return [
+        i for i, pattern in enumerate(patterns)
+        if re.search(_NEGATIVE_LOOKAHEAD_RE.sub("", pattern.pattern), gate_text)
+    ]
+
+
+def test_literal_gates_cover_every_pattern():
+    """Every gated pattern has a literal contained in all of its matches"""
+    for patterns in (_LOWERCASE_PATTERNS, _UNCLEAR_REFERENCE_PATTERNS):
+        for pattern in patterns:
+            assert pattern in _LITERAL_GATES
+            for text in SAMPLE_TEXTS:
+                for match in pattern.finditer(text.lower()):
+                    assert _LITERAL_GATES[pattern] in match.group().lower()
+
+
+@pytest.mark.parametrize("patterns", PATTERN_SETS)
+@pytest.mark.parametrize("text", SAMPLE_TEXTS)
+def test_gate_patterns_without_hyperscan_uses_literals(monkeypatch, patterns, text):
+    """Without hyperscan the gate is the literal lookup"""
+    monkeypatch.setattr(detect_ambiguity, "hyperscan", None)
+    gate_text = text.lower()
+
+    assert _gate_patterns(patterns, gate_text) == literal_gate(patterns, gate_text)
+
+
+@pytest.mark.skipif(detect_ambiguity.hyperscan is None, reason="hyperscan not installed")
+@pytest.mark.parametrize("patterns", PATTERN_SETS)
+@pytest.mark.parametrize("text", SAMPLE_TEXTS)
+def test_hyperscan_gate_agrees_with_literal_gate(patterns, text):
+    """Hyperscan reports exactly the lookahead-free matches, within the literal gate"""
+    gate_text = text.lower()
+    gated = _gate_patterns(patterns, gate_text)
+    literal = literal_gate(patterns, gate_text)
+
+    if gate_text.isascii():
+        assert gated == lookahead_free_matches(patterns, gate_text)
+        assert set(gated) <= set(literal)
+    else:
+        # Non-ASCII text is not scanned by hyperscan
+        assert gated == literal
+
+    # Neither gate drops a pattern that matches
+    matching = [i for i, pattern in enumerate(patterns) if pattern.search(gate_text)]
+    assert set(matching) <= set(gated)
+
+
+@pytest.mark.parametrize("text", SAMPLE_TEXTS)
+def test_detections_do_not_depend_on_hyperscan(monkeypatch, text):
+    """Detections are the same through either gate"""
+    detected = detect_pattern_signals(text)
+    monkeypatch.setattr(detect_ambiguity, "hyperscan", None)
+
+    assert detect_pattern_signals(text) == detected
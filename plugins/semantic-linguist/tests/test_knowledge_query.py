@@ -0,0 +1,224 @@
+"""
+Unit tests for knowledge-query.py
+Tests the ambiguous-term indexes against a plain scan of the knowledge base
+"""
+
+import copy
+import gc
+import weakref
+
+import pytest
+
+import knowledge_query
+from knowledge_query import (
+    _ambiguous_index,
+    _category_candidates,
+    _trigram_candidates,
+    _trigram_index,
+    get_all_categories,
+    get_high_ambiguity_terms,
+    get_statistics,
+    search_ambiguous_terms,
+    search_ambiguous_terms_multi,
+    search_domain_mappings,
+    search_ontology,
+)
+
+# Short, exactly-trigram and longer queries, including ones whose trigrams
+# all occur in some term without the query itself occurring in it
+QUERIES = [
+    "", "a", "Ma", "it", "api", "AGE", "ake", "make it", "the thing",
+    "git", "agent", "ent a", "tag", "xyz", "make it talk", "portable api",
+]
+
+CATEGORIES = [None, "unclear_scope", "SCOPE", "ai_", "git", "no such category"]
+
+
+def small_knowledge():
+    """Hand-written ambiguous terms covering the query edge cases."""
+    return {
+        "ambiguous_terms": {
+            "Agent": {"ambiguity_score": 0.9, "category": "generic_term"},
+            "make it talk": {"ambiguity_score": 0.85, "category": "vague_action_verb"},
+            "git tag": {"ambiguity_score": 0.4, "category": "git_concept"},
+            "agentic": {"ambiguity_score": 0.7, "category": "ai_concept"},
+            "gent age": {"category": "Unclear_Scope"},
+            "it": {"ambiguity_score": 0.95, "category": "unclear_scope"},
+            "API": {"ambiguity_score": 0.6},
+        }
+    }
+
+
+def naive_search(queries, knowledge, min_score=None, category=None):
+    """Terms containing any query, filtered by score and category substring."""
+    return [
+        {"term": term, "data": data}
+        for term, data in knowledge["ambiguous_terms"].items()
+        if any(query.lower() in term.lower() for query in queries)
+        and (min_score is None or data.get("ambiguity_score", 0) >= min_score)
+        and (category is None or category.lower() in data.get("category", "").lower())
+    ]
+
+
+@pytest.fixture(params=["small", "shipped"])
+def any_knowledge(request, knowledge):
+    """The hand-written terms and the shipped knowledge base."""
+    return small_knowledge() if request.param == "small" else knowledge
+
+
+def test_trigram_index_postings_are_ascending_and_complete():
+    """Every trigram maps to each entry holding it, once, in order"""
+    index = _ambiguous_index(small_knowledge())
+    postings = _trigram_index(index)
+
+    for trigram, ids in postings.items():
+        assert len(trigram) == 3
+        assert ids == sorted(set(ids))
+        assert ids == [i for i, (_, term_lower, _) in enumerate(index) if trigram in term_lower]
+
+
+@pytest.mark.parametrize("query", [q.lower() for q in QUERIES if len(q) >= 3])
+def test_trigram_candidates_hold_every_match(query):
+    """Candidates (ascending) include every term containing the query"""
+    index = _ambiguous_index(small_knowledge())
+    candidates = _trigram_candidates(query, _trigram_index(index))
+
+    assert candidates == sorted(set(candidates))
+    containing = [i for i, (_, term_lower, _) in enumerate(index) if query in term_lower]
+    assert set(containing) <= set(candidates)
+
+
+def test_trigram_candidates_may_include_non_matches():
+    """A term holding every trigram but not the query is only a candidate"""
+    knowledge = small_knowledge()
+    index = _ambiguous_index(knowledge)
+
+    # "gent age" holds "age", "gen" and "ent" but not "agent"
+    candidates = _trigram_candidates("agent", _trigram_index(index))
+    assert [index[i][0] for i in candidates] == ["Agent", "agentic", "gent age"]
+    assert [r["term"] for r in search_ambiguous_terms("agent", knowledge)] == ["Agent", "agentic"]
+
+
+def test_trigram_candidates_unknown_trigram():
+    """A query with a trigram no term holds has no candidates"""
+    index = _ambiguous_index(small_knowledge())
+    assert _trigram_candidates("xyz", _trigram_index(index)) == []
+    assert _trigram_candidates("agex", _trigram_index(index)) == []
+
+
+@pytest.mark.parametrize("category", CATEGORIES)
+def test_category_candidates(category):
+    """Candidates are the ascending entries whose category contains the filter"""
+    knowledge = small_knowledge()
+    index = _ambiguous_index(knowledge)
+    category_lower = category.lower() if category is not None else None
+
+    candidates = list(_category_candidates(knowledge, index, category_lower))
+
+    if category is None:
+        assert candidates == list(range(len(index)))
+    else:
+        assert candidates == [
+            i for i, (_, _, term_category) in enumerate(index) if category_lower in term_category
+        ]
+
+
+@pytest.mark.parametrize("min_score", [None, 0.8])
+@pytest.mark.parametrize("category", CATEGORIES)
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_ambiguous_terms_matches_scan(any_knowledge, query, category, min_score):
+    """Indexed search finds what a scan of every term finds, in file order"""
+    results = search_ambiguous_terms(query, any_knowledge, min_score, category)
+    assert results == naive_search([query], any_knowledge, min_score, category)
+
+
+def test_search_ambiguous_terms_results_are_copies():
+    """Memoized results are copied, so callers cannot change later results"""
+    knowledge = small_knowledge()
+    first = search_ambiguous_terms("agent", knowledge)
+    first[0]["term"] = "changed"
+    first.clear()
+
+    assert [r["term"] for r in search_ambiguous_terms("agent", knowledge)] == ["Agent", "agentic"]
+
+
+def run_every_query(knowledge):
+    """Call every memoized or indexed query once."""
+    search_ambiguous_terms("agent", knowledge, 0.5, "generic")
+    search_ambiguous_terms_multi(["agent", "git"], knowledge)
+    get_high_ambiguity_terms(knowledge, 0.8, 5)
+    get_all_categories(knowledge)
+    get_statistics(knowledge)
+    search_domain_mappings("autogen", "agent", knowledge)
+    search_ontology("agent", knowledge)
+
+
+def test_plain_dict_knowledge_is_not_modified(knowledge):
+    """Queries add nothing to a knowledge dict passed in by the caller"""
+    plain = {name: knowledge[name] for name, _ in knowledge_query.KNOWLEDGE_FILES}
+    before = copy.deepcopy(plain)
+
+    run_every_query(plain)
+
+    assert plain == before
+
+
+def test_knowledge_base_is_released_after_queries(knowledge_dir):
+    """Indexes and memoized results do not keep a knowledge base alive"""
+    knowledge = knowledge_query.KnowledgeBase(knowledge_dir)
+    run_every_query(knowledge)
+    assert knowledge._derived
+
+    ref = weakref.ref(knowledge)
+    del knowledge
+    gc.collect()
+
+    assert ref() is None
+
+
+MULTI_QUERIES = [
+    [],
+    ["agent"],
+    ["a", "git"],
+    ["it", "API"],
+    ["make it", "tag", "xyz"],
+    ["agent", "Agent", "agentic"],
+    ["", "xyz"],
+    ["nothing", "matches"],
+]
+
+
+@pytest.fixture(params=[
+    pytest.param("ahocorasick", marks=pytest.mark.skipif(
+        knowledge_query.ahocorasick is None, reason="pyahocorasick not installed"
+    )),
+    "without ahocorasick",
+])
+def multi_matcher(request, monkeypatch):
+    """Run search_ambiguous_terms_multi with and without pyahocorasick."""
+    if request.param != "ahocorasick":
+        monkeypatch.setattr(knowledge_query, "ahocorasick", None)
+    return request.param
+
+
+@pytest.mark.parametrize("min_score", [None, 0.8])
+@pytest.mark.parametrize("category", CATEGORIES)
+@pytest.mark.parametrize("queries", MULTI_QUERIES)
+def test_search_ambiguous_terms_multi_matches_scan(multi_matcher, any_knowledge,
+                                                   queries, category, min_score):
+    """Each term containing any query is reported once, in file order"""
+    results = search_ambiguous_terms_multi(queries, any_knowledge, min_score, category)
+    assert results == naive_search(queries, any_knowledge, min_score, category)
+
+
+@pytest.mark.parametrize("queries", MULTI_QUERIES)
+def test_search_ambiguous_terms_multi_single_query_agrees(multi_matcher, knowledge, queries):
+    """Multi-query results are the union of the single-query searches"""
+    found = {
+        r["term"] for query in queries for r in search_ambiguous_terms(query, knowledge)
+    }
+    results = search_ambiguous_terms_multi(queries, knowledge)
+
+    assert [r["term"] for r in results] == [
+        term for term in knowledge["ambiguous_terms"] if term in found
+    ]